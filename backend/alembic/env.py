@@ -23,6 +23,7 @@ from app.models.like import Like
 from app.models.announcement import Announcement
 from app.models.certification import Certification
 from app.models.program_status import ProgramStatus
+from app.models.student_segment import StudentSegment, StudentSegmentMember
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,34 @@
+"""add post and comment indexes
+
+Revision ID: a7c1e4d9b5f2
+Revises: f6a0c3b2d4e5
+Create Date: 2026-02-16 09:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c1e4d9b5f2'
+down_revision: Union[str, Sequence[str], None] = 'f6a0c3b2d4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Found by benchmarks/repository_bench.py: the feed, profile pages and comment
+    # threads were sequential scans of posts/comments
+    op.create_index('ix_posts_created_at', 'posts', ['created_at'])
+    op.create_index('ix_posts_user_id_created_at', 'posts', ['user_id', 'created_at'])
+    op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_post_id_created_at', table_name='comments')
+    op.drop_index('ix_posts_user_id_created_at', table_name='posts')
+    op.drop_index('ix_posts_created_at', table_name='posts')
@@ -0,0 +1,46 @@
+"""add post rankings
+
+Revision ID: b3d9f2a6c8e1
+Revises: a7c1e4d9b5f2
+Create Date: 2026-03-02 14:12:08.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d9f2a6c8e1'
+down_revision: Union[str, Sequence[str], None] = 'a7c1e4d9b5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by the periodic ranking refresh (first run at startup), then kept
+    # current by like/comment/post writes
+    op.create_table(
+        'post_rankings',
+        sa.Column('post_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('featured_dish', sa.String(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id')
+    )
+    op.create_index('ix_post_rankings_score', 'post_rankings', ['score'])
+    op.create_index('ix_post_rankings_is_public_score', 'post_rankings', ['is_public', 'score'])
+    op.create_index('ix_post_rankings_featured_dish_is_public_score', 'post_rankings', ['featured_dish', 'is_public', 'score'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_post_rankings_featured_dish_is_public_score', table_name='post_rankings')
+    op.drop_index('ix_post_rankings_is_public_score', table_name='post_rankings')
+    op.drop_index('ix_post_rankings_score', table_name='post_rankings')
+    op.drop_table('post_rankings')
@@ -0,0 +1,30 @@
+"""add likes user_id post_id index
+
+Revision ID: c5e1a8f3d7b9
+Revises: b3d9f2a6c8e1
+Create Date: 2026-03-09 11:26:40.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a8f3d7b9'
+down_revision: Union[str, Sequence[str], None] = 'b3d9f2a6c8e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # unique_post_user_like leads with post_id; liked-status lookups for a page of
+    # posts (POST /api/posts/liked) and deleting a user's likes filter on user_id
+    op.create_index('ix_likes_user_id_post_id', 'likes', ['user_id', 'post_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_likes_user_id_post_id', table_name='likes')
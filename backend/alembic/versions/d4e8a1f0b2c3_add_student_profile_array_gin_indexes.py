@@ -0,0 +1,33 @@
+"""add_student_profile_array_gin_indexes
+
+Revision ID: d4e8a1f0b2c3
+Revises: c79a77b520e9
+Create Date: 2026-02-09 10:12:44.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8a1f0b2c3'
+down_revision: Union[str, Sequence[str], None] = 'c79a77b520e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GIN indexes on array columns so overlap (&&) filters can use an index
+    op.create_index('ix_student_profiles_relocation_states', 'student_profiles', ['relocation_states'], postgresql_using='gin')
+    op.create_index('ix_student_profiles_interests', 'student_profiles', ['interests'], postgresql_using='gin')
+    op.create_index('ix_student_profiles_availability', 'student_profiles', ['availability'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_profiles_availability', table_name='student_profiles')
+    op.drop_index('ix_student_profiles_interests', table_name='student_profiles')
+    op.drop_index('ix_student_profiles_relocation_states', table_name='student_profiles')
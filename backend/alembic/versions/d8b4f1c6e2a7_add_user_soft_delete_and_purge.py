@@ -0,0 +1,64 @@
+"""add user soft delete and purge
+
+Revision ID: d8b4f1c6e2a7
+Revises: c5e1a8f3d7b9
+Create Date: 2026-03-16 10:04:52.731906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4f1c6e2a7'
+down_revision: Union[str, Sequence[str], None] = 'c5e1a8f3d7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Soft delete: set by DELETE /api/students/{id}, the row is purged in the background
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_users_deleted_at', 'users', ['deleted_at'], postgresql_where=sa.text('deleted_at IS NOT NULL'))
+
+    # Deleting a user cascades in the database instead of the ORM loading every row:
+    # the reset token FK was the only one without an ON DELETE rule
+    op.drop_constraint('password_reset_tokens_user_id_fkey', 'password_reset_tokens', type_='foreignkey')
+    op.create_foreign_key(
+        'password_reset_tokens_user_id_fkey', 'password_reset_tokens', 'users',
+        ['user_id'], ['id'], ondelete='CASCADE'
+    )
+
+    # Cascades and purge batches look rows up by these columns
+    op.create_index('ix_password_reset_tokens_user_id', 'password_reset_tokens', ['user_id'])
+    op.create_index('ix_comments_user_id', 'comments', ['user_id'])
+    op.create_index('ix_certifications_student_id', 'certifications', ['student_id'])
+
+    # Files of purged accounts, deleted from storage in batches
+    op.create_table(
+        'storage_deletions',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('enqueued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('storage_deletions')
+    op.drop_index('ix_certifications_student_id', table_name='certifications')
+    op.drop_index('ix_comments_user_id', table_name='comments')
+    op.drop_index('ix_password_reset_tokens_user_id', table_name='password_reset_tokens')
+    op.drop_constraint('password_reset_tokens_user_id_fkey', 'password_reset_tokens', type_='foreignkey')
+    op.create_foreign_key(
+        'password_reset_tokens_user_id_fkey', 'password_reset_tokens', 'users',
+        ['user_id'], ['id']
+    )
+    op.drop_index('ix_users_deleted_at', table_name='users', postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_column('users', 'deleted_at')
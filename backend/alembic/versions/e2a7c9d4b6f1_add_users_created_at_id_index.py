@@ -0,0 +1,29 @@
+"""add users created_at id index
+
+Revision ID: e2a7c9d4b6f1
+Revises: d8b4f1c6e2a7
+Create Date: 2026-03-11 10:04:52.361907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c9d4b6f1'
+down_revision: Union[str, Sequence[str], None] = 'd8b4f1c6e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination of GET /api/admin/users: newest first, resuming after (created_at, id)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,43 @@
+"""add post_count to student_profiles
+
+Revision ID: e5f9b2a1c3d4
+Revises: d4e8a1f0b2c3
+Create Date: 2026-02-11 14:37:09.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f9b2a1c3d4'
+down_revision: Union[str, Sequence[str], None] = 'd4e8a1f0b2c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('student_profiles', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing posts
+    op.execute("""
+        UPDATE student_profiles AS sp
+        SET post_count = counts.post_count
+        FROM (
+            SELECT user_id, COUNT(*) AS post_count
+            FROM posts
+            GROUP BY user_id
+        ) AS counts
+        WHERE sp.user_id = counts.user_id
+    """)
+
+    op.create_index('ix_student_profiles_post_count', 'student_profiles', ['post_count'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_profiles_post_count', table_name='student_profiles')
+    op.drop_column('student_profiles', 'post_count')
@@ -0,0 +1,33 @@
+"""add program status history indexes
+
+Revision ID: f4c8a2e6d1b3
+Revises: e2a7c9d4b6f1
+Create Date: 2026-03-12 09:41:17.502386
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a2e6d1b3'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c9d4b6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A student's timeline in order (GET /api/students/{id}/program-status and the
+    # LAG() in transition analytics); also serves the cascade from student_profiles
+    op.create_index('ix_program_statuses_student_id_changed_at', 'program_statuses', ['student_id', 'changed_at'])
+    # ON DELETE SET NULL when a purged user had changed statuses
+    op.create_index('ix_program_statuses_changed_by', 'program_statuses', ['changed_by'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_program_statuses_changed_by', table_name='program_statuses')
+    op.drop_index('ix_program_statuses_student_id_changed_at', table_name='program_statuses')
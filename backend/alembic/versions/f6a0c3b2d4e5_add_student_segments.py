@@ -0,0 +1,60 @@
+"""add student segments
+
+Revision ID: f6a0c3b2d4e5
+Revises: e5f9b2a1c3d4
+Create Date: 2026-02-13 11:05:52.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a0c3b2d4e5'
+down_revision: Union[str, Sequence[str], None] = 'e5f9b2a1c3d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('student_segments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('filters', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_student_segments_id'), 'student_segments', ['id'], unique=False)
+    op.create_table('student_segment_members',
+    sa.Column('segment_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('added_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['segment_id'], ['student_segments.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('segment_id', 'user_id')
+    )
+    op.create_index(op.f('ix_student_segment_members_user_id'), 'student_segment_members', ['user_id'], unique=False)
+
+    op.add_column('announcements', sa.Column('target_segment_id', sa.UUID(), nullable=True))
+    op.create_index(op.f('ix_announcements_target_segment_id'), 'announcements', ['target_segment_id'], unique=False)
+    op.create_foreign_key('announcements_target_segment_id_fkey', 'announcements', 'student_segments', ['target_segment_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('announcements_target_segment_id_fkey', 'announcements', type_='foreignkey')
+    op.drop_index(op.f('ix_announcements_target_segment_id'), table_name='announcements')
+    op.drop_column('announcements', 'target_segment_id')
+    op.drop_index(op.f('ix_student_segment_members_user_id'), table_name='student_segment_members')
+    op.drop_table('student_segment_members')
+    op.drop_index(op.f('ix_student_segments_id'), table_name='student_segments')
+    op.drop_table('student_segments')
@@ -0,0 +1,389 @@
+"""
+Caching for expensive, read-mostly results.
+
+TTLCache is a small in-process cache for callers that manage their own keys.
+Everything else goes through get_cache(), which fronts the backend selected by
+CACHE_BACKEND: "memory" (default, per process) or "redis" (shared by all
+workers; any server speaking the Redis protocol, see
+benchmarks/resp_server.py for a local stand-in).
+
+Entries can carry tags ("users:<id>", "announcements", ...). Invalidating a tag
+replaces its token, and an entry whose stored tokens no longer match is a miss,
+so invalidation is one write whatever the number of entries. BaseRepository
+invalidates "<table>" and "<table>:<id>" on create/update/delete.
+"""
+import functools
+import inspect
+import logging
+import os
+import pickle
+import queue
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+import anyio
+
+from app.core.metrics import cache_requests_total, track_external
+
+logger = logging.getLogger(__name__)
+
+# Tag tokens outlive any entry; an expired token only causes misses
+TAG_TTL = 24 * 3600
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry and an LRU size bound.
+    Intended for short-lived results that are expensive to compute and safe to
+    serve slightly stale (e.g. directory facet counts).
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class CacheBackend(ABC):
+    """
+    Common interface for cache storage. Keys are strings; values are any picklable object.
+    Backends that do network I/O set blocking = True so async callers move the call off the event loop.
+    """
+    blocking = False
+
+    @abstractmethod
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        ...
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU with per-entry TTL. Values are stored as-is: treat cached results as read-only"""
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(ttl=60, maxsize=maxsize)
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        return [self._cache.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.delete(key)
+
+
+class RedisError(Exception):
+    """Error reply from the server"""
+
+
+class RedisCache(CacheBackend):
+    """
+    Minimal Redis protocol (RESP2) client: MGET, SET ... PX, DEL over a small pool of sockets.
+    URL format: redis://[:password@]host[:port][/db]
+    """
+    blocking = True
+
+    def __init__(self, url: str, timeout: float = 0.5, max_idle_connections: int = 16):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue(maxsize=max_idle_connections)
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = (sock, sock.makefile("rb"))
+        try:
+            if self.password:
+                self._roundtrip(connection, "AUTH", self.password)
+            if self.db:
+                self._roundtrip(connection, "SELECT", self.db)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    @staticmethod
+    def _close(connection) -> None:
+        sock, reader = connection
+        reader.close()
+        sock.close()
+
+    @staticmethod
+    def _encode(args: Sequence[Union[str, bytes, int]]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, str):
+                arg = arg.encode()
+            elif isinstance(arg, int):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    @classmethod
+    def _read_reply(cls, reader) -> Any:
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RedisError(rest.decode(errors="replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [cls._read_reply(reader) for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def _roundtrip(self, connection, *args) -> Any:
+        sock, reader = connection
+        sock.sendall(self._encode(args))
+        return self._read_reply(reader)
+
+    def execute(self, *args) -> Any:
+        """Run one command on a pooled connection; the connection is dropped on any I/O error"""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            reply = self._roundtrip(connection, *args)
+        except RedisError:
+            # The reply was read in full, so the connection is still usable
+            self._release(connection)
+            raise
+        except Exception:
+            self._close(connection)
+            raise
+        self._release(connection)
+        return reply
+
+    def _release(self, connection) -> None:
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            self._close(connection)
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        with track_external("redis", "mget"):
+            values = self.execute("MGET", *keys)
+        return [None if value is None else pickle.loads(value) for value in values]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with track_external("redis", "set"):
+            self.execute("SET", key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, *keys: str) -> None:
+        with track_external("redis", "del"):
+            self.execute("DEL", *keys)
+
+
+class _Lookup(NamedTuple):
+    hit: bool
+    value: Any
+    tokens: Tuple[str, ...]
+
+
+class Cache:
+    """
+    Namespaced, tag-aware access to a CacheBackend with hit/miss metrics.
+    Backend errors are logged and treated as misses: the cache never fails a request.
+    """
+
+    def __init__(self, backend: CacheBackend, prefix: str = "ccap:"):
+        self.backend = backend
+        self.prefix = prefix
+
+    def _key(self, name: str, key: str) -> str:
+        return f"{self.prefix}{name}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def lookup(self, name: str, key: str, tags: Sequence[str] = (), record: bool = True) -> _Lookup:
+        """
+        Fetch an entry and the current tokens of its tags in one round trip.
+        Pass the returned tokens to store() so a value computed after a concurrent
+        invalidation is stored as already stale. record=False leaves the hit/miss
+        metrics alone (lookups made to update an entry rather than to serve it).
+        """
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            entry, *tokens = self.backend.get_many([self._key(name, key), *tag_keys])
+            missing = {tag_key: uuid.uuid4().hex for tag_key, token in zip(tag_keys, tokens) if token is None}
+            for tag_key, token in missing.items():
+                self.backend.set(tag_key, token, TAG_TTL)
+        except Exception as e:
+            logger.warning("Cache lookup failed for %s: %s", name, e)
+            if record:
+                cache_requests_total.inc(cache=name, result="error")
+            return _Lookup(False, None, ())
+        tokens = tuple(missing.get(tag_key, token) for tag_key, token in zip(tag_keys, tokens))
+        hit = entry is not None and entry[0] == tokens
+        if record:
+            cache_requests_total.inc(cache=name, result="hit" if hit else "miss")
+        return _Lookup(hit, entry[1] if hit else None, tokens)
+
+    def store(self, name: str, key: str, value: Any, ttl: float, tokens: Tuple[str, ...] = ()) -> None:
+        try:
+            self.backend.set(self._key(name, key), (tokens, value), ttl)
+        except Exception as e:
+            logger.warning("Cache store failed for %s: %s", name, e)
+
+    def get_or_set(self, name: str, key: str, compute: Callable[[], Any], ttl: float, tags: Sequence[str] = ()) -> Any:
+        """Return the cached value, or compute and cache it (None results are not cached)"""
+        cached = self.lookup(name, key, tags)
+        if cached.hit:
+            return cached.value
+        value = compute()
+        if value is not None and (cached.tokens or not tags):
+            self.store(name, key, value, ttl, cached.tokens)
+        return value
+
+    async def aget_or_set(self, name: str, key: str, compute: Callable[[], Any], ttl: float, tags: Sequence[str] = ()) -> Any:
+        """get_or_set for async code: compute is a coroutine function"""
+        cached = await self._run(self.lookup, name, key, tags)
+        if cached.hit:
+            return cached.value
+        value = await compute()
+        if value is not None and (cached.tokens or not tags):
+            await self._run(self.store, name, key, value, ttl, cached.tokens)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        """Make every entry carrying any of these tags a miss"""
+        if not tags:
+            return
+        try:
+            self.backend.delete(*[self._tag_key(tag) for tag in tags])
+        except Exception as e:
+            logger.warning("Cache invalidation failed for %s: %s", tags, e)
+
+    async def ainvalidate(self, *tags: str) -> None:
+        await self._run(self.invalidate, *tags)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await anyio.to_thread.run_sync(functools.partial(func, *args))
+        return func(*args)
+
+
+_cache: Optional[Cache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    """Return the configured cache (created lazily, once per process)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                # "memory" (default) or "redis"
+                backend = os.getenv("CACHE_BACKEND", "memory").lower()
+                if backend == "memory":
+                    _cache = Cache(MemoryCache(maxsize=int(os.getenv("CACHE_MAX_ENTRIES", "10000"))))
+                elif backend == "redis":
+                    _cache = Cache(RedisCache(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+                else:
+                    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+    return _cache
+
+
+def model_tags(model_class: type, item_id: Any = None) -> List[str]:
+    """Tags BaseRepository invalidates when a row of model_class is written"""
+    table = model_class.__tablename__
+    return [table] if item_id is None else [table, f"{table}:{item_id}"]
+
+
+def cached(name: str,
+           ttl: float,
+           key: Callable[..., Hashable],
+           tags: Union[Sequence[str], Callable[..., Iterable[str]]] = ()):
+    """
+    Cache a function's (or repository method's) return value under name.
+
+    key and a callable tags receive the same arguments as the function. Works
+    on def and async def functions; None results are not cached.
+
+        @cached("email_stats", ttl=30, key=lambda db: "all", tags=("email_logs",))
+        async def email_stats(db): ...
+    """
+    def decorator(func):
+        def resolve(args, kwargs) -> Tuple[str, Sequence[str]]:
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return str(key(*args, **kwargs)), list(entry_tags)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                entry_key, entry_tags = resolve(args, kwargs)
+                return await get_cache().aget_or_set(
+                    name, entry_key, lambda: func(*args, **kwargs), ttl, entry_tags
+                )
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            entry_key, entry_tags = resolve(args, kwargs)
+            return get_cache().get_or_set(name, entry_key, lambda: func(*args, **kwargs), ttl, entry_tags)
+        return wrapper
+
+    return decorator
@@ -1,8 +1,19 @@
+import logging
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.core.metrics import db_query_duration_seconds, db_read_sessions_total
+from app.core.read_your_writes import caller_key, wrote_recently
+from app.core.sql_profiler import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # Load .env.local only in local development (not in production)
 # Railway sets DATABASE_URL, so if it's not set, we're in local dev
@@ -25,9 +36,36 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+
+def _instrument(engine) -> None:
+    """Per-request statement counts/DB time, slow query log and statement latency metrics"""
+    instrument_engine(
+        engine,
+        slow_query_ms=float(os.getenv("SQL_SLOW_QUERY_MS", "200")),
+        explain_slow_queries=os.getenv("SQL_EXPLAIN_SLOW_QUERIES", "true").lower() == "true",
+        on_statement=db_query_duration_seconds.observe
+    )
+
+
+_instrument(engine)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional streaming replica for read-only endpoints (get_read_db); unset = all reads on the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# After a failed connection the replica is skipped for this long
+REPLICA_RETRY_SECONDS = float(os.getenv("DATABASE_REPLICA_RETRY_SECONDS", "30"))
+
+replica_engine = None
+ReplicaSessionLocal = None
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, pool_pre_ping=True)
+    _instrument(replica_engine)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+_replica_retry_at = 0.0
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -38,3 +76,132 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _read_target(request: Request) -> str:
+    """Where a read-only request should go: "replica", or why it stays on the primary"""
+    if time.monotonic() < _replica_retry_at:
+        return "replica_down"
+    if wrote_recently(caller_key(request.headers.get("authorization"))):
+        return "recent_write"
+    return "replica"
+
+
+def _replica_failed(error: Exception) -> None:
+    global _replica_retry_at
+    _replica_retry_at = time.monotonic() + REPLICA_RETRY_SECONDS
+    logger.warning("Read replica unavailable, using the primary for %.0fs: %s", REPLICA_RETRY_SECONDS, error)
+
+
+def _open_read_session(request: Request):
+    target = _read_target(request)
+    if target == "replica":
+        db = ReplicaSessionLocal()
+        try:
+            db.connection()  # Check out a connection now so a dead replica falls back before the endpoint runs
+            db_read_sessions_total.inc(target="replica", reason="")
+            return db
+        except OperationalError as e:
+            db.close()
+            _replica_failed(e)
+            target = "fallback"
+    db_read_sessions_total.inc(target="primary", reason=target)
+    return SessionLocal()
+
+
+# Dependency for read-only endpoints: a replica session when DATABASE_REPLICA_URL is set, else the primary.
+# Callers who wrote within READ_YOUR_WRITES_SECONDS read from the primary so they see their own changes.
+def get_read_db(request: Request):
+    db = _open_read_session(request) if ReplicaSessionLocal is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _create_async_engine(url: str, **kwargs):
+    """
+    Async engine for a DATABASE_URL-style URL: asyncpg for PostgreSQL, aiosqlite for SQLite
+    (the default DATABASE_URL; both drivers are in requirements.txt).
+    libpq-only query options are translated to their asyncpg equivalents.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url.set(drivername="sqlite+aiosqlite"), **kwargs)
+
+    url = url.set(drivername="postgresql+asyncpg")
+    connect_args = {}
+    if "sslmode" in url.query:
+        connect_args["ssl"] = url.query["sslmode"]
+    if "connect_timeout" in url.query:
+        connect_args["timeout"] = float(url.query["connect_timeout"])
+    if "application_name" in url.query:
+        connect_args["server_settings"] = {"application_name": url.query["application_name"]}
+    url = url.difference_update_query(["sslmode", "connect_timeout", "application_name"])
+    return create_async_engine(url, connect_args=connect_args, **kwargs)
+
+
+# Async engines are created on first use, so the driver is only needed by async routes
+_async_engine = None
+_AsyncSessionLocal = None
+_async_replica_engine = None
+_AsyncReplicaSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = _create_async_engine(DATABASE_URL)
+        _instrument(_async_engine.sync_engine)
+        # No expiry on commit: expired attributes would need an implicit (sync) reload
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+
+def _get_async_replica_sessionmaker():
+    global _async_replica_engine, _AsyncReplicaSessionLocal
+    if _async_replica_engine is None:
+        _async_replica_engine = _create_async_engine(DATABASE_REPLICA_URL, pool_pre_ping=True)
+        _instrument(_async_replica_engine.sync_engine)
+        _AsyncReplicaSessionLocal = async_sessionmaker(_async_replica_engine, expire_on_commit=False, autoflush=False)
+    return _AsyncReplicaSessionLocal
+
+
+async def dispose_async_engine():
+    """Close pooled async connections (they belong to the event loop that opened them)"""
+    for async_engine in (_async_engine, _async_replica_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+
+
+# Dependency to get an AsyncSession for async def routes (awaits DB I/O instead of blocking the event loop)
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+# get_read_db for async def routes
+async def get_async_read_db(request: Request):
+    get_async_engine()
+    target = _read_target(request) if DATABASE_REPLICA_URL else None
+    if target == "replica":
+        db = _get_async_replica_sessionmaker()()
+        try:
+            await db.connection()
+        except OperationalError as e:
+            await db.close()
+            _replica_failed(e)
+            target = "fallback"
+        else:
+            db_read_sessions_total.inc(target="replica", reason="")
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+
+    if target is not None:
+        db_read_sessions_total.inc(target="primary", reason=target)
+    async with _AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Request, Response, status
+
+# Clients must revalidate, but may reuse their copy after a 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Weak ETag from the values that identify a representation (ids, updated_at
+    timestamps, ...). Weak because the bytes differ per Content-Encoding.
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on both sides
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def conditional_response(request: Request, etag: str, build: Callable[[], Response]) -> Response:
+    """
+    Return 304 Not Modified if the client's If-None-Match matches etag,
+    otherwise call build() (which does the loading/serialization) and tag its response.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    response = build()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
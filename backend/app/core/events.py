@@ -0,0 +1,154 @@
+"""
+Live events for GET /api/events/stream (Server-Sent Events).
+
+publish() can be called from any thread (sync routes run in the threadpool) and
+delivers to every stream connected to this process. With EVENTS_BACKEND=postgres
+events go through Postgres NOTIFY instead, and every worker LISTENs and delivers
+them to its own streams, so a like handled by one worker reaches clients
+connected to the others. The default, "local", only reaches this process.
+
+Events are notifications, not a log: a client that reconnects should refetch
+what it shows (ETags make that cheap) rather than expect missed events.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Set
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import engine, get_async_engine
+from app.core.metrics import events_published_total, events_stream_connections
+
+logger = logging.getLogger(__name__)
+
+# "local" (default, this process only) or "postgres" (LISTEN/NOTIFY across workers)
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "local").lower()
+NOTIFY_CHANNEL = "ccap_events"
+# Events buffered per stream; a client that falls this far behind is disconnected and reconnects
+SUBSCRIBER_QUEUE_SIZE = 256
+LISTEN_RETRY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str
+    data: dict
+    # Only sent to admin streams (e.g. activity on private posts)
+    admin_only: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps({"type": self.type, "data": self.data, "admin_only": self.admin_only}, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Event":
+        message = json.loads(payload)
+        return cls(message["type"], message["data"], message.get("admin_only", False))
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def put(self, event: Optional[Event]) -> None:
+        """Runs on the subscriber's loop; None tells the stream to end"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow: drop what's buffered and end the stream
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """In-process pub/sub: each connected stream gets its own bounded queue"""
+
+    def __init__(self):
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator["asyncio.Queue[Optional[Event]]"]:
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        events_stream_connections.inc()
+        try:
+            yield subscriber.queue
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+            events_stream_connections.dec()
+
+    def deliver(self, event: Optional[Event]) -> None:
+        """Hand an event to every local subscriber (thread-safe)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+            except RuntimeError:
+                pass  # Loop already closed
+
+
+broker = EventBroker()
+
+
+def publish(event_type: str, data: dict, admin_only: bool = False) -> None:
+    """Publish an event to connected streams (call after the change is committed)"""
+    event = Event(event_type, data, admin_only)
+    events_published_total.inc(type=event_type)
+    if EVENTS_BACKEND != "postgres":
+        broker.deliver(event)
+        return
+
+    # Every worker, including this one, delivers it from its LISTEN connection
+    try:
+        with engine.begin() as connection:
+            connection.execute(select(func.pg_notify(NOTIFY_CHANNEL, event.to_json())))
+    except Exception as e:
+        logger.warning("Could not publish %s event: %s", event_type, e)
+
+
+async def apublish(event_type: str, data: dict, admin_only: bool = False) -> None:
+    """publish() for async code: the NOTIFY round trip runs in the threadpool"""
+    if EVENTS_BACKEND == "postgres":
+        await run_in_threadpool(publish, event_type, data, admin_only)
+    else:
+        publish(event_type, data, admin_only)
+
+
+def _on_notify(connection, pid, channel, payload) -> None:
+    try:
+        broker.deliver(Event.from_json(payload))
+    except (ValueError, KeyError) as e:
+        logger.warning("Ignoring malformed event payload: %s", e)
+
+
+async def listen() -> None:
+    """LISTEN for events published by any worker and deliver them locally (EVENTS_BACKEND=postgres)"""
+    while True:
+        try:
+            async with get_async_engine().connect() as connection:
+                raw = (await connection.get_raw_connection()).driver_connection
+                closed = asyncio.Event()
+                raw.add_termination_listener(lambda _: closed.set())
+                await raw.add_listener(NOTIFY_CHANNEL, _on_notify)
+                logger.info("Listening for events on %s", NOTIFY_CHANNEL)
+                try:
+                    await closed.wait()
+                finally:
+                    if not raw.is_closed():
+                        await raw.remove_listener(NOTIFY_CHANNEL, _on_notify)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Event listener disconnected, retrying in %ss: %s", LISTEN_RETRY_SECONDS, e)
+        await asyncio.sleep(LISTEN_RETRY_SECONDS)
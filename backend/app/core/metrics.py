@@ -0,0 +1,279 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+No client library or external service: metrics live in this process and are
+rendered by GET /metrics. With several workers each process reports its own
+series, so scrape every worker (or run a single worker) to aggregate.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.sql_profiler import profile_request
+
+# Latency buckets in seconds (covers fast DB-only requests to slow uploads/exports)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = self._header()
+        bucket_labels = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels, key + (_format_value(bound),))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests_total = REGISTRY.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+http_request_duration_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds", ("method", "route", "status")
+)
+http_requests_in_progress = REGISTRY.gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled", ("method", "route")
+)
+http_request_db_seconds = REGISTRY.histogram(
+    "http_request_db_seconds", "Database time spent per HTTP request in seconds", ("method", "route")
+)
+http_request_db_queries = REGISTRY.histogram(
+    "http_request_db_queries", "Database statements executed per HTTP request", ("method", "route"),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+db_query_duration_seconds = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database statement latency in seconds"
+)
+db_read_sessions_total = REGISTRY.counter(
+    "db_read_sessions_total", "Read-only sessions by target (replica/primary) and why a read stayed on the primary",
+    ("target", "reason")
+)
+cache_requests_total = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache name and result (hit/miss/error)", ("cache", "result")
+)
+events_published_total = REGISTRY.counter(
+    "events_published_total", "Live events published to /api/events/stream clients", ("type",)
+)
+events_stream_connections = REGISTRY.gauge(
+    "events_stream_connections", "Open /api/events/stream connections"
+)
+external_call_duration_seconds = REGISTRY.histogram(
+    "external_call_duration_seconds", "Latency of calls to external services in seconds", ("service", "operation")
+)
+external_call_errors_total = REGISTRY.counter(
+    "external_call_errors_total", "Failed calls to external services", ("service", "operation")
+)
+
+
+@contextmanager
+def track_external(service: str, operation: str):
+    """Time a call to an external service (S3, SendGrid, ...) and count failures"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        external_call_errors_total.inc(service=service, operation=operation)
+        raise
+    finally:
+        external_call_duration_seconds.observe(time.perf_counter() - start, service=service, operation=operation)
+
+
+def _route_path(app: ASGIApp, scope: Scope) -> str:
+    """Route template (e.g. /api/posts/{post_id}) so labels don't explode per id"""
+    partial = None
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+        if match == Match.PARTIAL and partial is None:
+            partial = route  # Path matched but not the method (405)
+    return getattr(partial, "path", "unmatched")
+
+
+class MetricsMiddleware:
+    """Per-route request counts, latency, in-flight requests and DB time"""
+
+    def __init__(self, app: ASGIApp, router: Optional[ASGIApp] = None):
+        self.app = app
+        # Object with .routes used to resolve route templates (the FastAPI app)
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_path(self.router, scope) if self.router is not None else scope["path"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method=method, route=route)
+        start = time.perf_counter()
+        with profile_request() as profile:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                http_requests_in_progress.dec(method=method, route=route)
+                http_requests_total.inc(method=method, route=route, status=status_code)
+                http_request_duration_seconds.observe(elapsed, method=method, route=route, status=status_code)
+                http_request_db_seconds.observe(profile.seconds, method=method, route=route)
+                http_request_db_queries.observe(profile.count, method=method, route=route)
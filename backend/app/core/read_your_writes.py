@@ -0,0 +1,70 @@
+"""
+Read-your-writes for replica routing.
+
+Replicas apply the primary's changes with a small delay, so a caller who just
+saved something and immediately reloads could be shown the old data. After a
+successful write (POST/PUT/PATCH/DELETE) the caller's reads go to the primary
+for READ_YOUR_WRITES_SECONDS. Callers are identified by a hash of their bearer
+token; the raw token is never stored. POSTs that only read (READ_ONLY_PATHS)
+don't count as writes.
+"""
+import hashlib
+import os
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# POST endpoints that only read (the body carries the query), so they don't pin the caller to the primary
+READ_ONLY_PATHS = {"/api/posts/liked"}
+
+# Tracked per process: keep the window longer than replica lag plus the time a
+# client takes to land its next request on the same worker
+_recent_writers = TTLCache(ttl=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")), maxsize=10000)
+
+
+def caller_key(authorization: Optional[str]) -> Optional[str]:
+    """Stable key for the caller behind an Authorization header (None for anonymous requests)"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def mark_write(key: Optional[str]) -> None:
+    if key is not None:
+        _recent_writers.set(key, True)
+
+
+def wrote_recently(key: Optional[str]) -> bool:
+    return key is not None and _recent_writers.get(key) is not None
+
+
+class ReadYourWritesMiddleware:
+    """Remember callers whose write request succeeded so get_read_db pins them to the primary"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] not in WRITE_METHODS
+                or scope["path"].rstrip("/") in READ_ONLY_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        key = caller_key(headers.get(b"authorization", b"").decode("latin-1"))
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                mark_write(key)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
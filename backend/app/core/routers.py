@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from app.routes import auth, students, announcements, posts, admin, email_notifications, test_email, email_logs, auth_reset
+from app.routes import auth, students, announcements, posts, admin, email_notifications, test_email, email_logs, auth_reset, storage, segments, metrics, events
 
 def setup_routers(app: FastAPI):
     """
@@ -47,6 +47,13 @@ def setup_routers(app: FastAPI):
         tags=["Admin Management"]
     )
     
+    # Saved student segment routes
+    app.include_router(
+        segments.router,
+        prefix="/api/admin/segments",
+        tags=["Student Segments"]
+    )
+    
     # Email notification routes
     app.include_router(
         email_notifications.router,
@@ -67,4 +74,23 @@ def setup_routers(app: FastAPI):
         prefix="/api/admin",
         tags=["Email Logs"]
     )
-
+    
+    # Local file storage route (only serves files when STORAGE_BACKEND=local)
+    app.include_router(
+        storage.router,
+        prefix="/api/storage",
+        tags=["Storage"]
+    )
+    
+    # Live activity stream (Server-Sent Events)
+    app.include_router(
+        events.router,
+        prefix="/api/events",
+        tags=["Events"]
+    )
+    
+    # Prometheus metrics endpoint
+    app.include_router(
+        metrics.router,
+        tags=["Metrics"]
+    )
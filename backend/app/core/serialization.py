@@ -0,0 +1,32 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter for a schema/type (e.g. List[PostResponse]), built once per process"""
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, data: Any) -> bytes:
+    """
+    Validate ORM objects (or dicts) against schema and encode them to JSON bytes.
+    Both steps run inside pydantic-core, with no intermediate Python dicts.
+    """
+    adapter = get_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+def typed_response(schema: Any, data: Any, status_code: int = 200) -> Response:
+    """
+    Serialize data through a cached TypeAdapter in one pass.
+
+    Use for large list responses instead of returning ORM objects through
+    response_model, which validates them, converts the result to Python
+    dicts and then encodes those. Keep response_model on the route so the
+    OpenAPI schema stays the same.
+    """
+    return Response(content=dump_json(schema, data), status_code=status_code, media_type="application/json")
@@ -0,0 +1,195 @@
+"""
+Per-request SQL profiling through SQLAlchemy engine events.
+
+Counts statements and DB time per request, logs slow statements with their
+bound parameters and EXPLAIN plan, and warns when the same statement runs
+many times in one request (the usual N+1 shape: a lazy-loaded relationship
+inside a loop).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters with these names are masked in the slow query log
+_SECRET_PARAM = re.compile(r"password|token|secret", re.IGNORECASE)
+_MAX_PARAMS_LENGTH = 1000
+
+
+class RequestProfile:
+    """Statements executed while handling one request"""
+
+    __slots__ = ("seconds", "count", "statements")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.seconds += elapsed
+        self.count += 1
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """(statement, count) pairs that ran at least threshold times, most frequent first"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# The profile object is shared with threadpool workers (sync endpoints) via context copies
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestProfile]:
+    """Collect statements for the enclosed work; joins an already active profile"""
+    profile = _current_profile.get()
+    if profile is not None:
+        yield profile
+        return
+
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _format_params(parameters) -> str:
+    if isinstance(parameters, dict):
+        parameters = {
+            key: "***" if _SECRET_PARAM.search(str(key)) else value
+            for key, value in parameters.items()
+        }
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMS_LENGTH:
+        text = text[:_MAX_PARAMS_LENGTH] + "..."
+    return text
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    Plan for a slow SELECT, on a separate cursor of the same connection.
+    Runs inside a savepoint so a failing EXPLAIN can't abort the caller's transaction.
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT sql_profiler_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT sql_profiler_explain")
+            plan = f"EXPLAIN failed: {e}"
+        cursor.execute("RELEASE SAVEPOINT sql_profiler_explain")
+        return plan
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+    finally:
+        cursor.close()
+
+
+def instrument_engine(
+    engine,
+    slow_query_ms: float = 200,
+    explain_slow_queries: bool = True,
+    on_statement: Optional[Callable[[float], None]] = None,
+) -> None:
+    """
+    Attach the profiler to an engine.
+    on_statement is called with each statement's duration in seconds (used for metrics).
+    """
+    slow_query_seconds = slow_query_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+        if on_statement is not None:
+            on_statement(elapsed)
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(statement, elapsed)
+
+        if slow_query_ms and elapsed >= slow_query_seconds:
+            plan = None
+            if explain_slow_queries and not executemany:
+                plan = _explain(conn, statement, parameters)
+            logger.warning(
+                "Slow query (%.1f ms): %s\nParameters: %s%s",
+                elapsed * 1000,
+                statement,
+                _format_params(parameters),
+                f"\nPlan:\n{plan}" if plan else "",
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("query_start_time") if conn is not None else None
+        if starts:
+            starts.pop()
+
+
+class SQLProfilerMiddleware:
+    """
+    Warn about statements repeated n_plus_one_threshold+ times in one request,
+    and optionally report the request's SQL count and time in response headers:
+    X-SQL-Count, X-SQL-Time-Ms, X-SQL-Max-Repeat and Server-Timing.
+    Headers reflect the statements run before the response started.
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 5, debug_headers: bool = False) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_request() as profile:
+            async def send_wrapper(message: Message) -> None:
+                if self.debug_headers and message["type"] == "http.response.start":
+                    max_repeat = max(profile.statements.values(), default=0)
+                    time_ms = f"{profile.seconds * 1000:.1f}"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-sql-count", str(profile.count).encode()),
+                        (b"x-sql-time-ms", time_ms.encode()),
+                        (b"x-sql-max-repeat", str(max_repeat).encode()),
+                        (b"server-timing", f"db;dur={time_ms}".encode()),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper if self.debug_headers else send)
+
+            if self.n_plus_one_threshold:
+                for statement, count in profile.repeated(self.n_plus_one_threshold):
+                    logger.warning(
+                        "Possible N+1: statement ran %d times in %s %s (%d statements total): %s",
+                        count, scope["method"], scope["path"], profile.count, statement,
+                    )
@@ -1,14 +1,55 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from typing import Optional
 from uuid import UUID
+import os
+from app.core.cache import get_cache
 from app.core.security import decode_access_token
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.models.user import User, UserRole
 
 # Bearer token authentication
 security = HTTPBearer()
 
+# Seconds a user row is reused across requests; BaseRepository.update/delete on a user invalidates it sooner
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# Everything but the password hash; an unloaded column is fetched on first access
+_PRINCIPAL_COLUMNS = [column.key for column in User.__table__.columns if column.key != "hashed_password"]
+
+
+def _load_principal(db: Session, user_id: UUID) -> Optional[dict]:
+    user = db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
+    if user is None:
+        return None
+    return {column: getattr(user, column) for column in _PRINCIPAL_COLUMNS}
+
+
+def _principal_from_token(token: str, db: Session) -> Optional[dict]:
+    """Principal (user columns) for a JWT, from the principal cache or the database; None if invalid"""
+    # Decode token
+    payload = decode_access_token(token)
+    if payload is None:
+        return None
+    
+    # Get user ID from token and convert to UUID
+    user_id_str = payload.get("sub")
+    if user_id_str is None:
+        return None
+    
+    try:
+        user_id = UUID(user_id_str)
+    except (ValueError, AttributeError):
+        return None
+    
+    # Get user from the principal cache, falling back to the database
+    return get_cache().get_or_set(
+        "principal", str(user_id), lambda: _load_principal(db, user_id),
+        ttl=PRINCIPAL_CACHE_TTL, tags=(f"users:{user_id}",)
+    )
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -21,28 +62,40 @@ def get_current_user(
     )
     
     # Extract token from credentials
-    token = credentials.credentials
-    
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    # Get user ID from token and convert to UUID
-    user_id_str = payload.get("sub")
-    if user_id_str is None:
+    principal = _principal_from_token(credentials.credentials, db)
+    if principal is None:
         raise credentials_exception
     
+    # Attach without a SELECT: relationships still lazy-load through this session
+    user = User(**principal)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+def get_stream_user(
+    token: str = Query(..., description="Access token (EventSource can't send an Authorization header)")
+) -> User:
+    """
+    Authenticate a long-lived stream from a ?token= query parameter
+    The session is closed before returning, so an open stream doesn't hold a database connection
+    """
+    db = SessionLocal()
     try:
-        user_id = UUID(user_id_str)
-    except (ValueError, AttributeError):
-        raise credentials_exception
-    
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+        principal = _principal_from_token(token, db)
+    finally:
+        db.close()
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
     
+    # Detached: only the loaded columns are available
+    user = User(**principal)
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
     return user
 
 def get_current_active_user(
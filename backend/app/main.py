@@ -1,8 +1,19 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from app.core.routers import setup_routers
+from app.core.database import dispose_async_engine
+from app.core.events import EVENTS_BACKEND, listen
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.read_your_writes import ReadYourWritesMiddleware
+from app.core.sql_profiler import SQLProfilerMiddleware
+from app.services.post_rankings import TRENDING_REFRESH_SECONDS, refresh_periodically
+from app.services.user_purge import USER_PURGE_INTERVAL_SECONDS, purge_periodically
 import logging
 
 # Load environment variables
@@ -19,10 +30,30 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Trending/dish gallery rankings (post_rankings table)
+    rankings_task = asyncio.create_task(refresh_periodically()) if TRENDING_REFRESH_SECONDS > 0 else None
+    # Deleted accounts and their files left over from interrupted purges
+    purge_task = asyncio.create_task(purge_periodically()) if USER_PURGE_INTERVAL_SECONDS > 0 else None
+    # Events published by other workers (EVENTS_BACKEND=postgres)
+    listen_task = asyncio.create_task(listen()) if EVENTS_BACKEND == "postgres" else None
+    yield
+    for task in (rankings_task, purge_task, listen_task):
+        if task is None:
+            continue
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title=os.getenv("PROJECT_NAME", "C•CAP"),
     description="C•CAP Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,  # Encode response_model output with orjson
+    lifespan=lifespan
 )
 
 # Configure CORS for frontend
@@ -39,6 +70,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (brotli if installed and accepted, else gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1000")),
+)
+
+# Pin callers to the primary briefly after they write (replica routing, see get_read_db)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Log likely N+1 query patterns; SQL_DEBUG_HEADERS=true adds X-SQL-Count/X-SQL-Time-Ms headers
+app.add_middleware(
+    SQLProfilerMiddleware,
+    n_plus_one_threshold=int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5")),
+    debug_headers=os.getenv("SQL_DEBUG_HEADERS", "false").lower() == "true",
+)
+
+# Per-route request metrics for /metrics (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 # Setup all API routes
 setup_routers(app)
 
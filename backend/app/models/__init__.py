@@ -2,6 +2,7 @@
 from .user import User, UserRole
 from .student_profile import StudentProfile
 from .post import Post
+from .post_ranking import PostRanking
 from .comment import Comment
 from .like import Like
 from .announcement import Announcement
@@ -10,6 +11,8 @@ from .certification import Certification
 from .email_notification import EmailNotification
 from .email_log import EmailLog
 from .password_reset import PasswordResetToken
+from .student_segment import StudentSegment, StudentSegmentMember
+from .storage_deletion import StorageDeletion
 
 # Make models available for imports
 __all__ = [
@@ -17,6 +20,7 @@ __all__ = [
     "UserRole", 
     "StudentProfile",
     "Post",
+    "PostRanking",
     "Comment",
     "Like",
     "Announcement",
@@ -25,4 +29,7 @@ __all__ = [
     "EmailNotification",
     "EmailLog",
     "PasswordResetToken",
+    "StudentSegment",
+    "StudentSegmentMember",
+    "StorageDeletion",
 ]
@@ -19,7 +19,7 @@ class Announcement(Base):
     icon = Column(String, default="megaphone", nullable=False)  # Icon identifier for frontend
     
     # Target audience filtering
-    target_audience = Column(String, default="all", nullable=False)  # "all", "bucket", "location"
+    target_audience = Column(String, default="all", nullable=False)  # "all", "bucket", "location", "segment"
     target_bucket = Column(String, nullable=True)  # Specific bucket if target_audience = "bucket"
     target_city = Column(String, nullable=True)  # Specific city if target_audience = "location"
     target_state = Column(String, nullable=True)  # Specific state if target_audience = "location"
@@ -27,6 +27,9 @@ class Announcement(Base):
     # New multi-selection fields
     target_program_stages = Column(ARRAY(String), nullable=True)  # Array of program stages
     target_locations = Column(ARRAY(String), nullable=True)       # Array of state codes
+
+    # Saved segment if target_audience = "segment"
+    target_segment_id = Column(UUID(as_uuid=True), ForeignKey("student_segments.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -23,3 +23,10 @@ class Comment(Base):
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
 
+    __table_args__ = (
+        # A post's comment thread in order
+        Index("ix_comments_post_id_created_at", "post_id", "created_at"),
+        # A user's comments (account purge)
+        Index("ix_comments_user_id", "user_id"),
+    )
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,5 +22,7 @@ class Like(Base):
     # Constraints - user can only like a post once
     __table_args__ = (
         UniqueConstraint('post_id', 'user_id', name='unique_post_user_like'),
+        # "Which of these posts did I like" (POST /posts/liked) and likes by user, index-only
+        Index("ix_likes_user_id_post_id", "user_id", "post_id"),
     )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,11 +22,16 @@ class Post(Base):
     comments_count = Column(Integer, default=0, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # Indexed for feed ordering
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     author = relationship("User", back_populates="posts")
-    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
+    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # A user's posts, newest first (profile pages)
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+    )
 
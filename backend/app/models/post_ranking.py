@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Float, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class PostRanking(Base):
+    """Trending score of a recent post (see PostRankingRepository for the formula)"""
+    __tablename__ = "post_rankings"
+
+    post_id = Column(UUID(as_uuid=True), ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+
+    # Copied from the post so trending pages and dish galleries are read from one index
+    featured_dish = Column(String, nullable=True)
+    is_public = Column(Boolean, nullable=False, default=True)
+
+    score = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    post = relationship("Post")
+
+    __table_args__ = (
+        # Admin trending page (all posts)
+        Index("ix_post_rankings_score", "score"),
+        # Student trending page (public posts)
+        Index("ix_post_rankings_is_public_score", "is_public", "score"),
+        # Dish galleries
+        Index("ix_post_rankings_featured_dish_is_public_score", "featured_dish", "is_public", "score"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -26,3 +26,10 @@ class ProgramStatus(Base):
     student = relationship("StudentProfile", back_populates="program_status_history")
     admin = relationship("User", back_populates="program_status_changes")
 
+    __table_args__ = (
+        # A student's timeline in order (and LAG() over it for time-in-bucket); also serves the delete cascade
+        Index("ix_program_statuses_student_id_changed_at", "student_id", "changed_at"),
+        # ON DELETE SET NULL when a user who made changes is purged
+        Index("ix_program_statuses_changed_by", "changed_by"),
+    )
+
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class StorageDeletion(Base):
+    """A storage key (S3 object or local file) waiting to be deleted in a batch"""
+    __tablename__ = "storage_deletions"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    key = Column(String, nullable=False)
+
+    # Failed deletions are retried until MAX_STORAGE_DELETE_ATTEMPTS (app.repositories.storage_deletion)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.now())
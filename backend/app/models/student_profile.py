@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -30,7 +30,7 @@ class StudentProfile(Base):
     
     # Relocation
     willing_to_relocate = Column(String, nullable=True)  # "Yes", "No"
-    relocation_states = Column(ARRAY(String), nullable=True)  # Array of state codes
+    relocation_states = Column(ARRAY(String), nullable=True)  # Array of state codes, GIN indexed for overlap filtering
     
     # Education
     high_school = Column(String, nullable=True)
@@ -53,7 +53,7 @@ class StudentProfile(Base):
     # Availability & Work Preferences
     transportation = Column(String, nullable=True)
     hours_per_week = Column(Integer, nullable=True)
-    availability = Column(ARRAY(String), nullable=True)  # Array of time slots
+    availability = Column(ARRAY(String), nullable=True)  # Array of time slots, GIN indexed for overlap filtering
     weekend_availability = Column(String, nullable=True)  # "Yes", "No"
     ready_to_work = Column(String, nullable=True)  # "Yes", "No"
     available_date = Column(String, nullable=True)
@@ -67,11 +67,15 @@ class StudentProfile(Base):
     servsafe_certificate_url = Column(String, nullable=True)
     
     # Interests/Tags (THE IMPORTANT PART!)
-    interests = Column(ARRAY(String), nullable=True)  # Array of culinary interests
+    interests = Column(ARRAY(String), nullable=True)  # Array of culinary interests, GIN indexed for overlap filtering
     
     # Program Status
     current_bucket = Column(String, default="Pre-Apprentice Explorer", nullable=False, index=True)  # Indexed for filtering
     
+    # Community activity
+    # Denormalized count of the student's posts, kept in sync by PostRepository
+    post_count = Column(Integer, default=0, server_default='0', nullable=False, index=True)  # Indexed for filtering/sorting
+
     # Onboarding Status
     # 0 = onboarding complete
     # 1-6 = current step in onboarding process
@@ -83,6 +87,13 @@ class StudentProfile(Base):
     
     # Relationships
     user = relationship("User", back_populates="student_profile")
-    certifications = relationship("Certification", back_populates="student", cascade="all, delete-orphan")
-    program_status_history = relationship("ProgramStatus", back_populates="student", cascade="all, delete-orphan")
+    certifications = relationship("Certification", back_populates="student", cascade="all, delete-orphan", passive_deletes=True)
+    program_status_history = relationship("ProgramStatus", back_populates="student", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # GIN indexes so multi-select array filters (&&) are index lookups
+        Index("ix_student_profiles_relocation_states", "relocation_states", postgresql_using="gin"),
+        Index("ix_student_profiles_interests", "interests", postgresql_using="gin"),
+        Index("ix_student_profiles_availability", "availability", postgresql_using="gin"),
+    )
 
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import uuid
+from app.core.database import Base
+
+class StudentSegment(Base):
+    """A saved student directory filter whose matching students are materialized"""
+    __tablename__ = "student_segments"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    name = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+
+    # Filter definition (StudentRepository._build_filter_query keyword arguments)
+    filters = Column(JSONB, nullable=False, default=dict)
+
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    # Timestamps
+    refreshed_at = Column(DateTime(timezone=True), nullable=True)  # Last full membership rebuild
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    members = relationship("StudentSegmentMember", back_populates="segment", cascade="all, delete-orphan", passive_deletes=True)
+
+class StudentSegmentMember(Base):
+    """Membership row: student (user) currently matching a segment's filters"""
+    __tablename__ = "student_segment_members"
+
+    segment_id = Column(UUID(as_uuid=True), ForeignKey("student_segments.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)  # Indexed for per-student lookups
+    added_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    segment = relationship("StudentSegment", back_populates="members")
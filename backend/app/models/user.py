@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,13 +22,27 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set when the account is deleted: hidden everywhere, then purged in the background (app.services.user_purge)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     
-    # Relationships
-    student_profile = relationship("StudentProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
-    likes = relationship("Like", back_populates="user", cascade="all, delete-orphan")
-    announcements = relationship("Announcement", back_populates="author")
-    program_status_changes = relationship("ProgramStatus", back_populates="admin")
-    password_reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (passive_deletes: the database's ON DELETE rules remove/nullify dependent rows,
+    # the ORM doesn't load them first)
+    student_profile = relationship("StudentProfile", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    likes = relationship("Like", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    announcements = relationship("Announcement", back_populates="author", passive_deletes=True)
+    program_status_changes = relationship("ProgramStatus", back_populates="admin", passive_deletes=True)
+    password_reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
+    __table_args__ = (
+        # Accounts waiting to be purged (a handful at a time)
+        Index("ix_users_deleted_at", "deleted_at", postgresql_where=deleted_at.isnot(None)),
+        # Keyset pagination of GET /api/admin/users (newest first)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
+    @property
+    def post_count(self) -> int:
+        """Number of posts the student has shared (denormalized on the profile)"""
+        return self.student_profile.post_count if self.student_profile else 0
@@ -5,6 +5,7 @@ from uuid import UUID
 from app.models.announcement import Announcement
 from app.models.user import User
 from app.models.student_profile import StudentProfile
+from app.models.student_segment import StudentSegmentMember
 from app.repositories.base import BaseRepository
 
 
@@ -34,6 +35,21 @@ class AnnouncementRepository(BaseRepository[Announcement]):
             # But we can still return all announcements for them
             return self.get_all_announcements(user)
         
+        return self._student_announcements_query(user).all()
+
+    def get_announcement_versions(self, user: User) -> List[tuple]:
+        """
+        (id, created_at, updated_at) of every announcement the user can see, in
+        display order - enough to tell whether the list changed without loading it
+        """
+        if user.role == "admin":
+            query = self.db.query(Announcement).order_by(Announcement.created_at.desc())
+        else:
+            query = self._student_announcements_query(user)
+        return query.with_entities(Announcement.id, Announcement.created_at, Announcement.updated_at).all()
+
+    def _student_announcements_query(self, user: User):
+        """Query for announcements targeted at a student (see get_announcements_for_student)"""
         # Get the student's profile
         student_profile = self.db.query(StudentProfile).filter(
             StudentProfile.user_id == user.id
@@ -43,7 +59,7 @@ class AnnouncementRepository(BaseRepository[Announcement]):
             # If no profile, only show global announcements
             return self.db.query(Announcement).filter(
                 Announcement.target_audience == "all"
-            ).order_by(Announcement.created_at.desc()).all()
+            ).order_by(Announcement.created_at.desc())
         
         # Build filter conditions
         filters = [
@@ -116,10 +132,21 @@ class AnnouncementRepository(BaseRepository[Announcement]):
                 )
             )
         
+        # 7. Saved segments the student belongs to
+        filters.append(
+            and_(
+                Announcement.target_audience == "segment",
+                Announcement.target_segment_id.in_(
+                    self.db.query(StudentSegmentMember.segment_id)
+                    .filter(StudentSegmentMember.user_id == user.id)
+                )
+            )
+        )
+        
         # Combine all filters with OR
         return self.db.query(Announcement).filter(
             or_(*filters)
-        ).order_by(Announcement.created_at.desc()).all()
+        ).order_by(Announcement.created_at.desc())
 
     def create_announcement(self, user: User, **kwargs) -> Announcement:
         """
@@ -187,7 +214,8 @@ class AnnouncementRepository(BaseRepository[Announcement]):
         query = self.db.query(User).join(
             StudentProfile, User.id == StudentProfile.user_id
         ).filter(
-            User.role == "student"
+            User.role == "student",
+            User.deleted_at.is_(None)
         )
 
         # Apply filters based on announcement targeting
@@ -243,6 +271,15 @@ class AnnouncementRepository(BaseRepository[Announcement]):
                 query = query.filter(or_(*filters))
                 return query.all()
 
+        # 7. Saved segment (primary-key join on the materialized membership)
+        if target_audience == "segment" and announcement.target_segment_id:
+            query = query.join(
+                StudentSegmentMember, StudentSegmentMember.user_id == User.id
+            ).filter(
+                StudentSegmentMember.segment_id == announcement.target_segment_id
+            )
+            return query.all()
+
         # If no valid targeting criteria, return empty list
         return []
 
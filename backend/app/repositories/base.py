@@ -1,12 +1,24 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional, Type, TypeVar, Generic
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, tuple_
+from datetime import datetime
+from typing import List, Optional, Tuple, Type, TypeVar, Generic
 from uuid import UUID
+from app.core.cache import get_cache, model_tags
 from app.models.user import User
 from app.core.security import get_password_hash
 
 T = TypeVar('T')  # Generic type for any model
 
+
+def deleted_user_ids():
+    """
+    Ids of soft-deleted accounts waiting to be purged, for hiding their rows
+    (e.g. Post.user_id.notin_(deleted_user_ids())); a handful at a time, read from ix_users_deleted_at
+    """
+    return select(User.id).where(User.deleted_at.isnot(None))
+
+
 class BaseRepository(Generic[T]):
     def __init__(self, db: Session, model_class: Type[T]):
         self.db = db
@@ -26,6 +38,7 @@ class BaseRepository(Generic[T]):
         self.db.add(item)
         self.db.commit()
         self.db.refresh(item)
+        get_cache().invalidate(*model_tags(self.model_class, item.id))
         return item
 
     def update(self, item_id: UUID, **kwargs) -> Optional[T]:
@@ -40,6 +53,7 @@ class BaseRepository(Generic[T]):
                 
         self.db.commit()
         self.db.refresh(item)
+        get_cache().invalidate(*model_tags(self.model_class, item_id))
         return item
 
     def delete(self, item_id: UUID) -> bool:
@@ -50,8 +64,31 @@ class BaseRepository(Generic[T]):
             
         self.db.delete(item)
         self.db.commit()
+        get_cache().invalidate(*model_tags(self.model_class, item_id))
         return True
 
+class AsyncBaseRepository(Generic[T]):
+    """
+    BaseRepository for an AsyncSession (async def routes)
+    Relationships can't lazy-load in async code: load them eagerly in the query
+    """
+    def __init__(self, db: AsyncSession, model_class: Type[T]):
+        self.db = db
+        self.model_class = model_class
+
+    async def get_by_id(self, item_id: UUID) -> Optional[T]:
+        """Get item by ID"""
+        return await self.db.scalar(select(self.model_class).where(self.model_class.id == item_id))
+
+    async def create(self, **kwargs) -> T:
+        """Create new item"""
+        item = self.model_class(**kwargs)
+        self.db.add(item)
+        await self.db.commit()
+        await self.db.refresh(item)
+        await get_cache().ainvalidate(*model_tags(self.model_class, item.id))
+        return item
+
 class UserRepository(BaseRepository[User]):
     def __init__(self, db: Session):
         super().__init__(db, User)
@@ -66,7 +103,7 @@ class UserRepository(BaseRepository[User]):
 
     def get_all_students(self, limit: Optional[int] = None, offset: int = 0) -> List[User]:
         """Get all users with role 'student'"""
-        query = self.db.query(User).filter(User.role == "student")
+        query = self.db.query(User).filter(User.role == "student", User.deleted_at.is_(None))
         
         if limit is not None:
             query = query.limit(limit).offset(offset)
@@ -75,11 +112,36 @@ class UserRepository(BaseRepository[User]):
     
     def count_students(self) -> int:
         """Count total number of students"""
-        return self.db.query(User).filter(User.role == "student").count()
+        return self.db.query(User).filter(User.role == "student", User.deleted_at.is_(None)).count()
+
+    def _users_query(self, role: Optional[str] = None, is_active: Optional[bool] = None,
+                     after: Optional[Tuple[datetime, UUID]] = None):
+        """Users newest first, ordered by (created_at, id) so a page can resume after any row (keyset)"""
+        query = self.db.query(User).filter(User.deleted_at.is_(None))
+        if role is not None:
+            query = query.filter(User.role == role)
+        if is_active is not None:
+            query = query.filter(User.is_active == is_active)
+        if after is not None:
+            query = query.filter(tuple_(User.created_at, User.id) < after)
+        return query.order_by(User.created_at.desc(), User.id.desc())
+
+    def list_users(self, limit: int, role: Optional[str] = None, is_active: Optional[bool] = None,
+                   after: Optional[Tuple[datetime, UUID]] = None) -> List[User]:
+        """
+        One page of users (admins and students) after the (created_at, id) of the previous page's last row
+        An index range scan on ix_users_created_at_id, however deep the page
+        """
+        return self._users_query(role, is_active, after).limit(limit).all()
+
+    def iter_users(self, columns: list, role: Optional[str] = None, is_active: Optional[bool] = None,
+                   after: Optional[Tuple[datetime, UUID]] = None, batch_size: int = 1000):
+        """Stream the given columns for matching users from a server-side cursor, batch_size rows at a time"""
+        return self._users_query(role, is_active, after).with_entities(*columns).yield_per(batch_size)
 
     def get_all_admins(self) -> List[User]:
         """Get all users with role 'admin'"""
-        return self.db.query(User).filter(User.role == "admin").all()
+        return self.db.query(User).filter(User.role == "admin", User.deleted_at.is_(None)).all()
 
     def create_user(self, email: str, username: str, password: str, role: str = "student") -> User:
         """Create a new user with hashed password"""
@@ -103,7 +165,7 @@ class UserRepository(BaseRepository[User]):
         if admin_user.role != "admin":
             raise PermissionError("Only admins can access student data")
         return self.db.query(User).filter(
-            and_(User.id == student_id, User.role == "student")
+            and_(User.id == student_id, User.role == "student", User.deleted_at.is_(None))
         ).first()
 
     def get_own_profile(self, user_id: UUID, requesting_user: User) -> Optional[User]:
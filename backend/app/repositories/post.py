@@ -1,12 +1,39 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, any_, bindparam, or_, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from typing import List, Optional
 from uuid import UUID
+from app.core import events
 from app.models.post import Post
 from app.models.like import Like
 from app.models.comment import Comment
 from app.models.user import User
-from app.repositories.base import BaseRepository
+from app.models.student_profile import StudentProfile
+from app.repositories.base import AsyncBaseRepository, BaseRepository, deleted_user_ids
+from app.repositories.post_ranking import PostRankingRepository
+from app.repositories.segment import SegmentRepository
+from app.services import feed_cache
+
+
+def _public_post():
+    """Posts visible in the community feed (is_private NULL on older posts counts as public)"""
+    return or_(Post.is_private == False, Post.is_private.is_(None))
+
+
+def _visible_author(user_id_column):
+    """Hide rows of accounts deleted but not yet purged"""
+    return user_id_column.notin_(deleted_user_ids())
+
+
+def _post_count_update(user_id: UUID, delta: int):
+    """Atomically add delta to the author's denormalized post count"""
+    return (
+        update(StudentProfile)
+        .where(StudentProfile.user_id == user_id)
+        .values(post_count=func.greatest(StudentProfile.post_count + delta, 0))
+        .execution_options(synchronize_session=False)
+    )
 
 
 class PostRepository(BaseRepository[Post]):
@@ -18,17 +45,12 @@ class PostRepository(BaseRepository[Post]):
         Get all posts (community feed)
         Students see only public posts from everyone (including NULL values), admins see all posts
         """
-        query = self.db.query(Post)
+        query = self.db.query(Post).options(selectinload(Post.author)).filter(_visible_author(Post.user_id))
         
         # Filter based on user role
         if user_role == "student":
             # Students see only public posts in community feed (is_private = False OR is_private = NULL)
-            query = query.filter(
-                or_(
-                    Post.is_private == False,  # Public posts
-                    Post.is_private.is_(None)  # Existing posts with NULL values (treated as public)
-                )
-            )
+            query = query.filter(_public_post())
         
         query = query.order_by(Post.created_at.desc())
         
@@ -42,18 +64,15 @@ class PostRepository(BaseRepository[Post]):
         Get all posts by a specific user
         Students see public posts + their own private posts from that user (including NULL values), admins see all posts
         """
-        query = self.db.query(Post).filter(Post.user_id == user_id)
+        query = (
+            self.db.query(Post).options(selectinload(Post.author))
+            .filter(Post.user_id == user_id, _visible_author(Post.user_id))
+        )
         
         # Filter based on user role
         if user_role == "student":
             # Students see public posts OR their own private posts
-            query = query.filter(
-                or_(
-                    Post.is_private == False,  # Public posts
-                    Post.is_private.is_(None),  # Existing posts with NULL values (treated as public)
-                    Post.user_id == current_user_id  # Own private posts
-                )
-            )
+            query = query.filter(or_(_public_post(), Post.user_id == current_user_id))
         
         query = query.order_by(Post.created_at.desc())
         
@@ -62,6 +81,16 @@ class PostRepository(BaseRepository[Post]):
         
         return query.all()
 
+    def get_feed_page(self, limit: Optional[int] = None, offset: int = 0, user_role: str = "student") -> Optional[bytes]:
+        """
+        Serialized feed page (JSON array of PostResponse) from the hot feed cache
+        None when the page is outside the cached window: use get_all_posts
+        """
+        return feed_cache.get_page(user_role, limit, offset, self._feed_window)
+
+    def _feed_window(self, view: str) -> List[Post]:
+        return self.get_all_posts(limit=feed_cache.FEED_CACHE_POSTS, user_role=view)
+
     def create_post(self, user: User, image_url: str, caption: Optional[str] = None, 
                     featured_dish: Optional[str] = None, is_private: bool = False) -> Post:
         """
@@ -72,22 +101,35 @@ class PostRepository(BaseRepository[Post]):
             raise PermissionError("Only students can create posts")
         
         # Create the post with the user's ID
-        post = self.create(
+        post = Post(
             user_id=user.id,
             image_url=image_url,
             caption=caption,
             featured_dish=featured_dish,
             is_private=is_private
         )
-        
+        self.db.add(post)
+
+        # Keep the author's post count in sync (same transaction)
+        self._adjust_post_count(user.id, 1)
+        self.db.flush()  # Assigns post.id
+        PostRankingRepository(self.db).update_posts([post.id])
+
+        self.db.commit()
+        self.db.refresh(post)
+        feed_cache.refresh(self._feed_window)
         return post
 
+    def get_visible_post(self, post_id: UUID) -> Optional[Post]:
+        """Get a post by ID unless its author's account was deleted (hidden until purged)"""
+        return self.db.query(Post).filter(Post.id == post_id, _visible_author(Post.user_id)).first()
+
     def update_post(self, post_id: UUID, user: User, **kwargs) -> Optional[Post]:
         """
         Update a post
         Only the post owner can update their own post
         """
-        post = self.get_by_id(post_id)
+        post = self.get_visible_post(post_id)
         
         if not post:
             return None
@@ -96,14 +138,19 @@ class PostRepository(BaseRepository[Post]):
         if post.user_id != user.id:
             raise PermissionError("You can only edit your own posts")
         
-        return self.update(post_id, **kwargs)
+        post = self.update(post_id, **kwargs)
+        # Dish and visibility are copied into the ranking
+        PostRankingRepository(self.db).update_posts([post_id])
+        self.db.commit()
+        feed_cache.refresh(self._feed_window)
+        return post
 
     def delete_post(self, post_id: UUID, user: User) -> bool:
         """
         Delete a post
         Only the post owner can delete their own post
         """
-        post = self.get_by_id(post_id)
+        post = self.get_visible_post(post_id)
         
         if not post:
             return False
@@ -112,7 +159,29 @@ class PostRepository(BaseRepository[Post]):
         if post.user_id != user.id:
             raise PermissionError("You can only delete your own posts")
         
-        return self.delete(post_id)
+        self.db.delete(post)
+
+        # Keep the author's post count in sync (same transaction)
+        self._adjust_post_count(post.user_id, -1)
+
+        self.db.commit()
+        feed_cache.refresh(self._feed_window)
+        return True
+
+    def _adjust_post_count(self, user_id: UUID, delta: int) -> None:
+        """Atomically add delta to the author's denormalized post count (no commit)"""
+        self.db.execute(_post_count_update(user_id, delta))
+        # Segments filtering on has_posts depend on the count
+        SegmentRepository(self.db).refresh_students([user_id], ["post_count"])
+
+    def _counts_changed(self, post: Post) -> None:
+        """Push a post's new likes/comments counts to the feed cache and live streams (after the commit)"""
+        feed_cache.patch_post(post)
+        events.publish(
+            "post.counts",
+            {"post_id": str(post.id), "likes_count": post.likes_count, "comments_count": post.comments_count},
+            admin_only=bool(post.is_private)
+        )
 
     def like_post(self, post_id: UUID, user: User) -> Like:
         """
@@ -120,7 +189,7 @@ class PostRepository(BaseRepository[Post]):
         Everyone can like posts (creates a like record)
         """
         # Check if post exists
-        post = self.get_by_id(post_id)
+        post = self.get_visible_post(post_id)
         if not post:
             raise ValueError("Post not found")
         
@@ -138,9 +207,11 @@ class PostRepository(BaseRepository[Post]):
         
         # Increment likes count
         post.likes_count += 1
+        PostRankingRepository(self.db).update_posts([post_id])
         
         self.db.commit()
         self.db.refresh(like)
+        self._counts_changed(post)
         return like
 
     def unlike_post(self, post_id: UUID, user: User) -> bool:
@@ -149,7 +220,7 @@ class PostRepository(BaseRepository[Post]):
         Everyone can unlike posts they've liked
         """
         # Check if post exists
-        post = self.get_by_id(post_id)
+        post = self.get_visible_post(post_id)
         if not post:
             raise ValueError("Post not found")
         
@@ -166,8 +237,10 @@ class PostRepository(BaseRepository[Post]):
         
         # Decrement likes count
         post.likes_count = max(0, post.likes_count - 1)
+        PostRankingRepository(self.db).update_posts([post_id])
         
         self.db.commit()
+        self._counts_changed(post)
         return True
 
     def check_if_liked(self, post_id: UUID, user: User) -> bool:
@@ -180,6 +253,18 @@ class PostRepository(BaseRepository[Post]):
         
         return like is not None
 
+    def get_liked_post_ids(self, post_ids: List[UUID], user: User) -> List[UUID]:
+        """
+        Which of post_ids the user has liked, in one query
+        One statement for any number of ids (= ANY(array)), answered from ix_likes_user_id_post_id
+        """
+        if not post_ids:
+            return []
+        ids = bindparam("post_ids", list(set(post_ids)), type_=ARRAY(PG_UUID(as_uuid=True)))
+        return list(self.db.scalars(
+            select(Like.post_id).where(Like.user_id == user.id, Like.post_id == any_(ids))
+        ))
+
     def add_comment(self, post_id: UUID, user: User, content: str) -> Comment:
         """
         Add a comment to a post
@@ -190,7 +275,7 @@ class PostRepository(BaseRepository[Post]):
             raise PermissionError("Only students can comment on posts")
         
         # Check if post exists
-        post = self.get_by_id(post_id)
+        post = self.get_visible_post(post_id)
         if not post:
             raise ValueError("Post not found")
         
@@ -204,9 +289,11 @@ class PostRepository(BaseRepository[Post]):
         
         # Increment comments count
         post.comments_count += 1
+        PostRankingRepository(self.db).update_posts([post_id])
         
         self.db.commit()
         self.db.refresh(comment)
+        self._counts_changed(post)
         return comment
 
     def get_comments_for_post(self, post_id: UUID) -> List[Comment]:
@@ -215,7 +302,8 @@ class PostRepository(BaseRepository[Post]):
         Everyone can view comments
         """
         return self.db.query(Comment).filter(
-            Comment.post_id == post_id
+            Comment.post_id == post_id,
+            _visible_author(Comment.user_id)
         ).order_by(Comment.created_at.asc()).all()
 
     def delete_comment(self, comment_id: UUID, user: User) -> bool:
@@ -232,12 +320,47 @@ class PostRepository(BaseRepository[Post]):
         if comment.user_id != user.id:
             raise PermissionError("You can only delete your own comments")
         
-        # Get the post to decrement count
-        post = self.get_by_id(comment.post_id)
-        if post:
-            post.comments_count = max(0, post.comments_count - 1)
+        # Get the post to decrement count (hidden with its deleted author: the purge removes the comment)
+        post = self.get_visible_post(comment.post_id)
+        if not post:
+            return False
+        post.comments_count = max(0, post.comments_count - 1)
         
         self.db.delete(comment)
+        PostRankingRepository(self.db).update_posts([comment.post_id])
         self.db.commit()
+        self._counts_changed(post)
         return True
 
+
+class AsyncPostRepository(AsyncBaseRepository[Post]):
+    """PostRepository for an AsyncSession (async def routes); authors are loaded eagerly"""
+    def __init__(self, db: AsyncSession):
+        super().__init__(db, Post)
+
+    async def create_post(self, user: User, image_url: str, caption: Optional[str] = None,
+                          featured_dish: Optional[str] = None, is_private: bool = False) -> Post:
+        """Create a new post - only students can create posts (for themselves)"""
+        if user.role != "student":
+            raise PermissionError("Only students can create posts")
+
+        post = Post(
+            user_id=user.id,
+            image_url=image_url,
+            caption=caption,
+            featured_dish=featured_dish,
+            is_private=is_private
+        )
+        self.db.add(post)
+
+        # Keep the author's post count and has_posts segments in sync (same transaction)
+        await self.db.execute(_post_count_update(user.id, 1))
+        await self.db.run_sync(lambda db: SegmentRepository(db).refresh_students([user.id], ["post_count"]))
+        await self.db.flush()  # Assigns post.id
+        await self.db.run_sync(lambda db: PostRankingRepository(db).update_posts([post.id]))
+
+        await self.db.commit()
+        await self.db.refresh(post)
+        await self.db.refresh(post, ["author"])
+        await self.db.run_sync(lambda db: feed_cache.refresh(PostRepository(db)._feed_window))
+        return post
@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Float, cast, delete, extract, func, select
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from uuid import UUID
+import os
+from app.models.post import Post
+from app.models.post_ranking import PostRanking
+from app.repositories.base import deleted_user_ids
+
+# Each TRENDING_DECAY_HOURS of age costs a post a factor of 10 in engagement
+TRENDING_DECAY_HOURS = float(os.getenv("TRENDING_DECAY_HOURS", "12"))
+# Only posts this recent are ranked (trending pages and dish galleries)
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", "90"))
+# A comment counts as much as this many likes
+COMMENT_WEIGHT = 2
+
+# pg_try_advisory_xact_lock key: one full refresh at a time across workers
+_REFRESH_LOCK_ID = 4_510_201
+
+
+def _score():
+    """
+    log10(1 + likes + COMMENT_WEIGHT * comments) + created_at (epoch) / decay
+
+    Newer posts get a constant head start instead of older posts losing points
+    over time, so a score only changes when the post's counters do: rows are
+    updated from like/comment writes and trending is an index scan on score.
+    """
+    engagement = cast(1 + Post.likes_count + COMMENT_WEIGHT * Post.comments_count, Float)
+    age_bonus = cast(extract("epoch", Post.created_at), Float) / (TRENDING_DECAY_HOURS * 3600)
+    return func.log(engagement) + age_bonus
+
+
+def _window_start() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=TRENDING_WINDOW_DAYS)
+
+
+class PostRankingRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _upsert(self, *criteria) -> int:
+        """(Re)score the posts matching criteria; returns the number of rankings that changed"""
+        rows = select(
+            Post.id,
+            Post.featured_dish,
+            # NULL is_private counts as public (see post._public_post)
+            ~func.coalesce(Post.is_private, False),
+            _score()
+        ).where(Post.created_at >= _window_start(), Post.user_id.notin_(deleted_user_ids()), *criteria)
+        stmt = insert(PostRanking).from_select(["post_id", "featured_dish", "is_public", "score"], rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostRanking.post_id],
+            set_={
+                "featured_dish": stmt.excluded.featured_dish,
+                "is_public": stmt.excluded.is_public,
+                "score": stmt.excluded.score,
+                "updated_at": func.now(),
+            },
+            # Skip unchanged rows: a full refresh then only writes what drifted
+            where=(
+                PostRanking.score.is_distinct_from(stmt.excluded.score)
+                | PostRanking.is_public.is_distinct_from(stmt.excluded.is_public)
+                | PostRanking.featured_dish.is_distinct_from(stmt.excluded.featured_dish)
+            )
+        )
+        return self.db.execute(stmt).rowcount
+
+    def update_posts(self, post_ids: Iterable[UUID]) -> None:
+        """
+        Re-score posts after their likes/comments, dish or visibility changed
+        Runs in the caller's transaction (flushes, no commit)
+        """
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        self.db.flush()
+        self._upsert(Post.id.in_(post_ids))
+
+    def refresh(self) -> Optional[int]:
+        """
+        Recompute every ranking from the posts table and drop posts that aged out
+        of the window. Returns the number of rankings added or changed, or None if
+        another worker is refreshing already. Commits.
+        """
+        locked = self.db.execute(select(func.pg_try_advisory_xact_lock(_REFRESH_LOCK_ID))).scalar()
+        if not locked:
+            self.db.rollback()
+            return None
+
+        self.db.execute(
+            delete(PostRanking)
+            .where(PostRanking.post_id == Post.id, Post.created_at < _window_start())
+            .execution_options(synchronize_session=False)
+        )
+        changed = self._upsert()
+        self.db.commit()
+        return changed
+
+    def get_trending(self, limit: int = 50, offset: int = 0, user_role: str = "student",
+                     featured_dish: Optional[str] = None) -> List[Post]:
+        """
+        Highest-scoring recent posts, optionally for one featured dish
+        Students see only public posts, admins see all posts
+        """
+        query = (
+            self.db.query(Post)
+            .join(PostRanking, PostRanking.post_id == Post.id)
+            .options(selectinload(Post.author))
+        )
+        if user_role == "student":
+            query = query.filter(PostRanking.is_public == True)
+        if featured_dish is not None:
+            query = query.filter(PostRanking.featured_dish == featured_dish)
+
+        return query.order_by(PostRanking.score.desc()).limit(limit).offset(offset).all()
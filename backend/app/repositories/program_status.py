@@ -0,0 +1,100 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import extract, func, insert, select
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+from app.models.program_status import ProgramStatus
+from app.models.student_profile import StudentProfile
+from app.repositories.base import deleted_user_ids
+
+# Ways to group students for transition analytics (cohort name -> expression)
+COHORTS = {
+    "signup_year": func.to_char(StudentProfile.created_at, "YYYY"),
+    "signup_month": func.to_char(StudentProfile.created_at, "YYYY-MM"),
+    "graduation_year": StudentProfile.graduation_year,
+    "ccap_connection": StudentProfile.ccap_connection,
+    "state": StudentProfile.state,
+}
+
+SECONDS_PER_DAY = 86400
+
+
+def _median_days(interval):
+    return func.percentile_cont(0.5).within_group(extract("epoch", interval)) / SECONDS_PER_DAY
+
+
+class ProgramStatusRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, changes: Iterable[Tuple[UUID, str]], new_status: str,
+               changed_by: Optional[UUID] = None, notes: Optional[str] = None) -> None:
+        """
+        Record bucket changes, (student profile id, old status) -> new_status, in one insert
+        Runs in the caller's transaction (no commit)
+        """
+        rows = [
+            {"student_id": profile_id, "old_status": old_status, "new_status": new_status,
+             "changed_by": changed_by, "notes": notes}
+            for profile_id, old_status in changes
+        ]
+        if rows:
+            self.db.execute(insert(ProgramStatus), rows)
+
+    def get_timeline(self, student_id: UUID) -> List[ProgramStatus]:
+        """A student's bucket changes, oldest first (index scan on student_id, changed_at)"""
+        return (
+            self.db.query(ProgramStatus)
+            .join(StudentProfile, StudentProfile.id == ProgramStatus.student_id)
+            .filter(StudentProfile.user_id == student_id)
+            .order_by(ProgramStatus.changed_at)
+            .all()
+        )
+
+    def get_analytics(self, cohort_by: str = "signup_year") -> dict:
+        """
+        Transition counts and median time-in-bucket per cohort, aggregated in SQL
+
+        Every change ends a stay in its old_status that began at the student's
+        previous change, or when their profile was created for the first one
+        (LAG over each student's timeline). Stays in a student's current bucket
+        haven't ended yet and aren't counted.
+        """
+        previous_change = func.lag(ProgramStatus.changed_at).over(
+            partition_by=ProgramStatus.student_id, order_by=ProgramStatus.changed_at
+        )
+        stays = (
+            select(
+                COHORTS[cohort_by].label("cohort"),
+                ProgramStatus.old_status,
+                ProgramStatus.new_status,
+                (ProgramStatus.changed_at - func.coalesce(previous_change, StudentProfile.created_at)).label("duration"),
+            )
+            .join(StudentProfile, StudentProfile.id == ProgramStatus.student_id)
+            .where(StudentProfile.user_id.notin_(deleted_user_ids()))
+            .cte("stays")
+        )
+
+        transitions = self.db.execute(
+            select(
+                stays.c.cohort,
+                stays.c.old_status,
+                stays.c.new_status,
+                func.count().label("count"),
+                _median_days(stays.c.duration).label("median_days_before"),
+            )
+            .group_by(stays.c.cohort, stays.c.old_status, stays.c.new_status)
+            .order_by(stays.c.cohort, stays.c.old_status, func.count().desc())
+        ).mappings().all()
+
+        time_in_status = self.db.execute(
+            select(
+                stays.c.cohort,
+                stays.c.old_status.label("status"),
+                func.count().label("stays"),
+                _median_days(stays.c.duration).label("median_days"),
+            )
+            .group_by(stays.c.cohort, stays.c.old_status)
+            .order_by(stays.c.cohort, stays.c.old_status)
+        ).mappings().all()
+
+        return {"cohort_by": cohort_by, "transitions": transitions, "time_in_status": time_in_status}
@@ -0,0 +1,203 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, literal, delete
+from sqlalchemy.dialects.postgresql import insert
+from typing import Iterable, List, Optional
+from uuid import UUID
+from app.models.student_segment import StudentSegment, StudentSegmentMember
+from app.models.student_profile import StudentProfile
+from app.models.user import User
+from app.repositories.base import BaseRepository
+from app.repositories.student import StudentRepository
+
+# Segment filter -> StudentProfile fields it reads (decides which segments a profile change can affect)
+FILTER_FIELDS = {
+    "search": {"first_name", "last_name", "high_school"},
+    "graduation_year": {"graduation_year"},
+    "states": {"state"},
+    "relocation_states": {"relocation_states"},
+    "interests": {"interests"},
+    "availability": {"availability"},
+    "buckets": {"current_bucket"},
+    "ccap_connections": {"ccap_connection"},
+    "has_resume": {"has_resume"},
+    "currently_working": {"currently_employed"},
+    "food_handlers": {"has_food_handlers_card"},
+    "servsafe": {"has_servsafe"},
+    "will_relocate": {"willing_to_relocate"},
+    "ready_to_work": {"ready_to_work"},
+    "onboarding_step": {"onboarding_step"},
+    "onboarding_complete": {"onboarding_step"},
+    "has_posts": {"post_count"},
+}
+
+
+def _active_filters(filters: dict) -> dict:
+    """Drop unset filters so they don't count as dependencies"""
+    return {key: value for key, value in (filters or {}).items() if value not in (None, "", [])}
+
+
+class SegmentRepository(BaseRepository[StudentSegment]):
+    def __init__(self, db: Session):
+        super().__init__(db, StudentSegment)
+        self.student_repo = StudentRepository(db)
+
+    def _matching_ids_query(self, segment: StudentSegment):
+        """Select user ids of students matching the segment's filters"""
+        return self.student_repo._build_filter_query(**_active_filters(segment.filters)).with_entities(User.id)
+
+    def _annotate_member_counts(self, segments: List[StudentSegment]) -> None:
+        """Attach a member_count attribute to each segment (single grouped query)"""
+        if not segments:
+            return
+        counts = dict(
+            self.db.query(StudentSegmentMember.segment_id, func.count())
+            .filter(StudentSegmentMember.segment_id.in_([s.id for s in segments]))
+            .group_by(StudentSegmentMember.segment_id)
+            .all()
+        )
+        for segment in segments:
+            segment.member_count = counts.get(segment.id, 0)
+
+    def get_segments(self, user: User) -> List[StudentSegment]:
+        """Get all saved segments with member counts - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can view segments")
+
+        segments = self.db.query(StudentSegment).order_by(StudentSegment.name).all()
+        self._annotate_member_counts(segments)
+        return segments
+
+    def get_segment(self, segment_id: UUID, user: User) -> Optional[StudentSegment]:
+        """Get a saved segment with its member count - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can view segments")
+
+        segment = self.get_by_id(segment_id)
+        if segment:
+            self._annotate_member_counts([segment])
+        return segment
+
+    def create_segment(self, user: User, name: str, filters: dict, description: Optional[str] = None) -> StudentSegment:
+        """Save a filter definition and materialize its membership - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can create segments")
+
+        segment = StudentSegment(name=name, description=description, filters=filters, created_by=user.id)
+        self.db.add(segment)
+        self.db.flush()
+        self._rebuild_members(segment)
+        self.db.commit()
+        self.db.refresh(segment)
+        self._annotate_member_counts([segment])
+        return segment
+
+    def update_segment(self, segment_id: UUID, user: User, **kwargs) -> Optional[StudentSegment]:
+        """Update a segment; membership is rebuilt when the filters change - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can update segments")
+
+        segment = self.get_by_id(segment_id)
+        if not segment:
+            return None
+
+        for field, value in kwargs.items():
+            setattr(segment, field, value)
+
+        if "filters" in kwargs:
+            self.db.flush()
+            self._rebuild_members(segment)
+
+        self.db.commit()
+        self.db.refresh(segment)
+        self._annotate_member_counts([segment])
+        return segment
+
+    def delete_segment(self, segment_id: UUID, user: User) -> bool:
+        """Delete a segment (membership rows cascade in the database) - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can delete segments")
+
+        return self.delete(segment_id)
+
+    def refresh_segment(self, segment_id: UUID, user: User) -> Optional[StudentSegment]:
+        """Recompute a segment's membership from scratch - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can refresh segments")
+
+        segment = self.get_by_id(segment_id)
+        if not segment:
+            return None
+
+        self._rebuild_members(segment)
+        self.db.commit()
+        self.db.refresh(segment)
+        self._annotate_member_counts([segment])
+        return segment
+
+    def _rebuild_members(self, segment: StudentSegment) -> None:
+        """Replace all membership rows with one INSERT ... SELECT (no commit)"""
+        self.db.execute(delete(StudentSegmentMember).where(StudentSegmentMember.segment_id == segment.id))
+        matching = self._matching_ids_query(segment).subquery()
+        self.db.execute(
+            insert(StudentSegmentMember).from_select(
+                ["segment_id", "user_id"],
+                select(literal(segment.id, StudentSegmentMember.segment_id.type), matching.c.id)
+            )
+        )
+        segment.refreshed_at = func.now()
+
+    def get_members(self, segment_id: UUID, user: User, limit: Optional[int] = None, offset: int = 0) -> List[User]:
+        """Get students in a segment by primary-key join on the membership table - admin only"""
+        if user.role != "admin":
+            raise PermissionError("Only admins can view segments")
+
+        query = (
+            self.db.query(User)
+            .join(StudentSegmentMember, StudentSegmentMember.user_id == User.id)
+            .join(StudentProfile, StudentProfile.user_id == User.id)
+            .filter(StudentSegmentMember.segment_id == segment_id)
+            .order_by(StudentProfile.created_at.desc())
+        )
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+        return query.all()
+
+    def count_members(self, segment_id: UUID) -> int:
+        """Count students in a segment"""
+        return self.db.query(StudentSegmentMember).filter(StudentSegmentMember.segment_id == segment_id).count()
+
+    def refresh_students(self, user_ids: Iterable[UUID], changed_fields: Iterable[str]) -> None:
+        """
+        Incrementally update membership for students whose profiles changed (no commit).
+
+        Only segments whose filters read one of the changed fields are re-evaluated,
+        and only for the given students: one SELECT picks the ones that still match,
+        then non-matching rows are deleted and new matches inserted.
+        """
+        user_ids = list(user_ids)
+        changed_fields = set(changed_fields)
+        if not user_ids or not changed_fields:
+            return
+
+        for segment in self.db.query(StudentSegment).all():
+            filters = _active_filters(segment.filters)
+            dependencies = set().union(*(FILTER_FIELDS.get(key, set()) for key in filters)) if filters else set()
+            if not dependencies & changed_fields:
+                continue
+
+            matching = {
+                row[0] for row in self._matching_ids_query(segment).filter(User.id.in_(user_ids)).all()
+            }
+
+            self.db.execute(
+                delete(StudentSegmentMember).where(
+                    StudentSegmentMember.segment_id == segment.id,
+                    StudentSegmentMember.user_id.in_([uid for uid in user_ids if uid not in matching])
+                )
+            )
+            if matching:
+                self.db.execute(
+                    insert(StudentSegmentMember)
+                    .values([{"segment_id": segment.id, "user_id": uid} for uid in matching])
+                    .on_conflict_do_nothing()
+                )
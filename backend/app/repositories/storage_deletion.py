@@ -0,0 +1,77 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, select, update
+from typing import Iterable, Optional
+import logging
+from app.models.storage_deletion import StorageDeletion
+from app.utils.storage import DELETE_BATCH_SIZE, StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+# Keys that failed this many times are left in the table for someone to look at
+MAX_STORAGE_DELETE_ATTEMPTS = 5
+
+
+def storage_key(value: Optional[str]) -> Optional[str]:
+    """Storage key for a stored file column: public files are saved as URLs, private ones as keys"""
+    if not value:
+        return None
+    if value.startswith(("public/", "private/")):
+        return value
+    return get_storage().key_from_url(value)
+
+
+class StorageDeletionRepository:
+    """Queue of storage keys to delete in batches (files of purged accounts)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, keys: Iterable[Optional[str]]) -> int:
+        """Queue keys for deletion in the caller's transaction (no commit); returns how many were queued"""
+        rows = [{"key": key} for key in dict.fromkeys(keys) if key]
+        if rows:
+            self.db.execute(insert(StorageDeletion), rows)
+        return len(rows)
+
+    def process_batch(self, storage: Optional[StorageBackend] = None, batch_size: int = DELETE_BATCH_SIZE) -> int:
+        """
+        Delete up to batch_size queued keys with one storage call and commit
+        Returns the number of queue rows taken (0 when the queue is empty). Rows are
+        locked with SKIP LOCKED, so several workers can drain the queue at once.
+        """
+        storage = storage or get_storage()
+        rows = self.db.execute(
+            select(StorageDeletion.id, StorageDeletion.key)
+            .where(StorageDeletion.attempts < MAX_STORAGE_DELETE_ATTEMPTS)
+            .order_by(StorageDeletion.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            self.db.rollback()
+            return 0
+
+        errors = storage.delete_many([row.key for row in rows])
+        done = [row.id for row in rows if row.key not in errors]
+        if done:
+            self.db.execute(delete(StorageDeletion).where(StorageDeletion.id.in_(done)))
+        for row in rows:
+            if row.key in errors:
+                self.db.execute(
+                    update(StorageDeletion)
+                    .where(StorageDeletion.id == row.id)
+                    .values(attempts=StorageDeletion.attempts + 1, last_error=errors[row.key])
+                )
+        self.db.commit()
+        if errors:
+            logger.warning("Could not delete %d of %d storage keys, will retry", len(errors), len(rows))
+        return len(rows)
+
+    def process_all(self, storage: Optional[StorageBackend] = None) -> int:
+        """Drain the queue batch by batch; returns the number of rows processed"""
+        total = 0
+        while batch := self.process_batch(storage):
+            total += batch
+            if batch < DELETE_BATCH_SIZE:
+                break
+        return total
@@ -1,13 +1,180 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from typing import List, Optional
+from sqlalchemy.orm import Session, contains_eager, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, select, update
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
+import os
+from app.core.cache import cached, model_tags
 from app.models.user import User
+from app.models.program_status import ProgramStatus
 from app.models.student_profile import StudentProfile
-from app.models.post import Post
 from app.schemas.student_profile import StudentProfileCreate, StudentProfileUpdate
 from app.schemas.user import UserCreate
 from app.repositories.base import UserRepository
+from app.repositories.program_status import ProgramStatusRepository
+from app.repositories.user_purge import UserPurgeRepository
+
+# Directory filter dimensions that get per-option counts (facet name -> column)
+FACET_DIMENSIONS = {
+    "state": StudentProfile.state,
+    "bucket": StudentProfile.current_bucket,
+    "ccap_connection": StudentProfile.ccap_connection,
+    "graduation_year": StudentProfile.graduation_year,
+    "has_resume": StudentProfile.has_resume,
+    "servsafe": StudentProfile.has_servsafe,
+    "food_handlers": StudentProfile.has_food_handlers_card,
+    "will_relocate": StudentProfile.willing_to_relocate,
+    "ready_to_work": StudentProfile.ready_to_work,
+}
+
+# Facet counts are cached briefly per filter combination
+FACET_CACHE_TTL = float(os.getenv("FACET_CACHE_TTL", "30"))
+
+
+def _status_change(profile: StudentProfile, old_bucket: str, changed_by: Optional[UUID]) -> ProgramStatus:
+    """History row for a profile whose current_bucket was just changed from old_bucket"""
+    return ProgramStatus(
+        student_id=profile.id, old_status=old_bucket, new_status=profile.current_bucket, changed_by=changed_by
+    )
+
+
+def _normalize_filters(filters: dict) -> tuple:
+    """Hashable, order-independent representation of a filter set"""
+    return tuple(sorted(
+        (key, tuple(sorted(value)) if isinstance(value, list) else value)
+        for key, value in filters.items()
+        if value not in (None, "", [])
+    ))
+
+
+def _with_profile_fields(query, profile_fields: Optional[Sequence[str]] = None):
+    """
+    Populate User.student_profile from the already-joined profile row.
+    With profile_fields, only those profile columns (plus the ones every
+    response needs) are selected; None loads the full profile.
+    """
+    profile_option = contains_eager(User.student_profile)
+    if profile_fields is None:
+        return query.options(profile_option)
+
+    columns = set(profile_fields) | {"id", "user_id", "post_count"}
+    return query.options(
+        load_only(User.id, User.email, User.username, User.role, User.is_active, User.created_at),
+        profile_option.load_only(*[getattr(StudentProfile, name) for name in columns])
+    )
+
+
+def _search_criterion(search: str):
+    """Case-insensitive substring match on email, username, name and school"""
+    search_term = f"%{search.lower()}%"
+    return or_(
+        User.email.ilike(search_term),
+        User.username.ilike(search_term),
+        StudentProfile.first_name.ilike(search_term),
+        StudentProfile.last_name.ilike(search_term),
+        StudentProfile.high_school.ilike(search_term)
+    )
+
+
+def _student_filter_criteria(
+        search: Optional[str] = None,
+        graduation_year: Optional[str] = None,
+        states: Optional[List[str]] = None,
+        relocation_states: Optional[List[str]] = None,
+        interests: Optional[List[str]] = None,
+        availability: Optional[List[str]] = None,
+        buckets: Optional[List[str]] = None,
+        ccap_connections: Optional[List[str]] = None,
+        has_resume: Optional[str] = None,
+        currently_working: Optional[str] = None,
+        food_handlers: Optional[str] = None,
+        servsafe: Optional[str] = None,
+        will_relocate: Optional[str] = None,
+        ready_to_work: Optional[str] = None,
+        onboarding_step: Optional[int] = None,
+        onboarding_complete: Optional[bool] = None,
+        has_posts: Optional[str] = None):
+    """
+    WHERE criteria for the student directory filters, on User joined to StudentProfile.
+    Shared by the sync and async repositories (and saved segments)
+    """
+    criteria = []
+
+    # Search filter
+    if search:
+        criteria.append(_search_criterion(search))
+    
+    # Graduation year filter
+    if graduation_year:
+        criteria.append(StudentProfile.graduation_year == graduation_year)
+    
+    # State filter (multiple states)
+    if states:
+        criteria.append(StudentProfile.state.in_(states))
+    
+    # Relocation states filter (array overlaps any selected state, GIN indexed)
+    if relocation_states:
+        criteria.append(StudentProfile.relocation_states.overlap(relocation_states))
+
+    # Interests filter (array overlaps any selected interest, GIN indexed)
+    if interests:
+        criteria.append(StudentProfile.interests.overlap(interests))
+
+    # Availability filter (array overlaps any selected time slot, GIN indexed)
+    if availability:
+        criteria.append(StudentProfile.availability.overlap(availability))
+    
+    # Bucket filter (multiple buckets)
+    if buckets:
+        criteria.append(StudentProfile.current_bucket.in_(buckets))
+    
+    # C•CAP Connection filter (multiple connections)
+    if ccap_connections:
+        criteria.append(StudentProfile.ccap_connection.in_(ccap_connections))
+    
+    # Has resume filter
+    if has_resume:
+        criteria.append(StudentProfile.has_resume == has_resume)
+    
+    # Currently working filter
+    if currently_working:
+        criteria.append(StudentProfile.currently_employed == currently_working)
+    
+    # Food handlers filter
+    if food_handlers:
+        criteria.append(StudentProfile.has_food_handlers_card == food_handlers)
+    
+    # ServSafe filter
+    if servsafe:
+        criteria.append(StudentProfile.has_servsafe == servsafe)
+    
+    # Will relocate filter
+    if will_relocate:
+        criteria.append(StudentProfile.willing_to_relocate == will_relocate)
+    
+    # Ready to work filter
+    if ready_to_work:
+        criteria.append(StudentProfile.ready_to_work == ready_to_work)
+    
+    # Onboarding step filter
+    if onboarding_step is not None:
+        criteria.append(StudentProfile.onboarding_step == onboarding_step)
+    
+    # Onboarding complete filter
+    if onboarding_complete is not None:
+        if onboarding_complete:
+            criteria.append(StudentProfile.onboarding_step == 0)
+        else:
+            criteria.append(StudentProfile.onboarding_step > 0)
+
+    # Has posts (cooking photos) filter
+    if has_posts == "Yes":
+        criteria.append(StudentProfile.post_count > 0)
+    elif has_posts == "No":
+        criteria.append(StudentProfile.post_count == 0)
+
+    return criteria
+
 
 class StudentRepository:
     def __init__(self, db: Session):
@@ -24,106 +191,10 @@ class StudentRepository:
             raise PermissionError("Only admins can count all students")
         return self.user_repo.count_students()
     
-    def _build_filter_query(self, 
-                           search: Optional[str] = None,
-                           graduation_year: Optional[str] = None,
-                           states: Optional[List[str]] = None,
-                           relocation_states: Optional[List[str]] = None,
-                           buckets: Optional[List[str]] = None,
-                           ccap_connections: Optional[List[str]] = None,
-                           has_resume: Optional[str] = None,
-                           currently_working: Optional[str] = None,
-                           food_handlers: Optional[str] = None,
-                           servsafe: Optional[str] = None,
-                           will_relocate: Optional[str] = None,
-                           ready_to_work: Optional[str] = None,
-                           onboarding_step: Optional[int] = None,
-                           onboarding_complete: Optional[bool] = None,
-                           has_posts: Optional[str] = None):
-        """Build a filtered query for students"""
+    def _build_filter_query(self, **filters):
+        """Build a filtered query for students (filters: see _student_filter_criteria)"""
         query = self.db.query(User).join(StudentProfile, User.id == StudentProfile.user_id)
-        query = query.filter(User.role == "student")
-        
-        # Search filter
-        if search:
-            search_term = f"%{search.lower()}%"
-            query = query.filter(
-                or_(
-                    User.email.ilike(search_term),
-                    User.username.ilike(search_term),
-                    StudentProfile.first_name.ilike(search_term),
-                    StudentProfile.last_name.ilike(search_term),
-                    StudentProfile.high_school.ilike(search_term)
-                )
-            )
-        
-        # Graduation year filter
-        if graduation_year:
-            query = query.filter(StudentProfile.graduation_year == graduation_year)
-        
-        # State filter (multiple states)
-        if states:
-            query = query.filter(StudentProfile.state.in_(states))
-        
-        # Relocation states filter (array contains)
-        if relocation_states:
-            conditions = []
-            for state in relocation_states:
-                conditions.append(StudentProfile.relocation_states.contains([state]))
-            query = query.filter(or_(*conditions))
-        
-        # Bucket filter (multiple buckets)
-        if buckets:
-            query = query.filter(StudentProfile.current_bucket.in_(buckets))
-        
-        # C•CAP Connection filter (multiple connections)
-        if ccap_connections:
-            query = query.filter(StudentProfile.ccap_connection.in_(ccap_connections))
-        
-        # Has resume filter
-        if has_resume:
-            query = query.filter(StudentProfile.has_resume == has_resume)
-        
-        # Currently working filter
-        if currently_working:
-            query = query.filter(StudentProfile.currently_employed == currently_working)
-        
-        # Food handlers filter
-        if food_handlers:
-            query = query.filter(StudentProfile.has_food_handlers_card == food_handlers)
-        
-        # ServSafe filter
-        if servsafe:
-            query = query.filter(StudentProfile.has_servsafe == servsafe)
-        
-        # Will relocate filter
-        if will_relocate:
-            query = query.filter(StudentProfile.willing_to_relocate == will_relocate)
-        
-        # Ready to work filter
-        if ready_to_work:
-            query = query.filter(StudentProfile.ready_to_work == ready_to_work)
-        
-        # Onboarding step filter
-        if onboarding_step is not None:
-            query = query.filter(StudentProfile.onboarding_step == onboarding_step)
-        
-        # Onboarding complete filter
-        if onboarding_complete is not None:
-            if onboarding_complete:
-                query = query.filter(StudentProfile.onboarding_step == 0)
-            else:
-                query = query.filter(StudentProfile.onboarding_step > 0)
-
-        # Has posts (cooking photos) filter
-        if has_posts:
-            posts_exist = self.db.query(Post.id).filter(Post.user_id == User.id).exists()
-            if has_posts == "Yes":
-                query = query.filter(posts_exist)
-            elif has_posts == "No":
-                query = query.filter(~posts_exist)
-
-        return query
+        return query.filter(User.role == "student", User.deleted_at.is_(None), *_student_filter_criteria(**filters))
     
     def get_all_students_filtered(self,
                                   requesting_user: User,
@@ -133,6 +204,8 @@ class StudentRepository:
                                   graduation_year: Optional[str] = None,
                                   states: Optional[List[str]] = None,
                                   relocation_states: Optional[List[str]] = None,
+                                  interests: Optional[List[str]] = None,
+                                  availability: Optional[List[str]] = None,
                                   buckets: Optional[List[str]] = None,
                                   ccap_connections: Optional[List[str]] = None,
                                   has_resume: Optional[str] = None,
@@ -143,8 +216,14 @@ class StudentRepository:
                                   ready_to_work: Optional[str] = None,
                                   onboarding_step: Optional[int] = None,
                                   onboarding_complete: Optional[bool] = None,
-                                  has_posts: Optional[str] = None) -> List[User]:
-        """Get filtered students with pagination"""
+                                  has_posts: Optional[str] = None,
+                                  sort_by: str = "newest",
+                                  profile_fields: Optional[Sequence[str]] = None) -> List[User]:
+        """
+        Get filtered students with pagination
+        sort_by: "newest" (profile creation, default) or "activity" (most posts first)
+        profile_fields: only load these StudentProfile columns (None = full profile)
+        """
         if requesting_user.role != "admin":
             raise PermissionError("Only admins can access all students")
         
@@ -153,6 +232,8 @@ class StudentRepository:
             graduation_year=graduation_year,
             states=states,
             relocation_states=relocation_states,
+            interests=interests,
+            availability=availability,
             buckets=buckets,
             ccap_connections=ccap_connections,
             has_resume=has_resume,
@@ -166,37 +247,117 @@ class StudentRepository:
             has_posts=has_posts
         )
 
-        # Order by created_at descending
-        query = query.order_by(StudentProfile.created_at.desc())
+        # Order by activity (post count) or created_at, newest first
+        if sort_by == "activity":
+            query = query.order_by(StudentProfile.post_count.desc(), StudentProfile.created_at.desc())
+        else:
+            query = query.order_by(StudentProfile.created_at.desc())
 
         # Apply pagination
         if limit is not None:
             query = query.limit(limit).offset(offset)
 
-        students = query.all()
-        self.annotate_post_counts(students)
-        return students
+        return _with_profile_fields(query, profile_fields).all()
+    
+    def iter_student_documents(self, requesting_user: User, batch_size: int = 500, **filters):
+        """
+        Stream document keys for filtered students (admin only)
+        Yields (user_id, first_name, last_name, resume_url, food_handlers_card_url,
+        servsafe_certificate_url) rows from a server-side cursor, batch_size at a time
+        """
+        if requesting_user.role != "admin":
+            raise PermissionError("Only admins can export student documents")
 
-    def annotate_post_counts(self, users: List[User]) -> None:
-        """Attach a post_count attribute to each user (single grouped query)"""
-        if not users:
-            return
-        user_ids = [u.id for u in users]
-        counts = dict(
-            self.db.query(Post.user_id, func.count(Post.id))
-            .filter(Post.user_id.in_(user_ids))
-            .group_by(Post.user_id)
+        query = self._build_filter_query(**filters).filter(
+            or_(
+                StudentProfile.resume_url.isnot(None),
+                StudentProfile.food_handlers_card_url.isnot(None),
+                StudentProfile.servsafe_certificate_url.isnot(None)
+            )
+        )
+
+        return (
+            query.with_entities(
+                User.id,
+                StudentProfile.first_name,
+                StudentProfile.last_name,
+                StudentProfile.resume_url,
+                StudentProfile.food_handlers_card_url,
+                StudentProfile.servsafe_certificate_url
+            )
+            .order_by(StudentProfile.last_name, StudentProfile.first_name)
+            .yield_per(batch_size)
+        )
+
+    def iter_students_for_export(self, requesting_user: User, columns: list, batch_size: int = 1000, **filters):
+        """
+        Stream the given columns for filtered students (admin only)
+        Rows come from a server-side cursor, batch_size at a time, newest first
+        """
+        if requesting_user.role != "admin":
+            raise PermissionError("Only admins can export students")
+
+        return (
+            self._build_filter_query(**filters)
+            .with_entities(*columns)
+            .order_by(StudentProfile.created_at.desc())
+            .yield_per(batch_size)
+        )
+
+    def get_facet_counts(self, requesting_user: User, **filters) -> Dict:
+        """
+        Count students per option of every directory filter dimension under the
+        given filters, in a single GROUPING SETS query (admin only)
+
+        Returns {"total": int, "facets": {dimension: [{"value": ..., "count": ...}]}}
+        """
+        if requesting_user.role != "admin":
+            raise PermissionError("Only admins can access student facets")
+
+        return self._facet_counts(**filters)
+
+    # Profile writes invalidate the student_profiles tag
+    @cached("student_facets", ttl=FACET_CACHE_TTL, key=lambda self, **filters: repr(_normalize_filters(filters)),
+            tags=model_tags(StudentProfile))
+    def _facet_counts(self, **filters) -> Dict:
+        columns = list(FACET_DIMENSIONS.values())
+        rows = (
+            self._build_filter_query(**filters)
+            .with_entities(
+                *columns,
+                *[func.grouping(column) for column in columns],
+                func.count(User.id)
+            )
+            .group_by(func.grouping_sets(*columns))
             .all()
         )
-        for u in users:
-            u.post_count = counts.get(u.id, 0)
-    
+
+        names = list(FACET_DIMENSIONS.keys())
+        facets = {name: [] for name in names}
+        for row in rows:
+            values, grouping, count = row[:len(names)], row[len(names):-1], row[-1]
+            # Exactly one dimension is grouped in each row (grouping() == 0)
+            for index, name in enumerate(names):
+                if grouping[index] == 0:
+                    facets[name].append({"value": values[index], "count": count})
+                    break
+
+        for options in facets.values():
+            options.sort(key=lambda option: option["count"], reverse=True)
+
+        return {
+            "total": sum(option["count"] for option in facets[names[0]]),
+            "facets": facets,
+        }
+
     def count_all_students_filtered(self,
                                     requesting_user: User,
                                     search: Optional[str] = None,
                                     graduation_year: Optional[str] = None,
                                     states: Optional[List[str]] = None,
                                     relocation_states: Optional[List[str]] = None,
+                                    interests: Optional[List[str]] = None,
+                                    availability: Optional[List[str]] = None,
                                     buckets: Optional[List[str]] = None,
                                     ccap_connections: Optional[List[str]] = None,
                                     has_resume: Optional[str] = None,
@@ -217,6 +378,8 @@ class StudentRepository:
             graduation_year=graduation_year,
             states=states,
             relocation_states=relocation_states,
+            interests=interests,
+            availability=availability,
             buckets=buckets,
             ccap_connections=ccap_connections,
             has_resume=has_resume,
@@ -232,10 +395,12 @@ class StudentRepository:
 
         return query.count()
     
-    def search_students(self, query: str, requesting_user: User) -> List[User]:
+    def search_students(self, query: str, requesting_user: User,
+                        profile_fields: Optional[Sequence[str]] = None) -> List[User]:
         """
         Search students by name, email, or school
         Admin only - returns students matching the search query
+        profile_fields: only load these StudentProfile columns (None = full profile)
         """
         if requesting_user.role != "admin":
             raise PermissionError("Only admins can search students")
@@ -244,23 +409,12 @@ class StudentRepository:
         if len(query.strip()) < 2:
             return []
         
-        search_term = f"%{query.lower()}%"
-        
         # Search across User and StudentProfile tables
         # Note: first_name and last_name are in StudentProfile, not User
         students = (
-            self.db.query(User)
+            _with_profile_fields(self.db.query(User), profile_fields)
             .join(StudentProfile, User.id == StudentProfile.user_id, isouter=True)
-            .filter(
-                User.role == "student",
-                or_(
-                    User.email.ilike(search_term),
-                    User.username.ilike(search_term),
-                    StudentProfile.first_name.ilike(search_term),
-                    StudentProfile.last_name.ilike(search_term),
-                    StudentProfile.high_school.ilike(search_term)
-                )
-            )
+            .filter(User.role == "student", User.deleted_at.is_(None), _search_criterion(query))
             .distinct()
             .all()
         )
@@ -309,25 +463,61 @@ class StudentRepository:
         self.db.refresh(new_user)
         return new_user
 
-    def update_student_profile(self, student_id: UUID, profile_data: StudentProfileUpdate) -> Optional[StudentProfile]:
-        """Update a student's profile"""
+    def update_student_profile(self, student_id: UUID, profile_data: StudentProfileUpdate,
+                               changed_by: Optional[UUID] = None) -> Optional[StudentProfile]:
+        """
+        Update a student's profile, recording a bucket change in the program status history
+        Runs in the caller's transaction (flushes, no commit) so dependent updates commit with it
+        """
         profile = self.db.query(StudentProfile).filter(StudentProfile.user_id == student_id).first()
         
         if not profile:
             return None
             
         # Update only provided fields
+        old_bucket = profile.current_bucket
         update_data = profile_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(profile, field, value)
+
+        if profile.current_bucket != old_bucket:
+            self.db.add(_status_change(profile, old_bucket, changed_by))
             
-        self.db.commit()
+        self.db.flush()
         self.db.refresh(profile)
         return profile
 
+    def bulk_update_program_status(self, student_ids: Sequence[UUID], program_status: str,
+                                   changed_by: Optional[UUID] = None,
+                                   notes: Optional[str] = None) -> Tuple[List[UUID], List[UUID]]:
+        """
+        Move students to program_status (current_bucket) with one UPDATE and record
+        the changes with one INSERT. Returns the user ids of the students found and
+        of those whose bucket actually changed. Runs in the caller's transaction.
+        """
+        # Lock the rows so the recorded old statuses can't race another update
+        profiles = self.db.execute(
+            select(StudentProfile.id, StudentProfile.user_id, StudentProfile.current_bucket)
+            .where(StudentProfile.user_id.in_(student_ids))
+            .with_for_update()
+        ).all()
+        changed = [profile for profile in profiles if profile.current_bucket != program_status]
+
+        if changed:
+            self.db.execute(
+                update(StudentProfile)
+                .where(StudentProfile.id.in_([profile.id for profile in changed]))
+                .values(current_bucket=program_status)
+                .execution_options(synchronize_session=False)
+            )
+            ProgramStatusRepository(self.db).record(
+                [(profile.id, profile.current_bucket) for profile in changed], program_status, changed_by, notes
+            )
+        return [profile.user_id for profile in profiles], [profile.user_id for profile in changed]
+
     def delete_student(self, student_id: UUID) -> bool:
-        """Delete a student (cascade will delete profile)"""
-        return self.user_repo.delete(student_id)
+        """Soft-delete a student: hidden at once, rows and files purged later (UserPurgeRepository.purge)"""
+        return UserPurgeRepository(self.db).soft_delete(student_id)
     
     def get_profile_by_user_id(self, user_id: UUID) -> Optional[StudentProfile]:
         """Get student profile by user ID"""
@@ -387,4 +577,66 @@ class StudentRepository:
         except Exception as e:
             print(f"Error updating ServSafe certificate URL: {e}")
             self.db.rollback()
-            return False
\ No newline at end of file
+            return False
+
+
+class AsyncStudentRepository:
+    """StudentRepository for an AsyncSession (async def routes): profile and document updates"""
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_profile_by_user_id(self, user_id: UUID) -> Optional[StudentProfile]:
+        """Get student profile by user ID"""
+        return await self.db.scalar(select(StudentProfile).where(StudentProfile.user_id == user_id))
+
+    async def update_student_profile(self, student_id: UUID, profile_data: StudentProfileUpdate,
+                                     changed_by: Optional[UUID] = None) -> Optional[StudentProfile]:
+        """
+        Update a student's profile, recording a bucket change in the program status history
+        Runs in the caller's transaction (flushes, no commit) so dependent updates commit with it
+        """
+        profile = await self.get_profile_by_user_id(student_id)
+
+        if not profile:
+            return None
+
+        # Update only provided fields
+        old_bucket = profile.current_bucket
+        for field, value in profile_data.dict(exclude_unset=True).items():
+            setattr(profile, field, value)
+
+        if profile.current_bucket != old_bucket:
+            self.db.add(_status_change(profile, old_bucket, changed_by))
+
+        await self.db.flush()
+        await self.db.refresh(profile)
+        return profile
+
+    async def _update_profile_column(self, user_id: UUID, column: str, value: Optional[str]) -> bool:
+        try:
+            profile = await self.get_profile_by_user_id(user_id)
+            if profile:
+                setattr(profile, column, value)
+                await self.db.commit()
+                return True
+            return False
+        except Exception as e:
+            print(f"Error updating {column}: {e}")
+            await self.db.rollback()
+            return False
+
+    async def update_profile_picture(self, user_id: UUID, picture_url: Optional[str]) -> bool:
+        """Update profile picture URL"""
+        return await self._update_profile_column(user_id, "profile_picture_url", picture_url)
+
+    async def update_resume_url(self, user_id: UUID, resume_url: Optional[str]) -> bool:
+        """Update resume URL (S3 key)"""
+        return await self._update_profile_column(user_id, "resume_url", resume_url)
+
+    async def update_food_handlers_url(self, user_id: UUID, credential_url: Optional[str]) -> bool:
+        """Update food handlers card URL (S3 key)"""
+        return await self._update_profile_column(user_id, "food_handlers_card_url", credential_url)
+
+    async def update_servsafe_url(self, user_id: UUID, servsafe_url: Optional[str]) -> bool:
+        """Update ServSafe certificate URL (S3 key)"""
+        return await self._update_profile_column(user_id, "servsafe_certificate_url", servsafe_url)
@@ -0,0 +1,163 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select, update
+from typing import List, Optional
+from uuid import UUID
+import os
+from app.core.cache import get_cache, model_tags
+from app.models.certification import Certification
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.post import Post
+from app.models.post_ranking import PostRanking
+from app.models.student_profile import StudentProfile
+from app.models.student_segment import StudentSegmentMember
+from app.models.user import User
+from app.repositories.post_ranking import PostRankingRepository
+from app.repositories.storage_deletion import StorageDeletionRepository, storage_key
+
+# Rows deleted per statement (and transaction) while purging an account
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+
+# pg_try_advisory_lock key (with the user id's hash): one purge per account at a time across workers
+_PURGE_LOCK_ID = 4_510_202
+
+
+class UserPurgeRepository:
+    """
+    Account deletion in two steps: soft_delete() hides the account at once (cheap,
+    in the request), purge() later removes its rows in PURGE_BATCH_SIZE batches so
+    no transaction locks many rows of the hot tables, and queues its files for deletion
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def soft_delete(self, user_id: UUID) -> bool:
+        """
+        Mark an account deleted and deactivate it; returns False if it doesn't exist
+        (or is already deleted). Queries skip users with deleted_at, so the account,
+        its profile, posts and comments disappear immediately. Commits.
+        """
+        deleted = self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .values(deleted_at=func.now(), is_active=False)
+            .returning(User.id)
+        ).scalar()
+        if deleted is None:
+            self.db.rollback()
+            return False
+
+        # Leave trending and saved segments now rather than at the purge
+        self.db.execute(
+            delete(PostRanking)
+            .where(PostRanking.post_id.in_(select(Post.id).where(Post.user_id == user_id)))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.execute(delete(StudentSegmentMember).where(StudentSegmentMember.user_id == user_id))
+        self.db.commit()
+        # Signed-out principal, directory/facets and feed windows
+        get_cache().invalidate(*model_tags(User, user_id), "student_profiles", "posts")
+        return True
+
+    def pending_user_ids(self, limit: int = 100) -> List[UUID]:
+        """Soft-deleted accounts waiting to be purged, oldest first"""
+        return list(self.db.scalars(
+            select(User.id).where(User.deleted_at.isnot(None)).order_by(User.deleted_at).limit(limit)
+        ))
+
+    def purge(self, user_id: UUID) -> bool:
+        """
+        Remove a soft-deleted account and everything that belongs to it, committing
+        after each batch; returns False if the account isn't soft-deleted or another
+        worker is purging it. Safe to rerun after an interruption.
+
+        1. Queue the account's files (profile picture, documents, post images) for deletion
+        2. Delete its likes and comments on other posts, fixing those posts' counters
+        3. Delete likes and comments on its posts, then the posts
+        4. Delete the user row; ON DELETE CASCADE removes the profile, certifications,
+           status history, reset tokens and segment memberships
+        """
+        with self.db.get_bind().connect() as lock_connection:
+            lock_key = (_PURGE_LOCK_ID, func.hashtext(str(user_id)))
+            if not lock_connection.execute(select(func.pg_try_advisory_lock(*lock_key))).scalar():
+                return False
+            try:
+                return self._purge(user_id)
+            finally:
+                lock_connection.execute(select(func.pg_advisory_unlock(*lock_key)))
+                lock_connection.commit()
+
+    def _purge(self, user_id: UUID) -> bool:
+        if self.db.scalar(select(User.deleted_at).where(User.id == user_id)) is None:
+            self.db.rollback()
+            return False
+
+        self._enqueue_files(user_id)
+        self.db.commit()
+
+        while self._delete_engagement_batch(Like, Post.likes_count, user_id):
+            pass
+        while self._delete_engagement_batch(Comment, Post.comments_count, user_id):
+            pass
+        for model in (Like, Comment):
+            while self._delete_batch(model, model.post_id.in_(select(Post.id).where(Post.user_id == user_id))):
+                pass
+        while self._delete_batch(Post, Post.user_id == user_id):
+            pass
+
+        self.db.execute(delete(User).where(User.id == user_id))
+        self.db.commit()
+        get_cache().invalidate(*model_tags(User, user_id), "student_profiles", "posts")
+        return True
+
+    def _enqueue_files(self, user_id: UUID) -> int:
+        """Queue every stored file of the account for deletion (no commit)"""
+        profile = self.db.execute(
+            select(
+                StudentProfile.id,
+                StudentProfile.profile_picture_url,
+                StudentProfile.resume_url,
+                StudentProfile.food_handlers_card_url,
+                StudentProfile.servsafe_certificate_url
+            ).where(StudentProfile.user_id == user_id)
+        ).first()
+        values: List[Optional[str]] = list(self.db.scalars(select(Post.image_url).where(Post.user_id == user_id)))
+        if profile is not None:
+            values.extend(profile[1:])
+            values.extend(self.db.scalars(select(Certification.file_url).where(Certification.student_id == profile.id)))
+        return StorageDeletionRepository(self.db).enqueue(storage_key(value) for value in values)
+
+    def _delete_engagement_batch(self, model, counter, user_id: UUID) -> int:
+        """
+        Delete a batch of the user's likes or comments and subtract them from the posts'
+        counters in the same statement; re-scores those posts. Commits.
+        Returns the number of posts touched (0 when none are left).
+        """
+        gone = (
+            delete(model)
+            .where(model.id.in_(select(model.id).where(model.user_id == user_id).limit(PURGE_BATCH_SIZE)))
+            .returning(model.post_id)
+            .cte("gone")
+        )
+        removed = select(gone.c.post_id, func.count().label("n")).group_by(gone.c.post_id).subquery()
+        post_ids = list(self.db.scalars(
+            update(Post)
+            .where(Post.id == removed.c.post_id)
+            .values({counter: func.greatest(counter - removed.c.n, 0)})
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        ))
+        PostRankingRepository(self.db).update_posts(post_ids)
+        self.db.commit()
+        return len(post_ids)
+
+    def _delete_batch(self, model, *criteria) -> int:
+        """Delete up to PURGE_BATCH_SIZE rows of model matching criteria; commits, returns the count"""
+        deleted = self.db.execute(
+            delete(model)
+            .where(model.id.in_(select(model.id).where(*criteria).limit(PURGE_BATCH_SIZE)))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return deleted
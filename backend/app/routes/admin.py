@@ -1,29 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 from uuid import UUID
+import base64
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import get_password_hash
+from app.core.serialization import get_adapter, typed_response
 from app.deps.auth import require_admin
 from app.models.user import User, UserRole
-from app.schemas.user import AdminCreate, AdminResponse, AdminWithPassword, UserListResponse
+from app.repositories.base import UserRepository
+from app.schemas.user import AdminCreate, AdminResponse, AdminWithPassword, UserListPage, UserListResponse
 from app.utils.password_generator import generate_temporary_password
 
 router = APIRouter()
 
 
-@router.get("/users", response_model=List[UserListResponse])
+# Columns of UserListResponse, selected directly when streaming
+USER_LIST_COLUMNS = [User.id, User.email, User.username, User.role, User.is_active, User.created_at]
+# NDJSON lines sent per chunk
+NDJSON_CHUNK_ROWS = 500
+
+
+def _encode_cursor(user: User) -> str:
+    """Opaque cursor for the page after this user (its created_at and id)"""
+    return base64.urlsafe_b64encode(f"{user.created_at.isoformat()}|{user.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _iter_ndjson(rows: Iterable) -> Iterable[bytes]:
+    """One UserListResponse JSON object per line, NDJSON_CHUNK_ROWS lines per chunk"""
+    adapter = get_adapter(UserListResponse)
+    lines = []
+    for row in rows:
+        lines.append(adapter.dump_json(adapter.validate_python(row, from_attributes=True)))
+        if len(lines) == NDJSON_CHUNK_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+@router.get("/users", response_model=UserListPage)
 def get_all_users(
-    db: Session = Depends(get_db),
+    role: Optional[UserRole] = Query(None, description="Only admins or only students"),
+    is_active: Optional[bool] = Query(None, description="Only active or only deactivated accounts"),
+    limit: int = Query(100, ge=1, le=1000, description="Users per page (json format)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json: one page, ndjson: stream every match"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """
-    Get list of all users (admins and students) with email and role.
+    List users (admins and students) with email and role, newest first.
     Only accessible by admins.
+
+    json returns one page and the cursor for the next one (keyset pagination, so
+    every page costs the same). ndjson streams every matching user after the
+    cursor, one JSON object per line, from a server-side cursor in constant memory.
     """
-    users = db.query(User).all()
-    return users
+    repo = UserRepository(db)
+    role_value = role.value if role is not None else None
+    after = _decode_cursor(cursor) if cursor else None
+
+    if format == "ndjson":
+        rows = repo.iter_users(USER_LIST_COLUMNS, role=role_value, is_active=is_active, after=after)
+        return StreamingResponse(_iter_ndjson(rows), media_type="application/x-ndjson")
+
+    # One extra row tells whether there is a next page
+    users = repo.list_users(limit + 1, role=role_value, is_active=is_active, after=after)
+    next_cursor = _encode_cursor(users[limit - 1]) if len(users) > limit else None
+    return typed_response(UserListPage, {"users": users[:limit], "next_cursor": next_cursor})
 
 
 @router.get("/admins", response_model=List[AdminResponse])
@@ -35,7 +94,7 @@ def get_all_admins(
     Get list of all admin users.
     Only accessible by admins.
     """
-    admins = db.query(User).filter(User.role == UserRole.ADMIN.value).all()
+    admins = db.query(User).filter(User.role == UserRole.ADMIN.value, User.deleted_at.is_(None)).all()
     return admins
 
 
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from uuid import UUID
 import logging
+import os
 
-from app.core.database import get_db
+from app.core import events
+from app.core.cache import get_cache
+from app.core.database import get_db, get_read_db
+from app.core.serialization import dump_json
+from app.core.etag import compute_etag, conditional_response
 from app.deps.auth import get_current_user
 from app.models.user import User
 from app.schemas.announcement import (
@@ -18,6 +24,9 @@ from app.services.email_service import email_service
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Serialized announcement lists, keyed by their ETag (which changes whenever the list does)
+ANNOUNCEMENTS_CACHE_TTL = float(os.getenv("ANNOUNCEMENTS_CACHE_TTL", "300"))
+
 
 async def send_announcement_emails_background(
     announcement_id: UUID,
@@ -37,7 +46,7 @@ async def send_announcement_emails_background(
         repo = AnnouncementRepository(db)
 
         # Get the announcement
-        announcement = repo.get_by_id(announcement_id)
+        announcement = await run_in_threadpool(repo.get_by_id, announcement_id)
         if not announcement:
             logger.error(f"Announcement {announcement_id} not found for email sending")
             return
@@ -47,7 +56,7 @@ async def send_announcement_emails_background(
 
         # Get students if send_to_students is True
         if send_to_students:
-            target_students = repo.get_students_for_announcement(announcement)
+            target_students = await run_in_threadpool(repo.get_students_for_announcement, announcement)
             if target_students and len(target_students) > 0:
                 for student in target_students:
                     if student.email:
@@ -109,23 +118,35 @@ async def send_announcement_emails_background(
 
 @router.get("/", response_model=List[AnnouncementResponse])
 def get_announcements(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get announcements based on user role:
     - Admins: Get all announcements
     - Students: Get filtered announcements (global + location/bucket specific)
+    Supports If-None-Match: returns 304 when the visible announcements haven't changed.
     """
     repo = AnnouncementRepository(db)
     
     try:
-        if current_user.role == "admin":
-            announcements = repo.get_all_announcements(current_user)
-        else:
-            announcements = repo.get_announcements_for_student(current_user)
+        etag = compute_etag(current_user.role, repo.get_announcement_versions(current_user))
+
+        def load():
+            if current_user.role == "admin":
+                announcements = repo.get_all_announcements(current_user)
+            else:
+                announcements = repo.get_announcements_for_student(current_user)
+            return dump_json(List[AnnouncementResponse], announcements)
+
+        def build():
+            body = get_cache().get_or_set(
+                "announcements", etag, load, ttl=ANNOUNCEMENTS_CACHE_TTL, tags=("announcements",)
+            )
+            return Response(content=body, media_type="application/json")
         
-        return announcements
+        return conditional_response(request, etag, build)
     except PermissionError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -142,7 +163,7 @@ def get_announcements(
 def get_announcement(
     announcement_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a specific announcement by ID
@@ -212,6 +233,12 @@ async def create_announcement(
                     detail="At least one of target_program_stages or target_locations is required when target_audience is 'both'"
                 )
 
+        if announcement_data.target_audience == "segment" and not announcement_data.target_segment_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="target_segment_id is required when target_audience is 'segment'"
+            )
+
         # Extract send_email and send_to_admins flags before creating announcement
         send_email = announcement_data.send_email
         send_to_admins = announcement_data.send_to_admins
@@ -221,10 +248,14 @@ async def create_announcement(
         announcement_dict.pop('send_email', None)  # Remove send_email from dict
         announcement_dict.pop('send_to_admins', None)  # Remove send_to_admins from dict
 
-        announcement = repo.create_announcement(
+        # Sync repository: run it in the threadpool instead of blocking the event loop
+        announcement = await run_in_threadpool(
+            repo.create_announcement,
             current_user,
             **announcement_dict
         )
+        # Only the id: who may see it depends on targeting, so clients refetch /api/announcements/
+        await events.apublish("announcement.created", {"id": str(announcement.id)})
 
         # Trigger background email task if enabled (either students or admins or both)
         if send_email or send_to_admins:
@@ -314,6 +345,14 @@ def update_announcement(
                     detail="At least one of target_program_stages or target_locations is required when target_audience is 'both'"
                 )
         
+        if target_audience == "segment":
+            target_segment_id = update_data.get('target_segment_id', existing_announcement.target_segment_id)
+            if not target_segment_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="target_segment_id is required when target_audience is 'segment'"
+                )
+        
         # Update the announcement
         updated_announcement = repo.update_announcement(
             announcement_id,
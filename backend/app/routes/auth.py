@@ -1,7 +1,9 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core.serialization import typed_response
+from app.core.etag import compute_etag, conditional_response
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.models.user import User
 from app.models.student_profile import StudentProfile
@@ -137,7 +139,7 @@ def register_student(user_data: UserCreate, background_tasks: BackgroundTasks, d
 def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Login and get access token"""
     # Find user by email
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = db.query(User).filter(User.email == user_credentials.email, User.deleted_at.is_(None)).first()
     
     # Verify user exists and password is correct
     if not user or not verify_password(user_credentials.password, user.hashed_password):
@@ -160,11 +162,23 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
-    """Get current user information with full profile data"""
+def get_current_user_info(request: Request, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    """
+    Get current user information with full profile data
+    Supports If-None-Match: returns 304 when the user and profile haven't changed.
+    """
     # Refresh the user to include the student profile relationship
     db.refresh(current_user)
-    return current_user
+    profile = current_user.student_profile
+    etag = compute_etag(
+        current_user.id,
+        current_user.role,
+        current_user.is_active,
+        current_user.updated_at,
+        profile.id if profile else None,
+        profile.updated_at if profile else None
+    )
+    return conditional_response(request, etag, lambda: typed_response(UserResponse, current_user))
 
 @router.post("/admin/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def admin_register_user(
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.core.database import get_db
+import os
+from app.core.cache import cached
+from app.core.database import get_async_read_db
+from app.core.serialization import typed_response
 from app.deps.auth import require_admin
 from app.models.user import User
 from app.models.email_log import EmailLog
@@ -9,27 +13,49 @@ from app.schemas.email_log import EmailLogResponse
 
 router = APIRouter()
 
+# Stats are recomputed when an email is logged, or after this many seconds
+EMAIL_STATS_CACHE_TTL = float(os.getenv("EMAIL_STATS_CACHE_TTL", "300"))
+
+
+@cached("email_stats", ttl=EMAIL_STATS_CACHE_TTL, key=lambda db: "all", tags=("email_logs",))
+async def _email_stats(db: AsyncSession) -> dict:
+    # All three counts in one scan
+    total_emails, successful_emails, failed_emails = (await db.execute(
+        select(
+            func.count(),
+            func.count().filter(EmailLog.status == "success"),
+            func.count().filter(EmailLog.status == "failed")
+        ).select_from(EmailLog)
+    )).one()
+
+    return {
+        "total_emails": total_emails,
+        "successful_emails": successful_emails,
+        "failed_emails": failed_emails,
+        "success_rate": round((successful_emails / total_emails * 100), 2) if total_emails > 0 else 0
+    }
+
 
 @router.get("/email-logs", response_model=List[EmailLogResponse])
 async def get_email_logs(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     status_filter: Optional[str] = Query(None, description="Filter by status: success or failed"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get email logs with pagination and filtering (Admin only)"""
     try:
-        query = db.query(EmailLog)
+        query = select(EmailLog)
         
         # Apply status filter if provided
         if status_filter and status_filter in ["success", "failed"]:
-            query = query.filter(EmailLog.status == status_filter)
+            query = query.where(EmailLog.status == status_filter)
         
         # Apply pagination and ordering
-        email_logs = query.order_by(EmailLog.sent_at.desc()).offset(skip).limit(limit).all()
+        email_logs = (await db.scalars(query.order_by(EmailLog.sent_at.desc()).offset(skip).limit(limit))).all()
         
-        return email_logs
+        return typed_response(List[EmailLogResponse], email_logs)
         
     except Exception as e:
         raise HTTPException(
@@ -40,21 +66,12 @@ async def get_email_logs(
 
 @router.get("/email-logs/stats")
 async def get_email_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Get email statistics (Admin only)"""
     try:
-        total_emails = db.query(EmailLog).count()
-        successful_emails = db.query(EmailLog).filter(EmailLog.status == "success").count()
-        failed_emails = db.query(EmailLog).filter(EmailLog.status == "failed").count()
-        
-        return {
-            "total_emails": total_emails,
-            "successful_emails": successful_emails,
-            "failed_emails": failed_emails,
-            "success_rate": round((successful_emails / total_emails * 100), 2) if total_emails > 0 else 0
-        }
+        return await _email_stats(db)
         
     except Exception as e:
         raise HTTPException(
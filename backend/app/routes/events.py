@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.core.events import broker
+from app.deps.auth import get_stream_user
+from app.models.user import User, UserRole
+
+router = APIRouter()
+
+# Comment line sent when idle, so proxies don't time out the connection
+KEEPALIVE_SECONDS = 15
+# Reconnect delay the browser's EventSource uses after the stream drops
+RETRY_MILLISECONDS = 5000
+
+
+async def _event_stream(is_admin: bool):
+    async with broker.subscribe() as queue:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                # This client fell too far behind: EventSource reconnects and refetches
+                return
+            if event.admin_only and not is_admin:
+                continue
+            yield f"event: {event.type}\ndata: {json.dumps(event.data, default=str)}\n\n"
+
+
+@router.get("/stream")
+def stream_events(current_user: User = Depends(get_stream_user)):
+    """
+    Server-Sent Events stream of live activity, instead of polling:
+    - post.counts: {post_id, likes_count, comments_count} after a like, unlike, comment or comment deletion
+    - announcement.created: {id} after an announcement is posted (fetch it from /api/announcements/)
+    Students only get events for public posts. Authenticate with ?token=<access token>.
+    """
+    return StreamingResponse(
+        _event_stream(current_user.role == UserRole.ADMIN.value),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from uuid import UUID
 
-from app.core.database import get_db
-from app.deps.auth import get_current_user
+from app.core.database import get_db, get_async_db, get_read_db
+from app.core.serialization import typed_response
+from app.deps.auth import get_current_user, require_admin
 from app.models.user import User
 from app.schemas.post import PostCreate, PostUpdate, PostResponse
-from app.schemas.like import LikeResponse
+from app.schemas.like import LikeResponse, LikedPostsRequest
 from app.schemas.comment import CommentCreate, CommentResponse
-from app.repositories.post import PostRepository
+from app.repositories.post import AsyncPostRepository, PostRepository
+from app.repositories.post_ranking import PostRankingRepository
 from app.utils.s3 import S3Service
 
 router = APIRouter()
@@ -49,7 +52,7 @@ def get_all_posts(
     limit: Optional[int] = 50,
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all posts (community feed)
@@ -58,8 +61,13 @@ def get_all_posts(
     repo = PostRepository(db)
     
     try:
+        # First pages come from the hot feed cache
+        page = repo.get_feed_page(limit=limit, offset=offset, user_role=current_user.role)
+        if page is not None:
+            return Response(content=page, media_type="application/json")
+
         posts = repo.get_all_posts(limit=limit, offset=offset, user_role=current_user.role, current_user_id=current_user.id)
-        return posts
+        return typed_response(List[PostResponse], posts)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -73,7 +81,7 @@ def get_user_posts(
     limit: Optional[int] = None,
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all posts by a specific user
@@ -83,7 +91,7 @@ def get_user_posts(
     
     try:
         posts = repo.get_posts_by_user(user_id, limit=limit, offset=offset, user_role=current_user.role, current_user_id=current_user.id)
-        return posts
+        return typed_response(List[PostResponse], posts)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,6 +99,77 @@ def get_user_posts(
         )
 
 
+@router.get("/trending", response_model=List[PostResponse])
+def get_trending_posts(
+    limit: int = 50,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get trending posts: likes and comments weighted by recency (post_rankings)
+    Students see only public posts, admins see all posts
+    """
+    repo = PostRankingRepository(db)
+    
+    try:
+        posts = repo.get_trending(limit=limit, offset=offset, user_role=current_user.role)
+        return typed_response(List[PostResponse], posts)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching trending posts: {str(e)}"
+        )
+
+
+@router.get("/dishes/{dish}", response_model=List[PostResponse])
+def get_dish_gallery(
+    dish: str,
+    limit: int = 50,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get the gallery of a featured dish, trending posts first
+    Students see only public posts, admins see all posts
+    """
+    if dish not in FEATURED_DISHES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown featured dish"
+        )
+    
+    repo = PostRankingRepository(db)
+    
+    try:
+        posts = repo.get_trending(limit=limit, offset=offset, user_role=current_user.role, featured_dish=dish)
+        return typed_response(List[PostResponse], posts)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching dish gallery: {str(e)}"
+        )
+
+
+@router.post("/rankings/refresh")
+def refresh_post_rankings(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute trending rankings now (Admin only)
+    They are also refreshed every TRENDING_REFRESH_SECONDS and updated by likes/comments
+    """
+    changed = PostRankingRepository(db).refresh()
+    if changed is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A ranking refresh is already running"
+        )
+    return {"changed_rankings": changed}
+
+
 @router.get("/{post_id}", response_model=PostResponse)
 def get_post(
     post_id: UUID,
@@ -103,7 +182,7 @@ def get_post(
     """
     repo = PostRepository(db)
     
-    post = repo.get_by_id(post_id)
+    post = repo.get_visible_post(post_id)
     
     if not post:
         raise HTTPException(
@@ -121,13 +200,13 @@ async def create_post(
     featured_dish: Optional[str] = Form(None),
     is_private: Optional[bool] = Form(False),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new post with image upload
     Only students can create posts
     """
-    repo = PostRepository(db)
+    repo = AsyncPostRepository(db)
     
     try:
         # Validate file type
@@ -141,7 +220,7 @@ async def create_post(
         image_url = await S3Service.upload_post_image(image, str(current_user.id))
         
         # Create the post
-        post = repo.create_post(
+        post = await repo.create_post(
             current_user,
             image_url=image_url,
             caption=caption,
@@ -237,8 +316,7 @@ def delete_post(
         # We need: public/post-images/file.jpg
         if post.image_url:
             try:
-                # Split by .com/ to get the key
-                s3_key = post.image_url.split('.com/')[-1] if '.com/' in post.image_url else None
+                s3_key = s3_service.key_from_url(post.image_url)
                 
                 if s3_key:
                     # Delete from S3
@@ -334,6 +412,28 @@ def unlike_post(
         )
 
 
+# POST only because the id list can be long; exempt from read-your-writes pinning (core.read_your_writes.READ_ONLY_PATHS)
+@router.post("/liked", response_model=List[UUID])
+def get_liked_posts(
+    request: LikedPostsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Which of the given posts (up to 200) the current user has liked
+    Use it to hydrate a feed page in one request instead of GET /{post_id}/liked per post
+    """
+    repo = PostRepository(db)
+    
+    try:
+        return repo.get_liked_post_ids(request.post_ids, current_user)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking like status: {str(e)}"
+        )
+
+
 @router.get("/{post_id}/liked", response_model=bool)
 def check_if_liked(
     post_id: UUID,
@@ -361,7 +461,7 @@ def check_if_liked(
 def get_post_comments(
     post_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get all comments for a post
@@ -0,0 +1,193 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+from uuid import UUID
+
+from app.core.database import get_db, get_read_db
+from app.deps.auth import require_admin
+from app.models.user import User
+from app.repositories.segment import SegmentRepository
+from app.schemas.segment import StudentSegmentCreate, StudentSegmentUpdate, StudentSegmentResponse
+from app.schemas.user import PaginatedStudentsResponse
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[StudentSegmentResponse])
+def get_segments(
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Get all saved student segments with member counts - Admin only"""
+    repo = SegmentRepository(db)
+    try:
+        return repo.get_segments(admin_user)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view segments"
+        )
+
+
+@router.post("/", response_model=StudentSegmentResponse, status_code=status.HTTP_201_CREATED)
+def create_segment(
+    segment_data: StudentSegmentCreate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Save a student directory filter as a segment - Admin only
+    Matching students are stored right away and kept up to date as profiles change.
+    """
+    repo = SegmentRepository(db)
+    try:
+        return repo.create_segment(
+            admin_user,
+            name=segment_data.name,
+            description=segment_data.description,
+            filters=segment_data.filters.model_dump()
+        )
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can create segments"
+        )
+
+
+@router.get("/{segment_id}", response_model=StudentSegmentResponse)
+def get_segment(
+    segment_id: UUID,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Get a saved segment - Admin only"""
+    repo = SegmentRepository(db)
+    try:
+        segment = repo.get_segment(segment_id, admin_user)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view segments"
+        )
+
+    if not segment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    return segment
+
+
+@router.put("/{segment_id}", response_model=StudentSegmentResponse)
+def update_segment(
+    segment_id: UUID,
+    segment_data: StudentSegmentUpdate,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Update a segment's name, description or filters - Admin only"""
+    repo = SegmentRepository(db)
+    update_data = segment_data.model_dump(exclude_unset=True)
+    if update_data.get("filters") is None:
+        update_data.pop("filters", None)
+
+    try:
+        segment = repo.update_segment(segment_id, admin_user, **update_data)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can update segments"
+        )
+
+    if not segment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    return segment
+
+
+@router.delete("/{segment_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_segment(
+    segment_id: UUID,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Delete a segment - Admin only"""
+    repo = SegmentRepository(db)
+    try:
+        success = repo.delete_segment(segment_id, admin_user)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can delete segments"
+        )
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    return None
+
+
+@router.post("/{segment_id}/refresh", response_model=StudentSegmentResponse)
+def refresh_segment(
+    segment_id: UUID,
+    db: Session = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Recompute a segment's membership from its filters - Admin only
+    Useful after changes made outside the profile update endpoints (e.g. bulk imports).
+    """
+    repo = SegmentRepository(db)
+    try:
+        segment = repo.refresh_segment(segment_id, admin_user)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can refresh segments"
+        )
+
+    if not segment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    return segment
+
+
+@router.get("/{segment_id}/students", response_model=PaginatedStudentsResponse)
+def get_segment_students(
+    segment_id: UUID,
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page_size: int = Query(25, ge=1, le=200, description="Number of students per page"),
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Get paginated students in a segment - Admin only"""
+    repo = SegmentRepository(db)
+    try:
+        if not repo.get_by_id(segment_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Segment not found"
+            )
+
+        students = repo.get_members(segment_id, admin_user, limit=page_size, offset=(page - 1) * page_size)
+        total = repo.count_members(segment_id)
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+
+        return PaginatedStudentsResponse(
+            students=students,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages
+        )
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view segments"
+        )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+
+from app.utils.storage import LocalStorage, get_storage
+
+router = APIRouter()
+
+
+@router.get("/{file_key:path}")
+def get_local_file(
+    file_key: str,
+    expires: Optional[int] = Query(None),
+    signature: Optional[str] = Query(None)
+):
+    """
+    Serve a file from the local disk storage backend (STORAGE_BACKEND=local only)
+    Public keys are served as-is; private keys require a valid signed URL,
+    mirroring S3 public objects and presigned URLs.
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not found"
+        )
+
+    # Resolve the key first: "public/../private/..." must not pass as a public file
+    try:
+        file_key = storage.normalize_key(file_key)
+        path = storage.path_for(file_key)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file key"
+        )
+
+    if not storage.is_public(file_key):
+        if expires is None or not signature or not storage.verify(file_key, expires, signature):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or expired signature"
+            )
+
+    if not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+
+    return FileResponse(path)
@@ -1,25 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, or_, func
 from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
+from datetime import datetime
 import os
 import base64
 from pathlib import Path
 from app.core.security import get_password_hash
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_read_db
+from app.core.serialization import typed_response
+from app.core.cache import get_cache, model_tags
+from app.core.etag import compute_etag, conditional_response
 from app.deps.auth import require_admin, get_current_active_user
 from app.models.user import User
 from app.models.student_profile import StudentProfile
-from app.repositories.student import StudentRepository
-from app.schemas.user import UserCreate, UserResponse, UserWithFullProfile, BulkProgramStatusUpdate, PaginatedStudentsResponse
+from app.repositories.student import AsyncStudentRepository, StudentRepository
+from app.repositories.segment import SegmentRepository
+from app.repositories.program_status import COHORTS as PROGRAM_STATUS_COHORTS, ProgramStatusRepository
+from app.schemas.user import (
+    UserCreate, UserResponse, UserWithFullProfile, BulkProgramStatusUpdate, PaginatedStudentsResponse, StudentFacetsResponse,
+    resolve_profile_fields, paginated_student_projection_schema, student_projection_list_schema
+)
 from app.schemas.student_profile import StudentProfileCreate, StudentProfileUpdate, StudentProfileResponse
+from app.schemas.program_status import ProgramStatusAnalytics, ProgramStatusResponse
 from app.models.student_profile import StudentProfile
 from app.utils.s3 import S3Service
+from app.services.user_purge import purge_deleted_users
 from app.repositories.email_notification import EmailNotificationRepository
 from app.services.email_service import email_service
+from app.services.document_export import stream_documents_zip
+from app.services.student_export import EXPORT_COLUMNS, DEFAULT_EXPORT_COLUMNS, iter_csv, iter_xlsx
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,36 +43,61 @@ router = APIRouter()
 
 
 
+def _parse_fields(fields: Optional[str]):
+    """Resolve the `fields` query parameter, turning unknown fields into a 400"""
+    try:
+        return resolve_profile_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{str(e)}. Use card, table, full or a comma-separated list of profile fields"
+        )
+
+
+FIELDS_DESCRIPTION = (
+    "Profile fields to return: a projection (card, table, full) or a comma-separated "
+    "list of student_profile fields. Defaults to full."
+)
+
+
 @router.get("/search", response_model=List[UserWithFullProfile])
 def search_students(
     q: str,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
     admin_user: User = Depends(require_admin)
 ):
     """
     Search students by name, email, or school - Admin only
     Query parameter 'q' is the search term (minimum 2 characters)
     """
+    profile_fields = _parse_fields(fields)
     student_repo = StudentRepository(db)
     try:
-        students = student_repo.search_students(q, admin_user)
-        return students
+        students = student_repo.search_students(q, admin_user, profile_fields=profile_fields)
+        if profile_fields is not None:
+            return typed_response(student_projection_list_schema(profile_fields), students)
+        return typed_response(List[UserWithFullProfile], students)
     except PermissionError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can search students"
         )
 
-@router.get("/", response_model=PaginatedStudentsResponse)
-def get_all_students(
-    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
-    page_size: int = Query(25, ge=1, le=200, description="Number of students per page"),
+def _split_csv(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated query parameter into a list"""
+    return [v.strip() for v in value.split(',')] if value else []
+
+
+def student_filter_params(
     # Search filter
     search: Optional[str] = Query(None, description="Search by name, email, or school"),
     # Filter parameters
     graduation_year: Optional[str] = Query(None, description="Filter by graduation year"),
     state: Optional[str] = Query(None, description="Filter by state (comma-separated for multiple)"),
     relocation_states: Optional[str] = Query(None, description="Filter by relocation states (comma-separated)"),
+    interests: Optional[str] = Query(None, description="Filter by culinary interests (comma-separated, matches any)"),
+    availability: Optional[str] = Query(None, description="Filter by availability time slots (comma-separated, matches any)"),
     bucket: Optional[str] = Query(None, description="Filter by program stage/bucket (comma-separated)"),
     ccap_connection: Optional[str] = Query(None, description="Filter by C•CAP connection (comma-separated)"),
     has_resume: Optional[str] = Query(None, description="Filter by resume status: Yes, No"),
@@ -69,91 +109,215 @@ def get_all_students(
     onboarding_step: Optional[int] = Query(None, description="Filter by onboarding step (0=complete, 1-6=incomplete)"),
     onboarding_complete: Optional[bool] = Query(None, description="Filter by onboarding complete (true) or incomplete (false)"),
     has_posts: Optional[str] = Query(None, description="Filter by posts (cooking photos): Yes, No"),
-    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Student directory filters shared by the list, export and facet endpoints.
+    Returns keyword arguments for StudentRepository._build_filter_query.
+    By default, only students who completed onboarding (onboarding_step == 0) match.
+    Pass onboarding_complete=false or onboarding_step to override.
+    """
+    # Default to only showing completed onboarding unless explicitly filtered
+    if onboarding_complete is None and onboarding_step is None:
+        onboarding_complete = True
+
+    return dict(
+        search=search,
+        graduation_year=graduation_year,
+        states=_split_csv(state),
+        relocation_states=_split_csv(relocation_states),
+        interests=_split_csv(interests),
+        availability=_split_csv(availability),
+        buckets=_split_csv(bucket),
+        ccap_connections=_split_csv(ccap_connection),
+        has_resume=has_resume,
+        currently_working=currently_working,
+        food_handlers=food_handlers,
+        servsafe=servsafe,
+        will_relocate=will_relocate,
+        ready_to_work=ready_to_work,
+        onboarding_step=onboarding_step,
+        onboarding_complete=onboarding_complete,
+        has_posts=has_posts
+    )
+
+
+@router.get("/", response_model=PaginatedStudentsResponse)
+def get_all_students(
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page_size: int = Query(25, ge=1, le=200, description="Number of students per page"),
+    sort_by: str = Query("newest", pattern="^(newest|activity)$", description="Sort order: newest or activity (most posts first)"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    filters: dict = Depends(student_filter_params),
+    db: Session = Depends(get_read_db),
     admin_user: User = Depends(require_admin)
 ):
     """
     Get paginated and filtered list of students with full profile data - Admin only
 
     Returns paginated results with total count for frontend pagination.
-    Supports filtering by multiple criteria.
+    Supports filtering by multiple criteria (see student_filter_params).
     Default: 50 students per page, max 200 per page.
-    By default, only shows students who completed onboarding (onboarding_step == 0).
-    Pass onboarding_complete=false or onboarding_step to override.
+    Use `fields` (e.g. fields=table) to return only the profile columns a view needs.
     """
+    profile_fields = _parse_fields(fields)
     student_repo = StudentRepository(db)
     try:
-        # Default to only showing completed onboarding unless explicitly filtered
-        if onboarding_complete is None and onboarding_step is None:
-            onboarding_complete = True
-
         # Calculate offset
         offset = (page - 1) * page_size
-        
-        # Parse comma-separated filters
-        state_list = [s.strip() for s in state.split(',')] if state else []
-        relocation_states_list = [s.strip() for s in relocation_states.split(',')] if relocation_states else []
-        bucket_list = [b.strip() for b in bucket.split(',')] if bucket else []
-        ccap_connection_list = [c.strip() for c in ccap_connection.split(',')] if ccap_connection else []
-        
+
         # Get paginated and filtered students
         students = student_repo.get_all_students_filtered(
             requesting_user=admin_user,
             limit=page_size,
             offset=offset,
-            search=search,
-            graduation_year=graduation_year,
-            states=state_list,
-            relocation_states=relocation_states_list,
-            buckets=bucket_list,
-            ccap_connections=ccap_connection_list,
-            has_resume=has_resume,
-            currently_working=currently_working,
-            food_handlers=food_handlers,
-            servsafe=servsafe,
-            will_relocate=will_relocate,
-            ready_to_work=ready_to_work,
-            onboarding_step=onboarding_step,
-            onboarding_complete=onboarding_complete,
-            has_posts=has_posts
+            sort_by=sort_by,
+            profile_fields=profile_fields,
+            **filters
         )
 
         # Get total count with same filters
         total = student_repo.count_all_students_filtered(
             requesting_user=admin_user,
-            search=search,
-            graduation_year=graduation_year,
-            states=state_list,
-            relocation_states=relocation_states_list,
-            buckets=bucket_list,
-            ccap_connections=ccap_connection_list,
-            has_resume=has_resume,
-            currently_working=currently_working,
-            food_handlers=food_handlers,
-            servsafe=servsafe,
-            will_relocate=will_relocate,
-            ready_to_work=ready_to_work,
-            onboarding_step=onboarding_step,
-            onboarding_complete=onboarding_complete,
-            has_posts=has_posts
+            **filters
         )
 
         # Calculate total pages
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
         
-        return PaginatedStudentsResponse(
+        schema = PaginatedStudentsResponse
+        if profile_fields is not None:
+            schema = paginated_student_projection_schema(profile_fields)
+        
+        return typed_response(schema, dict(
             students=students,
             total=total,
             page=page,
             page_size=page_size,
             total_pages=total_pages
-        )
+        ))
     except PermissionError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can access all students"
         )
 
+
+@router.get("/facets", response_model=StudentFacetsResponse)
+def get_student_facets(
+    filters: dict = Depends(student_filter_params),
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get per-option counts for every directory filter (state, bucket, C•CAP connection,
+    graduation year, resume, ServSafe, food handlers, relocation, ready to work)
+    under the current filters - Admin only
+
+    Takes the same filters as GET /api/students/. Results are cached for a few seconds.
+    """
+    student_repo = StudentRepository(db)
+    try:
+        return student_repo.get_facet_counts(admin_user, **filters)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can access student facets"
+        )
+
+
+@router.get("/program-status/analytics", response_model=ProgramStatusAnalytics)
+def get_program_status_analytics(
+    cohort: str = Query("signup_year", pattern=f"^({'|'.join(PROGRAM_STATUS_COHORTS)})$",
+                        description="Group students by signup_year, signup_month, graduation_year, ccap_connection or state"),
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Program status transition counts and median days spent in each bucket, per cohort - Admin only
+    Computed in SQL from the program status history
+    """
+    return ProgramStatusRepository(db).get_analytics(cohort)
+
+@router.get("/export")
+def export_students(
+    format: str = Query("csv", pattern="^(csv|xlsx)$", description="Export format: csv or xlsx"),
+    columns: Optional[str] = Query(None, description="Columns to include (comma-separated), defaults to a directory summary"),
+    filters: dict = Depends(student_filter_params),
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Export the filtered student directory as CSV or XLSX - Admin only
+
+    Takes the same filters as GET /api/students/. Rows are streamed from a
+    server-side cursor, so memory use stays flat regardless of how many
+    students match.
+    """
+    column_names = _split_csv(columns) or DEFAULT_EXPORT_COLUMNS
+    unknown = [c for c in column_names if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export columns: {', '.join(unknown)}. Available: {', '.join(EXPORT_COLUMNS)}"
+        )
+
+    student_repo = StudentRepository(db)
+    try:
+        rows = student_repo.iter_students_for_export(
+            admin_user,
+            [EXPORT_COLUMNS[c] for c in column_names],
+            **filters
+        )
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export students"
+        )
+
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    if format == "xlsx":
+        content = iter_xlsx(column_names, rows)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        content = iter_csv(column_names, rows)
+        media_type = "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="students-{timestamp}.{format}"'}
+    )
+
+
+@router.get("/documents/export")
+def export_student_documents(
+    filters: dict = Depends(student_filter_params),
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Download a ZIP of every matching student's resume, food handlers card and
+    ServSafe certificate - Admin only
+
+    Takes the same filters as GET /api/students/. The archive is streamed while
+    documents are fetched from storage, one folder per student.
+    """
+    student_repo = StudentRepository(db)
+    try:
+        rows = student_repo.iter_student_documents(admin_user, **filters)
+    except PermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export student documents"
+        )
+
+    filename = f"student-documents-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+    return StreamingResponse(
+        stream_documents_zip(rows),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{student_id}", response_model=UserWithFullProfile)
 def get_student_by_id(
     student_id: UUID,
@@ -178,6 +342,20 @@ def get_student_by_id(
             detail="Only admins can access student data"
         )
 
+@router.get("/{student_id}/program-status", response_model=List[ProgramStatusResponse])
+def get_program_status_timeline(
+    student_id: UUID,
+    db: Session = Depends(get_read_db),
+    admin_user: User = Depends(require_admin)
+):
+    """Get a student's program status (bucket) changes, oldest first - Admin only"""
+    if not StudentRepository(db).get_student_by_id(student_id, admin_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    return ProgramStatusRepository(db).get_timeline(student_id)
+
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_student(
     user_data: UserCreate,
@@ -210,10 +388,14 @@ def create_student(
 
 @router.get("/me/profile", response_model=StudentProfileResponse)
 def get_my_profile(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get current student's full profile"""
+    """
+    Get current student's full profile
+    Supports If-None-Match: returns 304 when the profile hasn't changed.
+    """
     # Only students can access their profile via this endpoint
     if current_user.role != "student":
         raise HTTPException(
@@ -230,12 +412,13 @@ def get_my_profile(
             detail="Student profile not found"
         )
     
-    return profile
+    etag = compute_etag(profile.id, profile.created_at, profile.updated_at)
+    return conditional_response(request, etag, lambda: typed_response(StudentProfileResponse, profile))
 
 @router.put("/me/profile", response_model=StudentProfileResponse)
 async def update_my_profile(
     profile_data: StudentProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Update current student's own profile"""
@@ -246,23 +429,29 @@ async def update_my_profile(
             detail="Only students can access this endpoint"
         )
     
-    student_repo = StudentRepository(db)
+    student_repo = AsyncStudentRepository(db)
     
     # Check if this is onboarding completion (onboarding_step being set to 0)
     was_onboarding_completed = False
     if hasattr(profile_data, 'onboarding_step') and profile_data.onboarding_step == 0:
         # Check if student was previously in onboarding (step > 0)
-        current_profile = student_repo.get_profile_by_user_id(current_user.id)
+        current_profile = await student_repo.get_profile_by_user_id(current_user.id)
         if current_profile and current_profile.onboarding_step > 0:
             was_onboarding_completed = True
     
     # Update the student's own profile
-    updated_profile = student_repo.update_student_profile(current_user.id, profile_data)
+    updated_profile = await student_repo.update_student_profile(current_user.id, profile_data, changed_by=current_user.id)
     if not updated_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student profile not found"
         )
+
+    # Keep saved segment membership in sync with the changed fields, committed together with the profile
+    changed_fields = profile_data.dict(exclude_unset=True).keys()
+    await db.run_sync(lambda session: SegmentRepository(session).refresh_students([current_user.id], changed_fields))
+    await db.commit()
+    await get_cache().ainvalidate(*model_tags(StudentProfile))
     
     # Send emails if onboarding was just completed
     if was_onboarding_completed:
@@ -342,8 +531,7 @@ async def update_my_profile(
             )
             
             # Send notification email to admin(s) - use database email notifications
-            email_repo = EmailNotificationRepository(db)
-            admin_emails = email_repo.get_active_emails()
+            admin_emails = await db.run_sync(lambda session: EmailNotificationRepository(session).get_active_emails())
             
             if admin_emails:
                 await email_service.send_admin_notification_email(
@@ -380,22 +568,32 @@ def update_student_profile(
             detail="Student not found"
         )
     
-    updated_profile = student_repo.update_student_profile(student_id, profile_data)
+    updated_profile = student_repo.update_student_profile(student_id, profile_data, changed_by=admin_user.id)
     if not updated_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student profile not found"
         )
+
+    # Keep saved segment membership in sync with the changed fields, committed together with the profile
+    SegmentRepository(db).refresh_students([student_id], profile_data.dict(exclude_unset=True).keys())
+    db.commit()
+    get_cache().invalidate(*model_tags(StudentProfile))
     
     return updated_profile
 
 @router.delete("/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_student(
     student_id: UUID,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
-    """Delete a student - Admin only"""
+    """
+    Delete a student - Admin only
+    The student is hidden and signed out immediately; their posts, comments, likes,
+    profile and files are purged in the background after the response
+    """
     student_repo = StudentRepository(db)
     
     success = student_repo.delete_student(student_id)
@@ -405,6 +603,7 @@ def delete_student(
             detail="Student not found"
         )
     
+    background_tasks.add_task(purge_deleted_users, [student_id])
     return None
 
 
@@ -414,7 +613,7 @@ def delete_student(
 async def upload_profile_picture(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload profile picture (public)"""
     if current_user.role != "student":
@@ -435,8 +634,8 @@ async def upload_profile_picture(
         public_url = await S3Service.upload_profile_picture(file, str(current_user.id))
         
         # Update profile in database
-        student_repo = StudentRepository(db)
-        success = student_repo.update_profile_picture(current_user.id, public_url)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_profile_picture(current_user.id, public_url)
         
         if not success:
             raise HTTPException(
@@ -457,7 +656,7 @@ async def upload_profile_picture(
 async def upload_resume(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload resume (private)"""
     if current_user.role != "student":
@@ -479,8 +678,8 @@ async def upload_resume(
         s3_key = await S3Service.upload_private_document(file, str(current_user.id), "resumes")
         
         # Update profile in database
-        student_repo = StudentRepository(db)
-        success = student_repo.update_resume_url(current_user.id, s3_key)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_resume_url(current_user.id, s3_key)
         
         if not success:
             raise HTTPException(
@@ -501,7 +700,7 @@ async def upload_resume(
 async def upload_credential(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload credential (food handlers card, etc.) - private"""
     if current_user.role != "student":
@@ -528,8 +727,8 @@ async def upload_credential(
         s3_key = await S3Service.upload_private_document(file, str(current_user.id), "credentials")
         
         # Update profile in database
-        student_repo = StudentRepository(db)
-        success = student_repo.update_food_handlers_url(current_user.id, s3_key)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_food_handlers_url(current_user.id, s3_key)
         
         if not success:
             raise HTTPException(
@@ -549,7 +748,7 @@ async def upload_credential(
 @router.get("/profile/resume")
 async def get_resume_url(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get signed URL for resume download"""
     if current_user.role != "student":
@@ -558,8 +757,8 @@ async def get_resume_url(
             detail="Only students can access resumes"
         )
     
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(current_user.id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(current_user.id)
     
     if not profile or not profile.resume_url:
         raise HTTPException(
@@ -583,11 +782,11 @@ async def get_resume_url(
 async def admin_get_resume_url(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin: Get signed URL for a student's resume download"""
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(student_id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(student_id)
 
     if not profile or not profile.resume_url:
         raise HTTPException(
@@ -607,7 +806,7 @@ async def admin_get_resume_url(
 @router.get("/profile/credential")
 async def get_credential_url(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get signed URL for credential download"""
     if current_user.role != "student":
@@ -616,8 +815,8 @@ async def get_credential_url(
             detail="Only students can access credentials"
         )
     
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(current_user.id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(current_user.id)
     
     if not profile or not profile.food_handlers_card_url:
         raise HTTPException(
@@ -641,11 +840,11 @@ async def get_credential_url(
 async def admin_get_credential_url(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin: Get signed URL for a student's credential download"""
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(student_id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(student_id)
 
     if not profile or not profile.food_handlers_card_url:
         raise HTTPException(
@@ -667,7 +866,7 @@ async def admin_get_credential_url(
 async def upload_servsafe(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload ServSafe certificate (private)"""
     if current_user.role != "student":
@@ -694,8 +893,8 @@ async def upload_servsafe(
         s3_key = await S3Service.upload_private_document(file, str(current_user.id), "servsafe")
         
         # Update profile in database
-        student_repo = StudentRepository(db)
-        success = student_repo.update_servsafe_url(current_user.id, s3_key)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_servsafe_url(current_user.id, s3_key)
         
         if not success:
             raise HTTPException(
@@ -715,7 +914,7 @@ async def upload_servsafe(
 @router.get("/profile/servsafe")
 async def get_servsafe_url(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get signed URL for ServSafe certificate download"""
     if current_user.role != "student":
@@ -724,8 +923,8 @@ async def get_servsafe_url(
             detail="Only students can access ServSafe certificates"
         )
     
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(current_user.id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(current_user.id)
     
     if not profile or not profile.servsafe_certificate_url:
         raise HTTPException(
@@ -749,11 +948,11 @@ async def get_servsafe_url(
 async def admin_get_servsafe_url(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin: Get signed URL for a student's ServSafe certificate download"""
-    student_repo = StudentRepository(db)
-    profile = student_repo.get_profile_by_user_id(student_id)
+    student_repo = AsyncStudentRepository(db)
+    profile = await student_repo.get_profile_by_user_id(student_id)
 
     if not profile or not profile.servsafe_certificate_url:
         raise HTTPException(
@@ -776,7 +975,7 @@ async def admin_get_servsafe_url(
 @router.delete("/profile/picture")
 async def delete_profile_picture(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete own profile picture (students only)"""
     if current_user.role != "student":
@@ -786,9 +985,9 @@ async def delete_profile_picture(
         )
     
     try:
-        student_repo = StudentRepository(db)
+        student_repo = AsyncStudentRepository(db)
         # Students can only delete their own profile picture
-        success = student_repo.update_profile_picture(current_user.id, None)
+        success = await student_repo.update_profile_picture(current_user.id, None)
         
         if not success:
             raise HTTPException(
@@ -808,7 +1007,7 @@ async def delete_profile_picture(
 @router.delete("/profile/resume")
 async def delete_resume(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete resume"""
     if current_user.role != "student":
@@ -818,8 +1017,8 @@ async def delete_resume(
         )
     
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_resume_url(current_user.id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_resume_url(current_user.id, None)
         
         if not success:
             raise HTTPException(
@@ -839,7 +1038,7 @@ async def delete_resume(
 @router.delete("/profile/credential")
 async def delete_credential(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete food handlers card"""
     if current_user.role != "student":
@@ -849,8 +1048,8 @@ async def delete_credential(
         )
     
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_food_handlers_url(current_user.id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_food_handlers_url(current_user.id, None)
         
         if not success:
             raise HTTPException(
@@ -870,7 +1069,7 @@ async def delete_credential(
 @router.delete("/profile/servsafe")
 async def delete_servsafe(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete own ServSafe certificate (students only)"""
     if current_user.role != "student":
@@ -880,9 +1079,9 @@ async def delete_servsafe(
         )
     
     try:
-        student_repo = StudentRepository(db)
+        student_repo = AsyncStudentRepository(db)
         # Students can only delete their own certificate
-        success = student_repo.update_servsafe_url(current_user.id, None)
+        success = await student_repo.update_servsafe_url(current_user.id, None)
         
         if not success:
             raise HTTPException(
@@ -905,12 +1104,12 @@ async def delete_servsafe(
 async def admin_delete_profile_picture(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a student's profile picture - Admin only"""
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_profile_picture(student_id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_profile_picture(student_id, None)
         
         if not success:
             raise HTTPException(
@@ -931,12 +1130,12 @@ async def admin_delete_profile_picture(
 async def admin_delete_resume(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a student's resume - Admin only"""
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_resume_url(student_id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_resume_url(student_id, None)
         
         if not success:
             raise HTTPException(
@@ -957,12 +1156,12 @@ async def admin_delete_resume(
 async def admin_delete_credential(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a student's food handlers card - Admin only"""
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_food_handlers_url(student_id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_food_handlers_url(student_id, None)
         
         if not success:
             raise HTTPException(
@@ -983,12 +1182,12 @@ async def admin_delete_credential(
 async def admin_delete_servsafe(
     student_id: UUID,
     admin_user: User = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a student's ServSafe certificate - Admin only"""
     try:
-        student_repo = StudentRepository(db)
-        success = student_repo.update_servsafe_url(student_id, None)
+        student_repo = AsyncStudentRepository(db)
+        success = await student_repo.update_servsafe_url(student_id, None)
         
         if not success:
             raise HTTPException(
@@ -1031,25 +1230,18 @@ def bulk_update_program_status(
                 detail=f"Invalid program status. Must be one of: {', '.join(valid_statuses)}"
             )
         
-        updated_count = 0
-        failed_ids = []
-        
-        for student_id in update_data.student_ids:
-            try:
-                # Find the student profile
-                profile = db.query(StudentProfile).filter(StudentProfile.user_id == student_id).first()
-                
-                if profile:
-                    profile.current_bucket = update_data.program_status
-                    updated_count += 1
-                else:
-                    failed_ids.append(str(student_id))
-            except Exception as e:
-                print(f"Failed to update student {student_id}: {str(e)}")
-                failed_ids.append(str(student_id))
+        # One UPDATE for every student, one INSERT into the program status history for the actual changes
+        updated_ids, changed_ids = StudentRepository(db).bulk_update_program_status(
+            update_data.student_ids, update_data.program_status, changed_by=admin_user.id, notes=update_data.notes
+        )
+        updated_count = len(updated_ids)
+        found = set(updated_ids)
+        failed_ids = [str(student_id) for student_id in update_data.student_ids if student_id not in found]
         
-        # Commit all changes at once
+        # Keep saved segment membership in sync, then commit all changes at once
+        SegmentRepository(db).refresh_students(changed_ids, ["current_bucket"])
         db.commit()
+        get_cache().invalidate(*model_tags(StudentProfile))
         
         response = {
             "message": f"Successfully updated {updated_count} student(s)",
@@ -10,7 +10,7 @@ class AnnouncementBase(BaseModel):
     priority: str = "medium"  # low, medium, high
     category: str = "general"  # general, feature, maintenance, policy, etc.
     icon: str = "megaphone"  # Icon identifier
-    target_audience: str = "all"  # all, bucket, location
+    target_audience: str = "all"  # all, bucket, location, program_stages, locations, both, segment
     target_bucket: Optional[str] = None
     target_city: Optional[str] = None
     target_state: Optional[str] = None
@@ -19,6 +19,9 @@ class AnnouncementBase(BaseModel):
     target_program_stages: Optional[List[str]] = None
     target_locations: Optional[List[str]] = None
 
+    # Saved segment (target_audience = "segment")
+    target_segment_id: Optional[UUID] = None
+
 # Schema for creating announcement
 class AnnouncementCreate(AnnouncementBase):
     send_email: bool = True  # Whether to send email notification to students
@@ -40,6 +43,9 @@ class AnnouncementUpdate(BaseModel):
     target_program_stages: Optional[List[str]] = None
     target_locations: Optional[List[str]] = None
 
+    # Saved segment (target_audience = "segment")
+    target_segment_id: Optional[UUID] = None
+
 # Schema for response
 class AnnouncementResponse(AnnouncementBase):
     id: UUID
@@ -1,7 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
+# Most posts one liked-status lookup may ask about
+MAX_LIKED_LOOKUP = 200
+
 # Schema for creating like
 class LikeCreate(BaseModel):
     post_id: UUID
@@ -16,3 +20,7 @@ class LikeResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+# Schema for looking up which of a page of posts the current user liked
+class LikedPostsRequest(BaseModel):
+    post_ids: List[UUID] = Field(..., max_length=MAX_LIKED_LOOKUP)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 # Base schema
@@ -23,3 +23,22 @@ class ProgramStatusResponse(ProgramStatusBase):
     class Config:
         from_attributes = True
 
+
+# Schemas for transition analytics
+class ProgramStatusTransitionStats(BaseModel):
+    cohort: Optional[str]
+    old_status: str
+    new_status: str
+    count: int
+    median_days_before: Optional[float]  # Median days in old_status before this move
+
+class TimeInStatusStats(BaseModel):
+    cohort: Optional[str]
+    status: str
+    stays: int  # Completed stays (the student has since moved on)
+    median_days: Optional[float]
+
+class ProgramStatusAnalytics(BaseModel):
+    cohort_by: str
+    transitions: List[ProgramStatusTransitionStats]
+    time_in_status: List[TimeInStatusStats]
@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+from uuid import UUID
+
+# Filter definition - same options as the student directory (GET /api/students/)
+class StudentSegmentFilters(BaseModel):
+    search: Optional[str] = None
+    graduation_year: Optional[str] = None
+    states: Optional[List[str]] = None
+    relocation_states: Optional[List[str]] = None
+    interests: Optional[List[str]] = None
+    availability: Optional[List[str]] = None
+    buckets: Optional[List[str]] = None
+    ccap_connections: Optional[List[str]] = None
+    has_resume: Optional[str] = None
+    currently_working: Optional[str] = None
+    food_handlers: Optional[str] = None
+    servsafe: Optional[str] = None
+    will_relocate: Optional[str] = None
+    ready_to_work: Optional[str] = None
+    onboarding_step: Optional[int] = None
+    onboarding_complete: Optional[bool] = True  # Match the directory default
+    has_posts: Optional[str] = None
+
+# Schema for creating a segment
+class StudentSegmentCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    filters: StudentSegmentFilters
+
+# Schema for updating a segment
+class StudentSegmentUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    filters: Optional[StudentSegmentFilters] = None
+
+# Schema for response
+class StudentSegmentResponse(BaseModel):
+    id: UUID
+    name: str
+    description: Optional[str] = None
+    filters: StudentSegmentFilters
+    created_by: Optional[UUID] = None
+    member_count: int = 0
+    refreshed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, ConfigDict, RootModel, create_model
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Type
+from functools import lru_cache
 from uuid import UUID
 from app.schemas.student_profile import StudentProfileResponse
 
@@ -43,6 +44,7 @@ class UserResponse(UserBase):
 
 # Schema for admin endpoints with full student profile
 class UserWithFullProfile(UserBase):
+    email: str  # Already validated on the way in; skip EmailStr checks on every list row
     id: UUID
     role: str
     is_active: bool
@@ -65,6 +67,7 @@ class TokenData(BaseModel):
 class BulkProgramStatusUpdate(BaseModel):
     student_ids: List[UUID]
     program_status: str
+    notes: Optional[str] = None  # Stored with each recorded status change
 
 # Admin Management Schemas
 class AdminCreate(BaseModel):
@@ -90,6 +93,10 @@ class UserListResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserListPage(BaseModel):
+    users: List[UserListResponse]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
+
 class AdminWithPassword(AdminResponse):
     temporary_password: str  # Only returned once on creation/reset
 
@@ -103,3 +110,75 @@ class PaginatedStudentsResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+# Facet counts for the student directory filter sidebar
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+class StudentFacetsResponse(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetCount]]
+
+# Sparse fieldsets for student list endpoints
+# Named projections -> StudentProfile fields (id and user_id are always included)
+STUDENT_PROJECTIONS = {
+    "card": (
+        "first_name", "last_name", "preferred_name", "profile_picture_url",
+        "state", "ccap_connection", "current_bucket", "interests",
+    ),
+    "table": (
+        "first_name", "last_name", "preferred_name", "phone", "city", "state",
+        "high_school", "graduation_year", "ccap_connection", "current_bucket",
+        "ready_to_work", "has_resume", "has_food_handlers_card", "has_servsafe",
+        "onboarding_step", "created_at",
+    ),
+}
+
+def resolve_profile_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Turn a `fields` query value into a sorted tuple of StudentProfile fields.
+    Accepts a projection name (card, table, full) or a comma-separated field list.
+    Returns None for the full profile; raises ValueError on unknown fields.
+    """
+    if not fields or fields == "full":
+        return None
+    if fields in STUDENT_PROJECTIONS:
+        requested = STUDENT_PROJECTIONS[fields]
+    else:
+        requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in requested if f not in StudentProfileResponse.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(sorted(set(requested) | {"id", "user_id"}))
+
+@lru_cache(maxsize=64)
+def student_projection_schema(profile_fields: Tuple[str, ...]) -> Type[UserWithFullProfile]:
+    """UserWithFullProfile variant whose student_profile only has the given fields (cached per field set)"""
+    profile_schema = create_model(
+        "StudentProfileProjection",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (StudentProfileResponse.model_fields[name].annotation, None)
+            for name in profile_fields
+        }
+    )
+    return create_model(
+        "UserWithProfileProjection",
+        __base__=UserWithFullProfile,
+        student_profile=(Optional[profile_schema], None),
+    )
+
+@lru_cache(maxsize=64)
+def paginated_student_projection_schema(profile_fields: Tuple[str, ...]) -> Type[PaginatedStudentsResponse]:
+    """PaginatedStudentsResponse variant for a sparse fieldset"""
+    return create_model(
+        "PaginatedStudentsProjection",
+        __base__=PaginatedStudentsResponse,
+        students=(List[student_projection_schema(profile_fields)], ...),
+    )
+
+@lru_cache(maxsize=64)
+def student_projection_list_schema(profile_fields: Tuple[str, ...]) -> Type[RootModel]:
+    """List of students for a sparse fieldset"""
+    return RootModel[List[student_projection_schema(profile_fields)]]
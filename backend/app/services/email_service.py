@@ -7,6 +7,9 @@ from datetime import datetime
 import ssl
 import urllib3
 from jinja2 import Environment, FileSystemLoader
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import get_cache
+from app.core.metrics import track_external
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +22,16 @@ class EmailService:
         self.api_key = os.getenv("SENDGRID_API_KEY")
         self.from_email = os.getenv("MAIL_FROM", "admin@c-cap-platform.com")
         self.from_name = os.getenv("MAIL_FROM_NAME", "C•CAP Apprentice Program")
+        # "console" logs emails instead of sending them (local development and load tests)
+        self.backend = os.getenv("EMAIL_BACKEND", "sendgrid").lower()
 
         # Setup Jinja2 template environment
         template_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'templates')
         self.jinja_env = Environment(loader=FileSystemLoader(template_dir))
 
-        if not self.api_key:
+        if self.backend == "console":
+            self.sg = None
+        elif not self.api_key:
             logger.warning("SENDGRID_API_KEY not found in environment variables")
             self.sg = None
         else:
@@ -52,6 +59,12 @@ class EmailService:
         Returns:
             bool: True if email sent successfully, False otherwise
         """
+        if self.backend == "console":
+            logger.info(f"[console email] To: {', '.join(to)} | Subject: {subject} | {len(body)} chars")
+            if db_session:
+                await self._log_email_attempt(db_session, to, subject, body, True, None)
+            return True
+
         if not self.sg:
             logger.error("SendGrid not configured - SENDGRID_API_KEY missing")
             if db_session:
@@ -99,7 +112,8 @@ class EmailService:
                     mail.add_attachment(attachment)
             
             # Send the email
-            response = self.sg.send(mail)
+            with track_external("sendgrid", "send"):
+                response = self.sg.send(mail)
             
             if response.status_code in [200, 201, 202]:
                 logger.info(f"Email sent successfully to {', '.join(to)}")
@@ -121,7 +135,7 @@ class EmailService:
             return False
 
     async def _log_email_attempt(self, db_session, to: List[str], subject: str, body: str, success: bool, error_message: str = None):
-        """Log email attempt to database"""
+        """Log email attempt to database (db_session may be a Session or an AsyncSession)"""
         try:
             from app.models.email_log import EmailLog
             
@@ -137,10 +151,18 @@ class EmailService:
                 )
                 db_session.add(email_log)
             
-            db_session.commit()
+            if isinstance(db_session, AsyncSession):
+                await db_session.commit()
+            else:
+                db_session.commit()
+            # Email stats are cached
+            await get_cache().ainvalidate("email_logs")
         except Exception as e:
             logger.error(f"Failed to log email attempt: {str(e)}")
-            db_session.rollback()
+            if isinstance(db_session, AsyncSession):
+                await db_session.rollback()
+            else:
+                db_session.rollback()
 
     async def send_student_welcome_email(
         self,
@@ -0,0 +1,87 @@
+"""
+Hot feed cache for GET /api/posts/.
+
+Holds the newest FEED_CACHE_POSTS posts of each feed view ("student": public
+posts, "admin": all posts) as serialized PostResponse items, in the shared
+cache (app.core.cache). A page inside that window is served without a query.
+
+PostRepository keeps the window current (write-through): creating, editing or
+deleting a post rebuilds it right after the commit, and likes/comments
+re-serialize just that post in place. A window is rebuilt from the database
+at least every FEED_CACHE_TTL seconds, which also bounds drift from in-place
+patches that raced each other.
+"""
+import os
+import time
+from typing import Callable, List, Optional
+
+from app.core.cache import get_cache
+from app.core.serialization import get_adapter
+from app.schemas.post import PostResponse
+
+# First 4 pages of the default page size (50)
+FEED_CACHE_POSTS = int(os.getenv("FEED_CACHE_POSTS", "200"))
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "300"))
+
+VIEWS = ("student", "admin")
+# Writes through BaseRepository (e.g. update_post) invalidate the posts tag, so they also drop the windows
+TAGS = ("posts",)
+
+# Loads the first FEED_CACHE_POSTS posts of a view, newest first, with authors
+WindowLoader = Callable[[str], list]
+
+
+def view_for(role: str) -> str:
+    return "admin" if role == "admin" else "student"
+
+
+def _serialize(posts: list) -> dict:
+    adapter = get_adapter(PostResponse)
+    return {
+        "built_at": time.time(),
+        "ids": [str(post.id) for post in posts],
+        "items": [adapter.dump_json(adapter.validate_python(post, from_attributes=True)) for post in posts],
+    }
+
+
+def _window(view: str, load: WindowLoader) -> dict:
+    return get_cache().get_or_set("feed", view, lambda: _serialize(load(view)), ttl=FEED_CACHE_TTL, tags=TAGS)
+
+
+def get_page(role: str, limit: Optional[int], offset: int, load: WindowLoader) -> Optional[bytes]:
+    """Serialized JSON array for a feed page, or None if the page isn't inside the cached window"""
+    if not limit or offset + limit > FEED_CACHE_POSTS:
+        return None
+    items = _window(view_for(role), load)["items"][offset:offset + limit]
+    return b"[" + b",".join(items) + b"]"
+
+
+def refresh(load: WindowLoader) -> None:
+    """Rebuild both windows after a post was created, edited or deleted (call after the commit)"""
+    get_cache().invalidate(*TAGS)
+    for view in VIEWS:
+        _window(view, load)
+
+
+def patch_post(post) -> None:
+    """
+    Re-serialize a cached post in place after its likes/comments counters changed
+    (call after the commit). Posts outside the windows are ignored.
+    """
+    cache = get_cache()
+    post_key = str(post.id)
+    item = None
+    for view in VIEWS:
+        cached = cache.lookup("feed", view, TAGS, record=False)
+        if not cached.hit or post_key not in cached.value["ids"]:
+            continue
+        # Keep the window's original expiry so it's still rebuilt from the database on schedule
+        remaining = FEED_CACHE_TTL - (time.time() - cached.value["built_at"])
+        if remaining <= 0:
+            continue
+        if item is None:
+            adapter = get_adapter(PostResponse)
+            item = adapter.dump_json(adapter.validate_python(post, from_attributes=True))
+        items: List[bytes] = list(cached.value["items"])
+        items[cached.value["ids"].index(post_key)] = item
+        cache.store("feed", view, {**cached.value, "items": items}, remaining, cached.tokens)
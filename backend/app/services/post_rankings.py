@@ -0,0 +1,46 @@
+"""
+Periodic full refresh of the post_rankings table, started by the app lifespan.
+
+Post, like and comment writes keep rankings current between refreshes; the
+refresh ranks posts those writes didn't reach, drops posts older than
+TRENDING_WINDOW_DAYS and corrects drift. With several workers only one
+refreshes at a time (advisory lock), the others skip that round.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.repositories.post_ranking import PostRankingRepository
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the periodic refresh (POST /api/posts/rankings/refresh still works)
+TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "900"))
+
+
+def refresh_rankings() -> Optional[int]:
+    """Run one full refresh; returns the number of changed rankings (None if another worker was refreshing)"""
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        changed = PostRankingRepository(db).refresh()
+        if changed is not None:
+            logger.info("Refreshed post rankings in %.0fms (%d changed)", (time.perf_counter() - start) * 1000, changed)
+        return changed
+    finally:
+        db.close()
+
+
+async def refresh_periodically() -> None:
+    """Refresh now, then every TRENDING_REFRESH_SECONDS until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(refresh_rankings)
+        except Exception:
+            logger.exception("Post ranking refresh failed")
+        await asyncio.sleep(TRENDING_REFRESH_SECONDS)
@@ -0,0 +1,187 @@
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+from app.models.user import User
+from app.models.student_profile import StudentProfile
+from app.utils.zipstream import ZipStream
+
+# Columns available in the student directory export (name -> column)
+EXPORT_COLUMNS = {
+    "id": User.id,
+    "email": User.email,
+    "username": User.username,
+    "first_name": StudentProfile.first_name,
+    "last_name": StudentProfile.last_name,
+    "preferred_name": StudentProfile.preferred_name,
+    "phone": StudentProfile.phone,
+    "date_of_birth": StudentProfile.date_of_birth,
+    "address": StudentProfile.address,
+    "address_line2": StudentProfile.address_line2,
+    "city": StudentProfile.city,
+    "state": StudentProfile.state,
+    "zip_code": StudentProfile.zip_code,
+    "willing_to_relocate": StudentProfile.willing_to_relocate,
+    "relocation_states": StudentProfile.relocation_states,
+    "high_school": StudentProfile.high_school,
+    "culinary_teacher": StudentProfile.culinary_teacher,
+    "graduation_year": StudentProfile.graduation_year,
+    "culinary_class_years": StudentProfile.culinary_class_years,
+    "ccap_connection": StudentProfile.ccap_connection,
+    "currently_employed": StudentProfile.currently_employed,
+    "current_employer": StudentProfile.current_employer,
+    "current_position": StudentProfile.current_position,
+    "transportation": StudentProfile.transportation,
+    "hours_per_week": StudentProfile.hours_per_week,
+    "availability": StudentProfile.availability,
+    "weekend_availability": StudentProfile.weekend_availability,
+    "ready_to_work": StudentProfile.ready_to_work,
+    "available_date": StudentProfile.available_date,
+    "has_resume": StudentProfile.has_resume,
+    "has_food_handlers_card": StudentProfile.has_food_handlers_card,
+    "has_servsafe": StudentProfile.has_servsafe,
+    "interests": StudentProfile.interests,
+    "current_bucket": StudentProfile.current_bucket,
+    "onboarding_step": StudentProfile.onboarding_step,
+    "created_at": StudentProfile.created_at,
+}
+
+DEFAULT_EXPORT_COLUMNS = [
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "city",
+    "state",
+    "high_school",
+    "graduation_year",
+    "ccap_connection",
+    "current_bucket",
+    "ready_to_work",
+    "has_resume",
+    "has_food_handlers_card",
+    "has_servsafe",
+]
+
+# Rows per chunk handed to the response
+CSV_FLUSH_ROWS = 500
+
+# Characters that are not allowed in XML 1.0 documents
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_csv(columns: List[str], rows: Iterable) -> Iterator[bytes]:
+    """Stream rows as UTF-8 CSV (with BOM so Excel detects the encoding)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+
+    for count, row in enumerate(rows, start=1):
+        values = []
+        for value in row:
+            text = _format_value(value)
+            # Keep spreadsheet apps from evaluating cell contents as formulas
+            if text[:1] in ("=", "+", "-", "@") and not isinstance(value, (int, float)):
+                text = "'" + text
+            values.append(text)
+        writer.writerow(values)
+
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _xlsx_cell(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML_CHARS.sub("", _format_value(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _iter_sheet_xml(columns: List[str], rows: Iterable) -> Iterator[bytes]:
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<sheetData>'
+    ).encode("utf-8")
+
+    yield ("<row>" + "".join(_xlsx_cell(c) for c in columns) + "</row>").encode("utf-8")
+
+    chunk = []
+    for row in rows:
+        chunk.append("<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>")
+        if len(chunk) >= CSV_FLUSH_ROWS:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+
+    yield b"</sheetData></worksheet>"
+
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Students" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def iter_xlsx(columns: List[str], rows: Iterable) -> Iterator[bytes]:
+    """
+    Stream rows as a single-sheet XLSX workbook.
+    The sheet XML is generated row by row into a streaming ZIP, so memory use
+    does not grow with the number of rows.
+    """
+    archive = ZipStream()
+    for name, content in _XLSX_STATIC_PARTS.items():
+        yield from archive.write(name, content.encode("utf-8"))
+    yield from archive.write_chunks("xl/worksheets/sheet1.xml", _iter_sheet_xml(columns, rows))
+    yield archive.close()
@@ -0,0 +1,59 @@
+"""
+Background purge of deleted accounts, and of the storage files they leave.
+
+DELETE /api/students/{id} only soft-deletes (UserPurgeRepository.soft_delete)
+and schedules purge_deleted_users for that account after the response. The app
+lifespan also sweeps every USER_PURGE_INTERVAL_SECONDS, which picks up accounts
+whose purge was interrupted (restart, crash) and retries failed file deletions.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Iterable, Optional
+from uuid import UUID
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import SessionLocal
+from app.repositories.storage_deletion import StorageDeletionRepository
+from app.repositories.user_purge import UserPurgeRepository
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the periodic sweep (deletions are still purged right after the request)
+USER_PURGE_INTERVAL_SECONDS = float(os.getenv("USER_PURGE_INTERVAL_SECONDS", "300"))
+
+
+def purge_deleted_users(user_ids: Optional[Iterable[UUID]] = None) -> int:
+    """Purge the given soft-deleted accounts (default: all pending), then drain the storage queue"""
+    db = SessionLocal()
+    try:
+        repo = UserPurgeRepository(db)
+        purged = 0
+        for user_id in (user_ids if user_ids is not None else repo.pending_user_ids()):
+            start = time.perf_counter()
+            try:
+                if repo.purge(user_id):
+                    purged += 1
+                    logger.info("Purged deleted account %s in %.0fms", user_id, (time.perf_counter() - start) * 1000)
+            except Exception:
+                db.rollback()
+                logger.exception("Purging deleted account %s failed, the next sweep retries it", user_id)
+
+        files = StorageDeletionRepository(db).process_all()
+        if files:
+            logger.info("Processed %d queued storage deletions", files)
+        return purged
+    finally:
+        db.close()
+
+
+async def purge_periodically() -> None:
+    """Sweep now, then every USER_PURGE_INTERVAL_SECONDS until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(purge_deleted_users)
+        except Exception:
+            logger.exception("Deleted account sweep failed")
+        await asyncio.sleep(USER_PURGE_INTERVAL_SECONDS)
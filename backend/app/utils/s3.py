@@ -1,22 +1,18 @@
-import boto3
-import os
-from datetime import timedelta
 from uuid import uuid4
 from typing import Optional
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.utils.storage import get_storage
 
-# Initialize S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.getenv('AWS_S3_REGION', 'us-west-2')
-)
-
-# Single bucket with public/private folders
-BUCKET_NAME = os.getenv('AWS_S3_BUCKET_NAME', 'ccap-production-files')
 
 class S3Service:
+    """
+    File storage operations used by the routes.
+    Delegates to the backend selected by STORAGE_BACKEND (S3 by default, local disk for
+    offline development and load testing). Blocking uploads run in the threadpool so the
+    async upload endpoints don't stall the event loop.
+    """
+
     @staticmethod
     async def upload_profile_picture(file: UploadFile, user_id: str) -> str:
         """
@@ -25,20 +21,15 @@ class S3Service:
         """
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
         file_key = f"public/profile-pictures/{user_id}_{uuid4()}.{file_extension}"
-        
-        # Upload to S3 public folder
-        s3_client.upload_fileobj(
-            file.file,
-            BUCKET_NAME,
-            file_key,
-            ExtraArgs={
-                'ContentType': file.content_type or 'image/jpeg',
-            }
+
+        storage = get_storage()
+        await run_in_threadpool(
+            storage.upload_fileobj, file.file, file_key, file.content_type or 'image/jpeg'
         )
-        
+
         # Return public URL
-        return f"https://{BUCKET_NAME}.s3.amazonaws.com/{file_key}"
-    
+        return storage.public_url(file_key)
+
     @staticmethod
     async def upload_private_document(file: UploadFile, user_id: str, doc_type: str) -> str:
         """
@@ -47,19 +38,14 @@ class S3Service:
         """
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'pdf'
         file_key = f"private/{doc_type}/{user_id}_{uuid4()}.{file_extension}"
-        
+
         # Upload to private folder
-        s3_client.upload_fileobj(
-            file.file,
-            BUCKET_NAME,
-            file_key,
-            ExtraArgs={
-                'ContentType': file.content_type or 'application/pdf',
-            }
+        await run_in_threadpool(
+            get_storage().upload_fileobj, file.file, file_key, file.content_type or 'application/pdf'
         )
-        
+
         return file_key
-    
+
     @staticmethod
     def generate_signed_url(file_key: str, expiration: int = 3600) -> str:
         """
@@ -68,21 +54,13 @@ class S3Service:
         """
         if not file_key:
             return ""
-        
+
         try:
-            url = s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': BUCKET_NAME,
-                    'Key': file_key
-                },
-                ExpiresIn=expiration
-            )
-            return url
+            return get_storage().signed_url(file_key, expiration)
         except Exception as e:
             print(f"Error generating signed URL: {e}")
             return ""
-    
+
     @staticmethod
     async def upload_post_image(file: UploadFile, user_id: str) -> str:
         """
@@ -91,27 +69,32 @@ class S3Service:
         """
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
         file_key = f"public/post-images/{user_id}_{uuid4()}.{file_extension}"
-        
-        # Upload to S3 public folder
-        s3_client.upload_fileobj(
-            file.file,
-            BUCKET_NAME,
-            file_key,
-            ExtraArgs={
-                'ContentType': file.content_type or 'image/jpeg',
-            }
+
+        storage = get_storage()
+        await run_in_threadpool(
+            storage.upload_fileobj, file.file, file_key, file.content_type or 'image/jpeg'
         )
-        
+
         # Return public URL
-        return f"https://{BUCKET_NAME}.s3.amazonaws.com/{file_key}"
-    
+        return storage.public_url(file_key)
+
+    @staticmethod
+    def key_from_url(url: str) -> Optional[str]:
+        """
+        Extract the storage key from a public URL
+        e.g. https://bucket-name.s3.amazonaws.com/public/post-images/file.jpg -> public/post-images/file.jpg
+        """
+        if not url:
+            return None
+        return get_storage().key_from_url(url)
+
     @staticmethod
     def delete_file(file_key: str) -> bool:
         """
         Delete a file from S3
         """
         try:
-            s3_client.delete_object(Bucket=BUCKET_NAME, Key=file_key)
+            get_storage().delete(file_key)
             return True
         except Exception as e:
             print(f"Error deleting file: {e}")
@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+import hashlib
+import hmac
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from urllib.parse import quote, unquote, urlencode
+
+from app.core.metrics import track_external
+
+# Route prefix that serves files from the local disk backend
+LOCAL_STORAGE_URL_PREFIX = "/api/storage"
+
+# Most keys one S3 DeleteObjects request accepts
+DELETE_BATCH_SIZE = 1000
+
+
+class StorageBackend(ABC):
+    """
+    Common interface for file storage.
+    Keys look like "public/post-images/<file>" or "private/resumes/<file>".
+    """
+
+    @abstractmethod
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def public_url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def signed_url(self, key: str, expiration: int = 3600) -> str:
+        ...
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def read(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def delete_many(self, keys: List[str]) -> Dict[str, str]:
+        """Delete several keys; returns {key: error} for the ones that failed (missing keys count as deleted)"""
+        errors = {}
+        for key in keys:
+            try:
+                self.delete(key)
+            except Exception as e:
+                errors[key] = str(e)
+        return errors
+
+
+class S3Storage(StorageBackend):
+    """AWS S3 storage - the boto3 client is created on first use, not at import"""
+
+    def __init__(self, bucket_name: Optional[str] = None):
+        # Single bucket with public/private folders
+        self.bucket_name = bucket_name or os.getenv('AWS_S3_BUCKET_NAME', 'ccap-production-files')
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+
+                    self._client = boto3.client(
+                        's3',
+                        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+                        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                        region_name=os.getenv('AWS_S3_REGION', 'us-west-2')
+                    )
+        return self._client
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: str) -> None:
+        with track_external('s3', 'upload'):
+            self.client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                key,
+                ExtraArgs={'ContentType': content_type}
+            )
+
+    def public_url(self, key: str) -> str:
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+    def signed_url(self, key: str, expiration: int = 3600) -> str:
+        with track_external('s3', 'presign'):
+            return self.client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.bucket_name, 'Key': key},
+                ExpiresIn=expiration
+            )
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        # URL format: https://bucket-name.s3.amazonaws.com/public/post-images/file.jpg
+        return url.split('.com/')[-1] if '.com/' in url else None
+
+    def read(self, key: str) -> bytes:
+        with track_external('s3', 'read'):
+            return self.client.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        # Times the request up to the first byte; the body is streamed afterwards
+        with track_external('s3', 'get_object'):
+            body = self.client.get_object(Bucket=self.bucket_name, Key=key)['Body']
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def delete(self, key: str) -> None:
+        with track_external('s3', 'delete'):
+            self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def delete_many(self, keys: List[str]) -> Dict[str, str]:
+        # One DeleteObjects request per DELETE_BATCH_SIZE keys instead of a request per key
+        errors = {}
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            try:
+                with track_external('s3', 'delete_many'):
+                    response = self.client.delete_objects(
+                        Bucket=self.bucket_name,
+                        Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                    )
+            except Exception as e:
+                errors.update((key, str(e)) for key in batch)
+                continue
+            for error in response.get('Errors', []):
+                errors[error['Key']] = f"{error.get('Code')}: {error.get('Message')}"
+        return errors
+
+
+class LocalStorage(StorageBackend):
+    """
+    Local disk storage for development and load testing.
+    Files are served by the /api/storage route; private keys need an HMAC-signed,
+    expiring URL, the same contract as an S3 presigned URL.
+    """
+
+    def __init__(self, root: Optional[str] = None, base_url: Optional[str] = None):
+        self.root = Path(root or os.getenv("LOCAL_STORAGE_DIR", "./local_storage")).resolve()
+        self.base_url = (base_url or os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8001")).rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise ValueError("Invalid storage key")
+        return path
+
+    def normalize_key(self, key: str) -> str:
+        """The canonical key of the file key refers to ("public/../private/x" -> "private/x")"""
+        return self.path_for(key).relative_to(self.root).as_posix()
+
+    def is_public(self, key: str) -> bool:
+        """Whether key resolves to a file under public/ (decided on the resolved path, not the raw key)"""
+        return self.root / "public" in self.path_for(key).parents
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str, content_type: str) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+
+    def _url(self, key: str) -> str:
+        return f"{self.base_url}{LOCAL_STORAGE_URL_PREFIX}/{quote(key)}"
+
+    def public_url(self, key: str) -> str:
+        return self._url(key)
+
+    def signed_url(self, key: str, expiration: int = 3600) -> str:
+        expires = int(time.time()) + expiration
+        query = urlencode({"expires": expires, "signature": self.sign(key, expires)})
+        return f"{self._url(key)}?{query}"
+
+    def sign(self, key: str, expires: int) -> str:
+        """Signature over the canonical key, so an alias path of a signed key doesn't verify as another file"""
+        secret = os.getenv("SECRET_KEY", "your-secret-key-change-in-production").encode()
+        return hmac.new(secret, f"{self.normalize_key(key)}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+    def verify(self, key: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.sign(key, expires), signature)
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        marker = f"{LOCAL_STORAGE_URL_PREFIX}/"
+        if marker not in url:
+            return None
+        return unquote(url.split(marker, 1)[1].split("?", 1)[0])
+
+    def read(self, key: str) -> bytes:
+        return self.path_for(key).read_bytes()
+
+    def iter_chunks(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(self.path_for(key), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        self.path_for(key).unlink(missing_ok=True)
+
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    """Return the configured storage backend (created lazily, once per process)"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                # "s3" (default) or "local"
+                backend = os.getenv("STORAGE_BACKEND", "s3").lower()
+                if backend == "local":
+                    _storage = LocalStorage()
+                elif backend == "s3":
+                    _storage = S3Storage()
+                else:
+                    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+    return _storage
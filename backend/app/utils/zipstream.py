@@ -0,0 +1,69 @@
+import io
+import time
+import zipfile
+from typing import Iterable, Iterator
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    Build a ZIP archive incrementally and yield its bytes as they are produced.
+    Because the sink is not seekable, zipfile writes data descriptors after each entry,
+    so nothing but the entry currently being written is held in memory.
+
+    Usage:
+        archive = ZipStream()
+        yield from archive.write("a.txt", b"...")
+        yield archive.close()
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED):
+        self.compression = compression
+        self._buffer = _StreamBuffer()
+        self._zip = zipfile.ZipFile(self._buffer, mode="w", compression=compression)
+
+    def write_chunks(self, name: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Add an entry from an iterable of chunks, yielding archive bytes as they are ready"""
+        info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+        info.compress_type = self.compression
+        with self._zip.open(info, mode="w") as entry:
+            for chunk in chunks:
+                entry.write(chunk)
+                data = self._buffer.drain()
+                if data:
+                    yield data
+        data = self._buffer.drain()
+        if data:
+            yield data
+
+    def write(self, name: str, data: bytes) -> Iterator[bytes]:
+        """Add an entry from an in-memory bytes object"""
+        return self.write_chunks(name, [data])
+
+    def close(self) -> bytes:
+        """Finish the archive and return the trailing bytes (central directory)"""
+        self._zip.close()
+        return self._buffer.drain()
@@ -0,0 +1,482 @@
+"""
+End-to-end HTTP load test for the critical user journeys.
+
+Each journey is a short scripted session, run by --concurrency virtual users
+for --duration seconds:
+
+  login      - student login burst: POST /api/auth/login, GET /api/auth/me
+  onboarding - GET /api/students/me/profile, then three PUT /api/students/me/profile saves
+  feed       - scroll three community feed pages, open one post's comments
+  likes      - load the feed, like a post, unlike it again
+  upload     - POST /api/posts/ with a photo, then delete the post
+  directory  - admin: filtered/paginated student list, facets and name search
+
+Latency percentiles (p50/p95/p99) and throughput are reported per journey and
+per request step, and saved to JSON. Pass --compare with an earlier result to
+see regressions between releases.
+
+Journeys leave the dataset as they found it (likes are undone, uploaded posts
+deleted), so runs are repeatable. Run it against a server loaded with
+benchmarks.generate_dataset and using the local stand-ins for S3 and SendGrid:
+
+    STORAGE_BACKEND=local EMAIL_BACKEND=console uvicorn app.main:app --port 8001 --workers 4
+    python -m benchmarks.loadtest --base-url http://localhost:8001 --duration 30 --concurrency 20
+
+Only the standard library is used, so the harness adds no dependencies.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+STATES = ["IL", "CA", "NY", "NJ", "PA", "AZ", "TX", "FL"]
+BUCKETS = ["Pre-Apprentice Explorer", "Pre-Apprentice Candidate", "Apprentice"]
+INTERESTS = ["Cook", "Baker", "Front of the house"]
+AVAILABILITY = ["Morning (6am-12pm)", "Afternoon (12pm-6pm)", "Evening (6pm-12am)", "Flexible"]
+SEARCH_TERMS = ["Garcia", "Chen", "Lincoln", "Jasmine", "Marcus", "student1"]
+FEED_PAGE_SIZE = 24  # Matches the community feed page size in the frontend
+
+
+class JourneyError(Exception):
+    pass
+
+
+class HttpClient:
+    """One keep-alive connection per virtual user"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = self._connect()
+            try:
+                self.conn.request(method, path, body=body, headers=headers or {})
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; retry once on a new one
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, str, bytes]]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content_type, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    values = sorted(latencies)
+    return {
+        "p50": round(percentile(values, 50) * 1000, 2),
+        "p95": round(percentile(values, 95) * 1000, 2),
+        "p99": round(percentile(values, 99) * 1000, 2),
+        "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "max": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+class Recorder:
+    """Thread-safe latency samples for one journey run"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.journeys: List[float] = []
+        self.journey_errors = 0
+        self.steps: Dict[str, List[float]] = {}
+        self.step_errors: Dict[str, int] = {}
+        self.error_samples: List[str] = []
+
+    def step(self, name: str, elapsed: float, ok: bool) -> None:
+        with self.lock:
+            self.steps.setdefault(name, []).append(elapsed)
+            if not ok:
+                self.step_errors[name] = self.step_errors.get(name, 0) + 1
+
+    def journey(self, elapsed: float, error: Optional[str]) -> None:
+        with self.lock:
+            if error is None:
+                self.journeys.append(elapsed)
+            else:
+                self.journey_errors += 1
+                if len(self.error_samples) < 5:
+                    self.error_samples.append(error)
+
+    def result(self, duration: float) -> Dict[str, Any]:
+        requests = sum(len(samples) for samples in self.steps.values())
+        return {
+            "iterations": len(self.journeys),
+            "errors": self.journey_errors,
+            "duration_s": round(duration, 2),
+            "throughput_per_s": round(len(self.journeys) / duration, 2),
+            "requests_per_s": round(requests / duration, 2),
+            "latency_ms": summarize(self.journeys),
+            "steps": {
+                name: {
+                    "count": len(samples),
+                    "errors": self.step_errors.get(name, 0),
+                    "latency_ms": summarize(samples),
+                }
+                for name, samples in self.steps.items()
+            },
+            "error_samples": self.error_samples,
+        }
+
+
+class Session:
+    """A virtual user's view of the API inside one journey"""
+
+    def __init__(self, harness: "LoadTest", client: HttpClient, recorder: Optional[Recorder], rng: random.Random):
+        self.harness = harness
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+
+    def call(self, step: str, method: str, path: str, token: Optional[str] = None, json_body: Any = None,
+             body: Optional[bytes] = None, content_type: Optional[str] = None,
+             expect: Tuple[int, ...] = (200,)) -> Any:
+        headers = {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            content_type = "application/json"
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        start = time.perf_counter()
+        status, payload = self.client.request(method, path, body=body, headers=headers)
+        elapsed = time.perf_counter() - start
+
+        ok = status in expect
+        if self.recorder is not None:
+            self.recorder.step(step, elapsed, ok)
+        if not ok:
+            raise JourneyError(f"{step}: {method} {path} -> {status} {payload[:200]!r}")
+        if payload and status != 204:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return payload
+        return None
+
+    def student(self) -> Tuple[str, str]:
+        """(email, token) of a random pre-logged-in student"""
+        return self.rng.choice(self.harness.student_tokens)
+
+
+# Journeys
+
+def journey_login(s: Session) -> None:
+    n = s.rng.randrange(s.harness.args.students)
+    # 400 = deactivated account (the generated dataset deactivates about 2% of students)
+    login = s.call("login", "POST", "/api/auth/login", json_body={
+        "email": f"student{n}@example.com", "password": s.harness.args.password
+    }, expect=(200, 400))
+    if "access_token" in login:
+        s.call("me", "GET", "/api/auth/me", token=login["access_token"])
+
+
+def journey_onboarding(s: Session) -> None:
+    _, token = s.student()
+    s.call("get_profile", "GET", "/api/students/me/profile", token=token)
+    s.call("save_personal", "PUT", "/api/students/me/profile", token=token, json_body={
+        "phone": f"555-{s.rng.randint(100, 999)}-{s.rng.randint(1000, 9999)}",
+        "bio": "Aspiring chef. " * s.rng.randint(1, 10),
+    })
+    s.call("save_availability", "PUT", "/api/students/me/profile", token=token, json_body={
+        "availability": s.rng.sample(AVAILABILITY, 2),
+        "hours_per_week": s.rng.choice([10, 20, 30]),
+    })
+    s.call("save_interests", "PUT", "/api/students/me/profile", token=token, json_body={
+        "interests": s.rng.sample(INTERESTS, s.rng.randint(1, 2)),
+    })
+
+
+def journey_feed(s: Session) -> None:
+    _, token = s.student()
+    posts = []
+    for page in range(3):
+        posts = s.call(f"feed_page_{page + 1}", "GET",
+                       f"/api/posts/?limit={FEED_PAGE_SIZE}&offset={page * FEED_PAGE_SIZE}", token=token) or posts
+    if posts:
+        s.call("comments", "GET", f"/api/posts/{s.rng.choice(posts)['id']}/comments", token=token)
+
+
+def journey_likes(s: Session) -> None:
+    _, token = s.student()
+    posts = s.call("feed", "GET", f"/api/posts/?limit={FEED_PAGE_SIZE}&offset=0", token=token)
+    if not posts:
+        raise JourneyError("feed is empty")
+    post_id = s.rng.choice(posts)["id"]
+    # 400 = already liked (another virtual user may be the same student), 404 = not liked
+    s.call("like", "POST", f"/api/posts/{post_id}/like", token=token, expect=(201, 400))
+    s.call("unlike", "DELETE", f"/api/posts/{post_id}/like", token=token, expect=(204, 404))
+
+
+def journey_upload(s: Session) -> None:
+    _, token = s.student()
+    body, content_type = _multipart(
+        {"caption": "Load test dish", "featured_dish": "Paella", "is_private": "false"},
+        {"image": ("dish.jpg", "image/jpeg", s.harness.upload_bytes)},
+    )
+    post = s.call("upload", "POST", "/api/posts/", token=token, body=body, content_type=content_type, expect=(201,))
+    s.call("delete", "DELETE", f"/api/posts/{post['id']}", token=token, expect=(204,))
+
+
+def journey_directory(s: Session) -> None:
+    token = s.harness.admin_token
+    filters = {"page_size": 25, "fields": "table"}
+    if s.rng.random() < 0.6:
+        filters["state"] = ",".join(s.rng.sample(STATES, s.rng.randint(1, 2)))
+    if s.rng.random() < 0.5:
+        filters["bucket"] = s.rng.choice(BUCKETS)
+    if s.rng.random() < 0.3:
+        filters["interests"] = s.rng.choice(INTERESTS)
+    if s.rng.random() < 0.3:
+        filters["has_resume"] = "Yes"
+
+    page = s.call("list_page_1", "GET", f"/api/students/?{urlencode({**filters, 'page': 1})}", token=token)
+    if page and page.get("total_pages", 1) > 1:
+        next_page = s.rng.randint(2, min(page["total_pages"], 20))
+        s.call("list_page_n", "GET", f"/api/students/?{urlencode({**filters, 'page': next_page})}", token=token)
+    facet_filters = {k: v for k, v in filters.items() if k not in ("page_size", "fields")}
+    s.call("facets", "GET", f"/api/students/facets?{urlencode(facet_filters)}", token=token)
+    s.call("search", "GET", f"/api/students/search?{urlencode({'q': s.rng.choice(SEARCH_TERMS), 'fields': 'table'})}",
+           token=token)
+
+
+JOURNEYS: Dict[str, Callable[[Session], None]] = {
+    "login": journey_login,
+    "onboarding": journey_onboarding,
+    "feed": journey_feed,
+    "likes": journey_likes,
+    "upload": journey_upload,
+    "directory": journey_directory,
+}
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.student_tokens: List[Tuple[str, str]] = []
+        self.admin_token: Optional[str] = None
+        self.upload_bytes = b"\xff\xd8\xff\xe0" + os.urandom(args.upload_kb * 1024)
+
+    def _login(self, client: HttpClient, email: str) -> str:
+        session = Session(self, client, None, random.Random())
+        return session.call("login", "POST", "/api/auth/login", json_body={
+            "email": email, "password": self.args.password
+        })["access_token"]
+
+    def setup(self) -> None:
+        """Log in the virtual users up front so journeys other than login skip bcrypt"""
+        rng = random.Random(self.args.seed)
+        emails = [f"student{n}@example.com" for n in rng.sample(range(self.args.students), self.args.users)]
+
+        def login(email: str) -> Optional[Tuple[str, str]]:
+            client = HttpClient(self.args.base_url, self.args.timeout)
+            try:
+                return email, self._login(client, email)
+            except JourneyError:
+                return None  # Deactivated account
+            finally:
+                client.close()
+
+        with ThreadPoolExecutor(max_workers=min(self.args.concurrency, 16)) as pool:
+            self.student_tokens = [result for result in pool.map(login, emails) if result]
+        admin = login(self.args.admin_email)
+        if not self.student_tokens or admin is None:
+            raise SystemExit("Login failed: load a dataset with benchmarks.generate_dataset and check --password")
+        self.admin_token = admin[1]
+
+    def run_journey(self, name: str) -> Dict[str, Any]:
+        journey = JOURNEYS[name]
+        recorder = Recorder()
+        warmup_until = time.perf_counter() + self.args.warmup
+        deadline = warmup_until + self.args.duration
+
+        def worker(index: int) -> None:
+            client = HttpClient(self.args.base_url, self.args.timeout)
+            rng = random.Random(f"{self.args.seed}-{name}-{index}")
+            try:
+                while True:
+                    now = time.perf_counter()
+                    if now >= deadline:
+                        return
+                    warming = now < warmup_until
+                    session = Session(self, client, None if warming else recorder, rng)
+                    start = time.perf_counter()
+                    error = None
+                    try:
+                        journey(session)
+                    except JourneyError as e:
+                        error = str(e)
+                    except (OSError, http.client.HTTPException) as e:
+                        error = f"{type(e).__name__}: {e}"
+                        client.close()
+                    if not warming:
+                        recorder.journey(time.perf_counter() - start, error)
+            finally:
+                client.close()
+
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            list(pool.map(worker, range(self.args.concurrency)))
+        return recorder.result(self.args.duration)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(name: str, result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"{name:<12}{result['iterations']:>8}{result['errors']:>8}{result['throughput_per_s']:>10.1f}/s"
+        f"{result['requests_per_s']:>10.1f}/s{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+    )
+    for step, stats in result["steps"].items():
+        step_latency = stats["latency_ms"]
+        print(
+            f"  {step:<18}{stats['count']:>8}{stats['errors']:>8}{'':>24}"
+            f"{step_latency['p50']:>10.1f}{step_latency['p95']:>10.1f}{step_latency['p99']:>10.1f}"
+        )
+    for sample in result["error_samples"]:
+        print(f"  ! {sample}")
+
+
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> int:
+    """Print p95/throughput changes against an earlier run; returns the number of regressions"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path} (revision {baseline['meta'].get('git_revision')}):")
+    print(f"{'journey':<12}{'p95 before':>12}{'p95 now':>10}{'change':>9}{'tput before':>13}{'tput now':>10}{'change':>9}")
+    regressions = 0
+    for name, result in current["journeys"].items():
+        before = baseline["journeys"].get(name)
+        if before is None:
+            continue
+        p95_before, p95_now = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        tput_before, tput_now = before["throughput_per_s"], result["throughput_per_s"]
+        p95_change = (p95_now - p95_before) / p95_before * 100 if p95_before else 0.0
+        tput_change = (tput_now - tput_before) / tput_before * 100 if tput_before else 0.0
+        regressed = p95_change > threshold or tput_change < -threshold
+        regressions += regressed
+        print(
+            f"{name:<12}{p95_before:>12.1f}{p95_now:>10.1f}{p95_change:>+8.1f}%"
+            f"{tput_before:>13.1f}{tput_now:>10.1f}{tput_change:>+8.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--journeys", nargs="+", choices=JOURNEYS, default=list(JOURNEYS))
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per journey")
+    parser.add_argument("--warmup", type=float, default=3, help="Unmeasured seconds before each journey")
+    parser.add_argument("--concurrency", type=int, default=10, help="Virtual users per journey")
+    parser.add_argument("--students", type=int, default=1000,
+                        help="Accounts student0..N-1@example.com that exist (see benchmarks.generate_dataset)")
+    parser.add_argument("--users", type=int, default=50, help="Students logged in up front for the non-login journeys")
+    parser.add_argument("--admin-email", default="admin0@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--upload-kb", type=int, default=200, help="Size of the uploaded photo")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Result JSON path (default: loadtest-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="Percent change in p95 or throughput reported as a regression")
+    args = parser.parse_args()
+    args.users = min(args.users, args.students)
+
+    started_at = datetime.now(timezone.utc)
+    harness = LoadTest(args)
+    print(f"Logging in {args.users} students and {args.admin_email} at {args.base_url} ...")
+    harness.setup()
+
+    results = {
+        "meta": {
+            "base_url": args.base_url,
+            "started_at": started_at.isoformat(),
+            "git_revision": _git_revision(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "students": args.students,
+            "users": args.users,
+        },
+        "journeys": {},
+    }
+
+    print(f"\n{'journey':<12}{'iters':>8}{'errors':>8}{'journeys':>12}{'requests':>12}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in args.journeys:
+        result = harness.run_journey(name)
+        results["journeys"][name] = result
+        print_result(name, result)
+
+    output = args.output or f"loadtest-{started_at.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
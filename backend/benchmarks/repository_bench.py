@@ -0,0 +1,288 @@
+"""
+Repository micro-benchmarks with query plan assertions.
+
+Runs the hot repository queries against a database loaded by
+benchmarks.generate_dataset, and for each case records:
+
+  - latency (median and best of --repeat runs)
+  - SQL statements executed per call
+  - the plan of every SELECT it ran, via EXPLAIN (FORMAT JSON)
+
+A case fails if any of its statements sequentially scans a table with at
+least --min-rows rows, unless the case explicitly expects a full scan of that
+table (e.g. an announcement sent to every student). Run it in CI after
+`alembic upgrade head` so a migration that drops or changes an index the hot
+paths rely on is caught before deploy; the exit status is 1 on failure.
+
+Usage (from backend/):
+    python -m benchmarks.repository_bench [--repeat 20] [--min-rows 1000] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, engine
+from app.core.sql_profiler import profile_request
+from app.models import Announcement, Post, StudentProfile, User
+from app.repositories.announcement import AnnouncementRepository
+from app.repositories.post import PostRepository
+from app.repositories.post_ranking import PostRankingRepository
+from app.repositories.student import StudentRepository
+
+PAGE_SIZE = 25
+
+
+@dataclass
+class Fixtures:
+    admin: User
+    student: User
+    post: Post
+    announcements: Dict[str, Announcement]
+    # Ids on the first student feed page, for liked-status lookups
+    feed_post_ids: List[UUID]
+
+    def reload(self, db: Session) -> None:
+        """Refresh the fixtures after a rollback so the timed runs don't include reloading them"""
+        for obj in (self.admin, self.student, self.post, *self.announcements.values()):
+            db.refresh(obj)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[Session, Fixtures], Any]
+    # Tables this case is expected to read in full (the result is most of the table)
+    allow_seq_scan: FrozenSet[str] = field(default_factory=frozenset)
+
+
+def _filtered_page(**filters):
+    """The admin directory page query: _build_filter_query + newest-first ordering + LIMIT"""
+    def run(db: Session, fx: Fixtures):
+        query = StudentRepository(db)._build_filter_query(**filters)
+        return query.order_by(StudentProfile.created_at.desc()).limit(PAGE_SIZE).all()
+    return run
+
+
+def _students_for(audience: str):
+    def run(db: Session, fx: Fixtures):
+        return AnnouncementRepository(db).get_students_for_announcement(fx.announcements[audience])
+    return run
+
+
+CASES: List[Case] = [
+    Case("filter_page_unfiltered", _filtered_page()),
+    Case("filter_page_state", _filtered_page(states=["IL"])),
+    Case("filter_page_bucket_ccap", _filtered_page(buckets=["Apprentice"], ccap_connections=["Chicago - C-CAP"])),
+    Case("filter_page_graduation_year", _filtered_page(graduation_year="2020")),
+    Case("filter_page_relocation", _filtered_page(relocation_states=["WY"])),
+    Case("filter_page_interests_availability",
+         _filtered_page(interests=["Front of the house"], availability=["Overnight (12am-6am)"])),
+    Case("filter_page_has_posts", _filtered_page(has_posts="Yes", onboarding_complete=True)),
+    # Substring search (ILIKE '%term%') OR'd across users and student_profiles can't use a
+    # b-tree index; it reads both tables in full by design
+    Case("search_students_name",
+         lambda db, fx: StudentRepository(db).search_students("garcia", fx.admin, profile_fields=["first_name"]),
+         allow_seq_scan=frozenset({"users", "student_profiles"})),
+    Case("search_students_email",
+         lambda db, fx: StudentRepository(db).search_students("student12", fx.admin, profile_fields=["first_name"]),
+         allow_seq_scan=frozenset({"users", "student_profiles"})),
+    Case("feed_student_first_page",
+         lambda db, fx: PostRepository(db).get_all_posts(limit=24, offset=0, user_role="student")),
+    Case("feed_student_deep_page",
+         lambda db, fx: PostRepository(db).get_all_posts(limit=24, offset=480, user_role="student")),
+    Case("feed_admin_first_page",
+         lambda db, fx: PostRepository(db).get_all_posts(limit=24, offset=0, user_role="admin")),
+    Case("trending_student_first_page",
+         lambda db, fx: PostRankingRepository(db).get_trending(limit=24, user_role="student")),
+    Case("dish_gallery_student",
+         lambda db, fx: PostRankingRepository(db).get_trending(limit=24, user_role="student", featured_dish="Ratatouille")),
+    Case("liked_status_feed_page",
+         lambda db, fx: PostRepository(db).get_liked_post_ids(fx.feed_post_ids, fx.student)),
+    Case("posts_by_user",
+         lambda db, fx: PostRepository(db).get_posts_by_user(fx.student.id, limit=24, current_user_id=fx.admin.id)),
+    Case("comments_for_post",
+         lambda db, fx: PostRepository(db).get_comments_for_post(fx.post.id)),
+    Case("announcements_for_student",
+         lambda db, fx: AnnouncementRepository(db).get_announcements_for_student(fx.student),
+         allow_seq_scan=frozenset({"announcements"})),
+    # Audience queries return a large share of all students: the profile filter must use its
+    # index, but hash-joining a full read of users is the right plan
+    Case("students_for_announcement_all", _students_for("all"),
+         allow_seq_scan=frozenset({"users", "student_profiles"})),
+    Case("students_for_announcement_program_stages", _students_for("program_stages"),
+         allow_seq_scan=frozenset({"users"})),
+    Case("students_for_announcement_locations", _students_for("locations"),
+         allow_seq_scan=frozenset({"users"})),
+]
+
+
+class StatementCapture:
+    """Collects (statement, parameters) of the SELECTs run while enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        self.enabled = True
+        return self
+
+    def __exit__(self, *exc):
+        self.enabled = False
+
+
+def _plan_nodes(plan: Dict[str, Any]):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain(db: Session, statement: str, parameters: Any) -> Dict[str, Any]:
+    return db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+
+
+def table_sizes(db: Session) -> Dict[str, float]:
+    rows = db.execute(text(
+        "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    ))
+    return {name: tuples for name, tuples in rows}
+
+
+def load_fixtures(db: Session) -> Fixtures:
+    admin = db.query(User).filter(User.role == "admin").order_by(User.email).first()
+    student = (
+        db.query(User).join(StudentProfile, User.id == StudentProfile.user_id)
+        .filter(User.role == "student", StudentProfile.onboarding_step == 0, StudentProfile.post_count > 0)
+        .order_by(User.email).first()
+    )
+    if admin is None or student is None:
+        raise SystemExit("No data: load a dataset with `python -m benchmarks.generate_dataset` first")
+    post = db.query(Post).order_by(Post.comments_count.desc(), Post.id).first()
+
+    announcements = {}
+    for audience in ("all", "program_stages", "locations"):
+        announcement = (
+            db.query(Announcement).filter(Announcement.target_audience == audience)
+            .order_by(Announcement.created_at).first()
+        )
+        if announcement is None:
+            raise SystemExit(f"The dataset has no announcement with target_audience={audience!r}")
+        announcements[audience] = announcement
+    feed_post_ids = [post.id for post in PostRepository(db).get_all_posts(limit=PAGE_SIZE, user_role="student")]
+    return Fixtures(admin=admin, student=student, post=post, announcements=announcements, feed_post_ids=feed_post_ids)
+
+
+def run_case(case: Case, db: Session, fx: Fixtures, capture: StatementCapture, repeat: int,
+             sizes: Dict[str, float], min_rows: int) -> Dict[str, Any]:
+    # Warm-up run also captures the statements to explain
+    db.rollback()
+    fx.reload(db)
+    with capture, profile_request() as profile:
+        result = case.run(db, fx)
+    rows = len(result) if isinstance(result, list) else None
+    statements = list(capture.statements)
+
+    timings = []
+    for _ in range(repeat):
+        # Expire loaded objects so each timed run goes to the database
+        db.rollback()
+        fx.reload(db)
+        start = time.perf_counter()
+        case.run(db, fx)
+        timings.append(time.perf_counter() - start)
+
+    plans = []
+    failures = []
+    for statement, parameters in statements:
+        plan = explain(db, statement, parameters)
+        scans = []
+        for node in _plan_nodes(plan):
+            relation = node.get("Relation Name")
+            index = node.get("Index Name")
+            if relation:
+                scans.append(f"{node['Node Type']} on {relation}" + (f" using {index}" if index else ""))
+            elif index:
+                scans.append(f"{node['Node Type']} using {index}")  # Bitmap Index Scan under a Bitmap Heap Scan
+            if (
+                node["Node Type"] == "Seq Scan"
+                and sizes.get(relation, 0) >= min_rows
+                and relation not in case.allow_seq_scan
+            ):
+                failures.append(f"Seq Scan on {relation} (~{int(sizes[relation]):,} rows)")
+        plans.append({"statement": " ".join(statement.split())[:300], "scans": scans})
+
+    return {
+        "rows": rows,
+        "statements": profile.count,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "best_ms": round(min(timings) * 1000, 3),
+        "plans": plans,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="Sequential scans of tables smaller than this are not failures")
+    parser.add_argument("--cases", nargs="+", choices=[case.name for case in CASES],
+                        help="Run only these cases")
+    parser.add_argument("--verbose", action="store_true", help="Print the scans of every statement")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The repository benchmarks need the PostgreSQL benchmark database")
+
+    capture = StatementCapture()
+    db = SessionLocal()
+    try:
+        db.execute(text("ANALYZE"))
+        sizes = table_sizes(db)
+        fx = load_fixtures(db)
+
+        results = {}
+        print(f"{'case':<44}{'rows':>8}{'stmts':>7}{'median ms':>11}{'best ms':>10}  plan")
+        for case in CASES:
+            if args.cases and case.name not in args.cases:
+                continue
+            result = run_case(case, db, fx, capture, args.repeat, sizes, args.min_rows)
+            results[case.name] = result
+            status = "FAIL: " + "; ".join(result["failures"]) if result["failures"] else "ok"
+            rows = "-" if result["rows"] is None else f"{result['rows']:,}"
+            print(f"{case.name:<44}{rows:>8}{result['statements']:>7}"
+                  f"{result['median_ms']:>11.2f}{result['best_ms']:>10.2f}  {status}")
+            if args.verbose or result["failures"]:
+                for plan in result["plans"]:
+                    print(f"    {plan['statement'][:120]}")
+                    for scan in plan["scans"]:
+                        print(f"      {scan}")
+    finally:
+        db.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"tables": {k: int(v) for k, v in sizes.items()}, "cases": results}, f, indent=2)
+
+    failed = [name for name, result in results.items() if result["failures"]]
+    if failed:
+        print(f"\n{len(failed)} case(s) scan large tables sequentially: {', '.join(failed)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Local stand-in for Redis, for running the API with CACHE_BACKEND=redis without
+a Redis install (several workers sharing one cache, load tests, trying out
+cache invalidation).
+
+Speaks enough of the Redis protocol (RESP2) for app.core.cache.RedisCache and
+redis-cli: PING, ECHO, AUTH, SELECT, GET, MGET, SET (EX/PX/NX/XX), DEL, EXISTS,
+DBSIZE, FLUSHDB, FLUSHALL, QUIT. Data lives in memory and is lost on exit;
+expired keys are dropped when they are next read.
+
+    python -m benchmarks.resp_server --port 6379
+    CACHE_BACKEND=redis REDIS_URL=redis://localhost:6379/0 uvicorn app.main:app --port 8001 --workers 4
+
+Only the standard library is used.
+"""
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# db index -> key -> (value, expires_at or None)
+Store = Dict[int, Dict[bytes, Tuple[bytes, Optional[float]]]]
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command (e.g. typed into telnet)
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        if not header.startswith(b"$"):
+            raise ProtocolError("expected bulk string")
+        data = await reader.readexactly(int(header[1:]) + 2)
+        args.append(data[:-2])
+    return args
+
+
+class RespServer:
+    def __init__(self, password: Optional[str] = None):
+        self.password = password.encode() if password else None
+        self.store: Store = defaultdict(dict)
+
+    def _get(self, db: int, key: bytes) -> Optional[bytes]:
+        entry = self.store[db].get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[db][key]
+            return None
+        return value
+
+    def _set(self, db: int, args: List[bytes]):
+        key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+        expires_at = None
+        if b"EX" in options:
+            expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+        if b"PX" in options:
+            expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+        exists = self._get(db, key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        self.store[db][key] = (value, expires_at)
+        return "OK"
+
+    def execute(self, session: dict, args: List[bytes]):
+        command, args = args[0].upper(), args[1:]
+        if command == b"AUTH":
+            if self.password is None or args[-1] == self.password:
+                session["authenticated"] = True
+                return "OK"
+            return ProtocolError("invalid password")
+        if self.password is not None and not session["authenticated"]:
+            return ProtocolError("NOAUTH Authentication required")
+
+        db = session["db"]
+        if command == b"PING":
+            return args[0] if args else "PONG"
+        if command == b"ECHO":
+            return args[0]
+        if command == b"SELECT":
+            session["db"] = int(args[0])
+            return "OK"
+        if command == b"GET":
+            return self._get(db, args[0])
+        if command == b"MGET":
+            return [self._get(db, key) for key in args]
+        if command == b"SET":
+            return self._set(db, args)
+        if command == b"DEL":
+            return sum(self.store[db].pop(key, None) is not None for key in args)
+        if command == b"EXISTS":
+            return sum(self._get(db, key) is not None for key in args)
+        if command == b"DBSIZE":
+            return len(self.store[db])
+        if command == b"FLUSHDB":
+            self.store[db].clear()
+            return "OK"
+        if command == b"FLUSHALL":
+            self.store.clear()
+            return "OK"
+        return ProtocolError(f"unknown command '{command.decode(errors='replace')}'")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = {"db": 0, "authenticated": False}
+        try:
+            while True:
+                args = await _read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                if args[0].upper() == b"QUIT":
+                    writer.write(_encode("OK"))
+                    break
+                try:
+                    reply = self.execute(session, args)
+                except (IndexError, ValueError) as e:
+                    reply = ProtocolError(f"wrong arguments for '{args[0].decode(errors='replace')}': {e}")
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (ConnectionError, ProtocolError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, password: Optional[str]) -> None:
+    server = await asyncio.start_server(RespServer(password).handle, host, port)
+    print(f"RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--password", default=None, help="Require AUTH with this password")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.password))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
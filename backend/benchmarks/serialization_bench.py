@@ -0,0 +1,148 @@
+"""
+Compare list response serialization paths (rows/sec):
+
+  json           - what FastAPI does for `response_model=List[X]`: validate the
+                   ORM objects through the route's response field, serialize to
+                   JSON-ready data, then encode with JSONResponse (json.dumps)
+  orjson         - the same, encoded with ORJSONResponse (the app's default
+                   response class)
+  typed_response - app.core.serialization: cached TypeAdapter, validated and
+                   encoded inside pydantic-core in one pass
+
+Rows are transient ORM objects built in memory, so no database is needed.
+
+Usage (from backend/):
+    python -m benchmarks.serialization_bench [--rows 1000 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import gc
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import typed_response
+from app.models import Announcement, EmailLog, Post, StudentProfile, User
+from app.schemas.announcement import AnnouncementResponse
+from app.schemas.email_log import EmailLogResponse
+from app.schemas.post import PostResponse
+from app.schemas.user import UserWithFullProfile
+
+
+def make_students(n: int) -> List[User]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        user = User(
+            id=uuid.uuid4(), email=f"student{i}@example.com", username=f"student{i}",
+            role="student", is_active=True, created_at=now
+        )
+        user.student_profile = StudentProfile(
+            id=uuid.uuid4(), user_id=user.id, first_name=f"First{i}", last_name=f"Last{i}",
+            phone="555-0100", bio="Loves cooking " * 10, city="Chicago", state="IL",
+            high_school="Lincoln High", graduation_year="2026", ccap_connection="Chicago",
+            relocation_states=["IL", "WI"], availability=["Weekday mornings", "Weekends"],
+            interests=["Baking", "Grill"], current_bucket="Apprentice", has_resume="Yes",
+            onboarding_step=0, post_count=i % 7, created_at=now
+        )
+        rows.append(user)
+    return rows
+
+
+def make_posts(n: int) -> List[Post]:
+    now = datetime.now(timezone.utc)
+    author = User(id=uuid.uuid4(), email="author@example.com", username="author")
+    return [
+        Post(
+            id=uuid.uuid4(), user_id=author.id, author=author, image_url=f"https://cdn.example.com/public/posts/{i}.jpg",
+            caption="Tonight's dish " * 5, featured_dish="Paella", is_private=False,
+            likes_count=i % 40, comments_count=i % 9, created_at=now
+        )
+        for i in range(n)
+    ]
+
+
+def make_announcements(n: int) -> List[Announcement]:
+    now = datetime.now(timezone.utc)
+    return [
+        Announcement(
+            id=uuid.uuid4(), created_by=uuid.uuid4(), title=f"Announcement {i}", content="Details " * 40,
+            priority="medium", category="general", icon="megaphone", target_audience="program_stages",
+            target_program_stages=["Apprentice"], created_at=now
+        )
+        for i in range(n)
+    ]
+
+
+def make_email_logs(n: int) -> List[EmailLog]:
+    now = datetime.now(timezone.utc)
+    return [
+        EmailLog(
+            id=i, to_email=f"student{i}@example.com", subject="Welcome", body="<p>Hello</p>" * 30,
+            status="success", sent_at=now, created_at=now
+        )
+        for i in range(n)
+    ]
+
+
+CASES = {
+    "students": (UserWithFullProfile, make_students),
+    "posts": (PostResponse, make_posts),
+    "announcements": (AnnouncementResponse, make_announcements),
+    "email_logs": (EmailLogResponse, make_email_logs),
+}
+
+
+def response_model_path(field, rows, response_class=JSONResponse) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=rows))
+    return response_class(content).body
+
+
+def typed_response_path(schema, rows) -> bytes:
+    return typed_response(schema, rows).body
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<14}{'rows':>8}{'json':>14}{'orjson':>14}{'typed_response':>18}{'speedup':>10}")
+    for name, (schema, factory) in CASES.items():
+        field = create_model_field(name="Response", type_=List[schema], mode="serialization")
+        for n in args.rows:
+            rows = factory(n)
+            # Both paths must produce the same document
+            assert response_model_path(field, rows).replace(b" ", b"") == typed_response_path(List[schema], rows).replace(b" ", b"")
+
+            baseline = best_of(lambda: response_model_path(field, rows), args.repeat)
+            encoded = best_of(lambda: response_model_path(field, rows, ORJSONResponse), args.repeat)
+            fast = best_of(lambda: typed_response_path(List[schema], rows), args.repeat)
+            print(
+                f"{name:<14}{n:>8}{n / baseline:>12,.0f}/s{n / encoded:>12,.0f}/s"
+                f"{n / fast:>16,.0f}/s{baseline / fast:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()